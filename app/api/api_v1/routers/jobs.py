@@ -0,0 +1,124 @@
+from typing import List, Union
+
+from fastapi import FastAPI, Form, HTTPException, Query, status
+from fastapi.logger import logger
+
+from app.core.config import Settings
+from app.models.jobs import Job, JobResults
+from app.utils.jobs import get_job_manager
+from app.utils.meta_data import create_meta_data_for_s3_bucket
+from app.utils.s3_files import get_s3_client
+
+settings = Settings()
+
+jobs_router = router = FastAPI(
+    title="Routes to run meta-data generation as background jobs",
+    description="Mentioned api helps to generate meta data for large S3 buckets in background.",
+)
+
+
+def get_job_or_404(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job not found: {job_id}",
+        )
+    return job
+
+
+@router.post("/s3", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def submit_s3_bucket_job(
+    s3_bucket: str = Form(..., description="S3 bucket name"),
+    prefix: Union[str, None] = Form(
+        default=None,
+        description="S3 file prefix, to list down all the files under particular prefix",
+    ),
+    s3_access_key: Union[str, None] = Form(None, description="S3 access key"),
+    s3_secret_key: Union[str, None] = Form(None, description="S3 secret key"),
+    s3_endpoint_url: Union[str, None] = Form(
+        None, description="S3 endpoint url"
+    ),
+    resource: Union[str, None] = Form(None, description="S3 resource"),
+    file_format: str = Form(
+        "csv",
+        description="Format of the processed files, one of csv, csv.gz, "
+        "csv.zst, parquet or feather",
+    ),
+    incremental: bool = Form(
+        False,
+        description="Process only objects new or modified since the last scan",
+    ),
+):
+    """Queue a job to generate meta-data for all the files in S3 bucket."""
+    try:
+        s3_client = await get_s3_client(
+            s3_access_key=s3_access_key,
+            s3_secret_key=s3_secret_key,
+            s3_endpoint_url=s3_endpoint_url,
+            resource=resource,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error connecting to S3: {e}",
+        )
+    else:
+        job = get_job_manager().submit(
+            lambda job: create_meta_data_for_s3_bucket(
+                s3_client=s3_client,
+                s3_bucket=s3_bucket,
+                prefix=prefix,
+                file_format=file_format,
+                incremental=incremental,
+                observer=job,
+            )
+        )
+        logger.info(f"Job {job.id} queued for S3 bucket: {s3_bucket}")
+        return job.to_model()
+
+
+@router.get("/", response_model=List[Job])
+async def list_jobs():
+    return [job.to_model() for job in get_job_manager().jobs.values()]
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    """Progress of the job."""
+    return get_job_or_404(job_id).to_model()
+
+
+@router.get(
+    "/{job_id}/results",
+    response_model=JobResults,
+    response_model_exclude_unset=True,
+)
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(
+        0, ge=0, description="Skip results already fetched in earlier calls"
+    ),
+    limit: int = Query(
+        settings.JOB_RESULTS_PAGE_SIZE,
+        ge=1,
+        description="Maximum number of results returned",
+    ),
+):
+    """Meta-data of the files processed so far, in the order of completion,
+    a page at a time."""
+    job = get_job_or_404(job_id)
+    results = job.get_results(offset, limit)
+    return JobResults(
+        id=job.id,
+        status=job.status,
+        offset=offset,
+        total=job.objects_processed,
+        results=results,
+    )
+
+
+@router.delete("/{job_id}", response_model=Job)
+async def cancel_job(job_id: str):
+    get_job_or_404(job_id)
+    return get_job_manager().cancel(job_id).to_model()
@@ -1,19 +1,39 @@
 from typing import Dict, List, Union
 
-from aiohttp import ClientSession
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile, status
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
 from fastapi.logger import logger
+from fastapi.responses import StreamingResponse
 
+from app.core.admission import admit_request
 from app.core.config import Settings
+from app.core.executor import run_in_thread
+from app.models.filesystem_paths import FilesystemPaths
 from app.models.meta_data import MetaData
 from app.models.s3_urls import S3Urls
+from app.utils.cache import get_meta_data_cache
+from app.utils.filesystem import resolve_filesystem_paths
 from app.utils.meta_data import (
     create_meta_data_for_dataset_csv,
     create_meta_data_for_dataset_urls,
+    create_meta_data_for_local_files,
     create_meta_data_for_s3_bucket,
     create_meta_data_for_s3_files,
+    create_meta_data_for_uploaded_files,
 )
-from app.utils.s3_files import get_list_of_s3_objects, get_s3_resource
+from app.utils.ndjson import NDJSON_MEDIA_TYPE, stream_meta_data
+from app.utils.s3_files import get_list_of_s3_objects, get_s3_client
+from app.utils.schema import get_schema_cache
+from app.utils.uploads import iterate_uploaded_files
 
 settings = Settings()
 
@@ -23,27 +43,91 @@ meta_data_router = router = FastAPI(
 )
 
 
-@router.post("/urls", response_model=Dict[str, MetaData])
-async def get_metadata_for_dataset_with_source_urls(urls: List[str]):
+STREAM_DESCRIPTION = (
+    "Stream meta-data of each dataset as a NDJSON line as soon as it is "
+    "processed, followed by a summary line of failures & timings"
+)
+
+
+def get_streaming_response(create_meta_data, *args, **kwargs):
+    return StreamingResponse(
+        stream_meta_data(create_meta_data, *args, **kwargs),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.post(
+    "/urls",
+    response_model=Dict[str, MetaData],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admit_request)],
+)
+async def get_metadata_for_dataset_with_source_urls(
+    urls: List[str],
+    stream: bool = Query(False, description=STREAM_DESCRIPTION),
+):
     """Functions Facilitates to generate meta-data for datasets when their download link are provided."""
-    session = ClientSession()
-    meta_data = await create_meta_data_for_dataset_urls(urls, session=session)
-    await session.close()
-    return meta_data
+    if stream:
+        return get_streaming_response(create_meta_data_for_dataset_urls, urls)
+    return await create_meta_data_for_dataset_urls(urls)
 
 
-@router.post("/files", response_model=Dict[str, MetaData])
+@router.post(
+    "/files",
+    response_model=Dict[str, MetaData],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admit_request)],
+)
 async def get_meta_data_from_files(
     csv_files: List[UploadFile] = File(
         ..., description="List of dataset files in csv format"
     ),
+    stream: bool = Form(False, description=STREAM_DESCRIPTION),
 ):
     """Functions Facilitates to generate meta-data for datasets when file objects link is provided."""
+    if stream:
+        return get_streaming_response(
+            create_meta_data_for_dataset_csv, csv_files
+        )
     meta_data = await create_meta_data_for_dataset_csv(csv_files)
     return meta_data
 
 
-@router.post("/s3")
+UPLOADED_FILES_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "required": ["csv_files"],
+                "properties": {
+                    "csv_files": {
+                        "type": "array",
+                        "items": {"type": "string", "format": "binary"},
+                        "description": "List of dataset files in csv format",
+                    }
+                },
+            }
+        }
+    },
+}
+
+
+@router.post(
+    "/files/incremental",
+    response_model=Dict[str, MetaData],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(admit_request)],
+    openapi_extra={"requestBody": UPLOADED_FILES_BODY},
+)
+async def get_meta_data_from_files_incrementally(request: Request):
+    """Generate meta-data of uploaded files, each as soon as its part of the multipart body is received."""
+    return await create_meta_data_for_uploaded_files(
+        iterate_uploaded_files(request)
+    )
+
+
+@router.post("/s3", dependencies=[Depends(admit_request)])
 async def get_meta_data_from_s3(
     s3_bucket: str = Form(..., description="S3 bucket name"),
     prefix: Union[str, None] = Form(
@@ -56,11 +140,20 @@ async def get_meta_data_from_s3(
         None, description="S3 endpoint url"
     ),
     resource: Union[str, None] = Form(None, description="S3 resource"),
-    file_format: str = Form("csv", description="Format of the processed file"),
+    file_format: str = Form(
+        "csv",
+        description="Format of the processed files, one of csv, csv.gz, "
+        "csv.zst, parquet or feather",
+    ),
+    incremental: bool = Form(
+        False,
+        description="Process only objects new or modified since the last scan",
+    ),
+    stream: bool = Form(False, description=STREAM_DESCRIPTION),
 ):
     """Functions Facilitates to generate meta-data for datasets when file objects link is provided."""
     try:
-        s3_resource = await get_s3_resource(
+        s3_client = await get_s3_client(
             s3_access_key=s3_access_key,
             s3_secret_key=s3_secret_key,
             s3_endpoint_url=s3_endpoint_url,
@@ -73,11 +166,21 @@ async def get_meta_data_from_s3(
         )
     else:
         logger.info(f"Connected to S3 bucket: {s3_bucket}")
+        if stream:
+            return get_streaming_response(
+                create_meta_data_for_s3_bucket,
+                s3_client=s3_client,
+                s3_bucket=s3_bucket,
+                prefix=prefix,
+                file_format=file_format,
+                incremental=incremental,
+            )
         meta_data = await create_meta_data_for_s3_bucket(
-            s3_resource=s3_resource,
+            s3_client=s3_client,
             s3_bucket=s3_bucket,
             prefix=prefix,
             file_format=file_format,
+            incremental=incremental,
         )
         return meta_data
 
@@ -85,14 +188,21 @@ async def get_meta_data_from_s3(
 @router.post(
     "/s3/urls",
     response_model=Dict[str, MetaData],
+    response_model_exclude_unset=True,
     description="Get meta data for S3 files from their urls",
+    dependencies=[Depends(admit_request)],
 )
 async def get_meta_data_from_s3_urls(
     source: S3Urls,
+    stream: bool = Query(False, description=STREAM_DESCRIPTION),
 ):
     try:
         urls = source.urls
         logger.info(f"Getting meta data for S3 files: {len(urls)}")
+        if stream:
+            return get_streaming_response(
+                create_meta_data_for_s3_files, s3_urls=urls
+            )
         meta_data = await create_meta_data_for_s3_files(
             s3_urls=urls,
         )
@@ -105,6 +215,38 @@ async def get_meta_data_from_s3_urls(
         return meta_data
 
 
+@router.post(
+    "/filesystem",
+    response_model=Dict[str, MetaData],
+    response_model_exclude_unset=True,
+    description="Get meta data for files of the server filesystem, like a "
+    "mounted volume, from their paths, `local://` urls, directories or globs",
+    dependencies=[Depends(admit_request)],
+)
+async def get_meta_data_from_filesystem(
+    source: FilesystemPaths,
+    stream: bool = Query(False, description=STREAM_DESCRIPTION),
+):
+    try:
+        file_paths = await run_in_thread(
+            resolve_filesystem_paths, source.paths, source.file_format
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=f"{e}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"{e}"
+        )
+    logger.info(f"Getting meta data for filesystem files: {len(file_paths)}")
+    if stream:
+        return get_streaming_response(
+            create_meta_data_for_local_files, file_paths
+        )
+    return await create_meta_data_for_local_files(file_paths)
+
+
 @router.post("/s3/files/list")
 async def list_bucket_objects(
     s3_bucket: str = Form(..., description="S3 bucket name"),
@@ -118,10 +260,14 @@ async def list_bucket_objects(
         None, description="S3 endpoint url"
     ),
     resource: Union[str, None] = Form(None, description="S3 resource"),
-    file_format: str = Form("csv", description="Format of the processed file"),
+    file_format: str = Form(
+        "csv",
+        description="Format of the processed files, one of csv, csv.gz, "
+        "csv.zst, parquet or feather",
+    ),
 ):
     try:
-        s3_resource = await get_s3_resource(
+        s3_client = await get_s3_client(
             s3_access_key=s3_access_key,
             s3_secret_key=s3_secret_key,
             s3_endpoint_url=s3_endpoint_url,
@@ -133,15 +279,15 @@ async def list_bucket_objects(
             detail=f"Error connecting to S3: {e}",
         )
     else:
-        objects = await get_list_of_s3_objects(s3_resource, s3_bucket, prefix)
+        objects = await get_list_of_s3_objects(s3_client, s3_bucket, prefix)
         objects_json = [
             {
-                "key": obj.key,
-                "last_modified": obj.last_modified,
-                "size": obj.size / 1e3,
+                "key": obj["Key"],
+                "last_modified": obj["LastModified"],
+                "size": obj["Size"] / 1e3,
             }
             for obj in objects
-            if obj.key.endswith(file_format)
+            if obj["Key"].endswith(file_format)
         ]
         return {
             "total": len(objects_json),
@@ -149,3 +295,23 @@ async def list_bucket_objects(
             "bucket": s3_bucket,
             "objects": objects_json,
         }
+
+
+@router.get(
+    "/cache",
+    description="Hit & miss counters of the meta-data result cache",
+)
+async def get_meta_data_cache_stats():
+    return get_meta_data_cache().stats()
+
+
+@router.get(
+    "/schemas",
+    description="Schema fingerprints of parsed datasets per S3 bucket or source type & their hit rates",
+)
+async def get_schema_stats(
+    scope: Union[str, None] = Query(
+        None, description="S3 bucket name or source type"
+    ),
+):
+    return get_schema_cache().stats(scope)
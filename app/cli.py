@@ -0,0 +1,304 @@
+"""Command line interface generating meta-data of datasets without HTTP.
+
+    meta-facts scan ./datasets --output meta_data.jsonl
+    meta-facts scan s3://bucket/prefix --format parquet --output meta_data
+
+Datasets are processed in parallel by the process pool, results are
+written in batches and names of the datasets written are appended to a
+checkpoint file, so that a scan run again resumes after them, and the output
+holds a record per dataset. Names of the datasets which failed are written
+to a separate failures file instead, replaced by every run, and are
+processed again by the next run.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from app.models.meta_data import MetaData
+
+OUTPUT_FORMATS = ("jsonl", "parquet")
+
+
+class Checkpoint:
+    """Names of the datasets processed by previous runs of a scan, kept as
+    a JSON string per line so that any S3 key or path can be recorded.
+    """
+
+    def __init__(self, path: str):
+        self.names = set()
+        if os.path.exists(path):
+            with open(path) as file:
+                self.names = {
+                    json.loads(line) for line in file if line.strip()
+                }
+        self.file = open(path, "a")
+
+    def add(self, names):
+        self.file.writelines(f"{json.dumps(name)}\n" for name in names)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JSONLWriter:
+    def __init__(self, path: str):
+        self.file = open(path, "a")
+
+    def write(self, records):
+        self.file.writelines(
+            f"{json.dumps(record, default=str)}\n" for record in records
+        )
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Write records as parquet files in the output directory, a file per
+    batch, as a parquet file can not be appended to by later batches or runs.
+    """
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            from pyarrow import parquet as pq
+        except ImportError:
+            raise SystemExit("pyarrow is required to write parquet output")
+
+        self.pa, self.pq = pa, pq
+        self.schema = pa.schema(
+            [("name", pa.string())]
+            + [
+                (name, pa.bool_() if field.type_ is bool else pa.string())
+                for name, field in MetaData.__fields__.items()
+                if name != "stages"
+            ]
+        )
+        self.directory = Path(path)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = f"part-{time.strftime('%Y%m%d%H%M%S')}"
+        self.parts = 0
+
+    def write(self, records):
+        table = self.pa.Table.from_pylist(records, schema=self.schema)
+        self.pq.write_table(
+            table, self.directory / f"{self.prefix}-{self.parts:05d}.parquet"
+        )
+        self.parts += 1
+
+    def close(self):
+        pass
+
+
+WRITERS = {"jsonl": JSONLWriter, "parquet": ParquetWriter}
+
+
+class ScanOutput:
+    """Observer of a scan writing meta-data of each processed dataset to the
+    output in batches, names of the datasets are added to the checkpoint
+    once their batch is written. Names of the datasets which failed are
+    written to the failures file rather than to the output.
+    """
+
+    def __init__(self, writer, checkpoint: Checkpoint, failures, batch_size):
+        self.writer = writer
+        self.checkpoint = checkpoint
+        self.failures = failures
+        self.batch_size = batch_size
+        self.records = []
+        self.started_at = time.perf_counter()
+        self.listed_count = 0
+        self.processed_count = 0
+        self.failed_count = 0
+
+    def listed(self, key):
+        self.listed_count += 1
+
+    def processed(self, key, meta_data, failed=False):
+        self.processed_count += 1
+        if failed:
+            self.failed_count += 1
+            self.failures.write(f"{json.dumps(key)}\n")
+            self.failures.flush()
+            return
+        # same fields & order as the meta-data of the HTTP responses
+        self.records.append(
+            {"name": key, **MetaData(**meta_data).dict(exclude_unset=True)}
+        )
+        if len(self.records) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.records:
+            return
+        self.writer.write(self.records)
+        self.checkpoint.add(record["name"] for record in self.records)
+        self.records = []
+        self.report()
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started_at
+        print(
+            f"{self.processed_count}/{self.listed_count} processed, "
+            f"{self.failed_count} failed, "
+            f"{self.processed_count / elapsed:.1f} datasets/s",
+            file=sys.stderr,
+        )
+
+
+async def scan(args, output: ScanOutput, skip_names):
+    # app modules are imported once the options are set as settings
+    from app.utils.common import get_files_from_directory
+    from app.utils.meta_data import (
+        create_meta_data_for_local_files,
+        create_meta_data_for_s3_bucket,
+    )
+    from app.utils.s3_files import get_s3_client
+
+    source = urlparse(args.source)
+    if source.scheme == "s3":
+        try:
+            s3_client = await get_s3_client(
+                s3_access_key=args.s3_access_key,
+                s3_secret_key=args.s3_secret_key,
+                s3_endpoint_url=args.s3_endpoint_url,
+                resource=None,
+            )
+        except ValueError as e:
+            raise SystemExit(f"{e}")
+        await create_meta_data_for_s3_bucket(
+            s3_client,
+            source.netloc,
+            source.path.lstrip("/"),
+            args.file_format,
+            observer=output,
+            skip_keys=skip_names,
+        )
+        return
+    file_paths = [
+        file_path
+        for file_path in await get_files_from_directory(
+            args.source, args.file_format
+        )
+        if file_path not in skip_names
+    ]
+    await create_meta_data_for_local_files(file_paths, observer=output)
+
+
+def run_scan(args):
+    if args.workers is not None:
+        os.environ["PROCESS_POOL_WORKERS"] = str(args.workers)
+    if args.concurrency is not None:
+        os.environ["DATASET_CONCURRENCY"] = str(args.concurrency)
+        os.environ["REQUEST_DATASET_CONCURRENCY"] = str(args.concurrency)
+    for name, value in [
+        ("S3_SOURCE_ENDPOINT_URL", args.s3_endpoint_url),
+        ("S3_SOURCE_ACCESS_KEY", args.s3_access_key),
+        ("S3_SOURCE_SECRET_KEY", args.s3_secret_key),
+    ]:
+        if value is not None:
+            os.environ[name] = value
+    from app.core.executor import shutdown_process_pool
+    from app.utils.schema import get_schema_cache
+
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output}.checkpoint")
+    if checkpoint.names:
+        print(
+            f"Resuming, {len(checkpoint.names)} datasets already processed",
+            file=sys.stderr,
+        )
+    writer = WRITERS[args.format](args.output)
+    # failures of previous runs are processed again, hence not kept
+    failures = open(args.failures or f"{args.output}.failed", "w")
+    output = ScanOutput(writer, checkpoint, failures, args.batch_size)
+    try:
+        asyncio.run(scan(args, output, frozenset(checkpoint.names)))
+    finally:
+        output.flush()
+        writer.close()
+        checkpoint.close()
+        failures.close()
+        shutdown_process_pool()
+        get_schema_cache().flush()
+    print(
+        f"Done, {output.processed_count} processed, "
+        f"{output.failed_count} failed in "
+        f"{time.perf_counter() - output.started_at:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if output.failed_count else 0
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog="meta-facts", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    scan_parser = commands.add_parser(
+        "scan",
+        help="generate meta-data of the datasets of a directory or S3 prefix",
+    )
+    scan_parser.add_argument(
+        "source", help="local directory or s3://bucket/prefix"
+    )
+    scan_parser.add_argument(
+        "--output",
+        default="meta_data.jsonl",
+        help="JSONL file, or directory of parquet files",
+    )
+    scan_parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="jsonl",
+    )
+    scan_parser.add_argument(
+        "--checkpoint",
+        help="file of processed datasets, <output>.checkpoint by default",
+    )
+    scan_parser.add_argument(
+        "--failures",
+        help="file of the datasets which failed, <output>.failed by default",
+    )
+    scan_parser.add_argument(
+        "--file-format",
+        default="csv",
+        help="suffix of the datasets, like csv, csv.gz or parquet",
+    )
+    scan_parser.add_argument(
+        "--workers", type=int, help="worker processes, all cores by default"
+    )
+    scan_parser.add_argument(
+        "--concurrency", type=int, help="datasets processed at once"
+    )
+    scan_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="datasets written & checkpointed at once",
+    )
+    scan_parser.add_argument("--s3-endpoint-url")
+    scan_parser.add_argument("--s3-access-key")
+    scan_parser.add_argument("--s3-secret-key")
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s"
+    )
+    if args.command == "scan":
+        return run_scan(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+
+from fastapi import HTTPException, status
+
+from app.core.config import Settings
+
+settings = Settings()
+
+dataset_scheduler = None
+
+
+class DatasetScheduler:
+    """Process wide limits of datasets downloaded & parsed at once.
+
+    A dataset takes one of `DATASET_CONCURRENCY` slots and its expected size
+    in memory from the in-flight bytes budget, which is the size of the
+    object capped at the streaming threshold, as larger files are streamed
+    from disk. A dataset larger than the budget runs when no other does.
+    """
+
+    def __init__(
+        self, concurrency, bytes_budget, max_active_requests, max_queued
+    ):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.bytes_budget = bytes_budget
+        self.in_flight_bytes = 0
+        self.bytes_released = asyncio.Condition()
+        self.max_active_requests = max_active_requests
+        self.max_queued = max_queued
+        self.active_requests = 0
+        self.queued_datasets = 0
+
+    def get_weight(self, size=None) -> int:
+        if size is None:
+            size = settings.STREAMING_THRESHOLD_BYTES
+        return min(size, settings.STREAMING_THRESHOLD_BYTES, self.bytes_budget)
+
+    @contextmanager
+    def admit(self):
+        """Admit a request processing many datasets, raise 429 when too
+        many of them are running & 503 when too many datasets are queued.
+        """
+        headers = {"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+        if self.active_requests >= self.max_active_requests:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests are being processed",
+                headers=headers,
+            )
+        if self.queued_datasets >= self.max_queued:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many datasets are waiting to be processed",
+                headers=headers,
+            )
+        self.active_requests += 1
+        try:
+            yield
+        finally:
+            self.active_requests -= 1
+
+    @asynccontextmanager
+    async def reserve(self, size=None):
+        """Wait for a slot & the expected size of a dataset in the budget."""
+        weight = self.get_weight(size)
+        async with self.slots:
+            async with self.bytes_released:
+                await self.bytes_released.wait_for(
+                    lambda: self.in_flight_bytes == 0
+                    or self.in_flight_bytes + weight <= self.bytes_budget
+                )
+                self.in_flight_bytes += weight
+            try:
+                yield
+            finally:
+                async with self.bytes_released:
+                    self.in_flight_bytes -= weight
+                    self.bytes_released.notify_all()
+
+    def limiter(self):
+        return RequestLimiter(self, settings.REQUEST_DATASET_CONCURRENCY)
+
+
+class RequestLimiter:
+    """Limit of datasets processed at once for a single request or job, on
+    top of the process wide limits of the scheduler.
+    """
+
+    def __init__(self, scheduler: DatasetScheduler, concurrency: int):
+        self.scheduler = scheduler
+        self.concurrency = concurrency
+        self.slots = asyncio.Semaphore(concurrency)
+
+    async def run(self, coroutine, size=None):
+        """Await coroutine processing a dataset of `size` bytes, if known,
+        once it is within the limits.
+        """
+        self.scheduler.queued_datasets += 1
+        queued = True
+        try:
+            async with self.slots, self.scheduler.reserve(size):
+                self.scheduler.queued_datasets -= 1
+                queued = False
+                return await coroutine
+        finally:
+            if queued:
+                self.scheduler.queued_datasets -= 1
+            # coroutine of a cancelled task is never awaited
+            coroutine.close()
+
+    async def run_all(self, datasets, collect=True):
+        """Run coroutines of an async iterable of `(coroutine, size)` pairs,
+        taking the next pair only while fewer than twice the concurrency of
+        the request are queued or running, so that a listing of any length
+        is consumed as its datasets are processed.
+
+        Returns results in the order of the iterable, none of them when
+        `collect` is false, like when an observer is handed each result.
+        """
+        window = asyncio.Semaphore(2 * self.concurrency)
+        tasks, results, errors = set(), {}, []
+
+        def done(index, task):
+            tasks.discard(task)
+            window.release()
+            if task.cancelled():
+                return
+            if task.exception() is not None:
+                errors.append(task.exception())
+            elif collect:
+                results[index] = task.result()
+
+        try:
+            index = 0
+            async for coroutine, size in datasets:
+                try:
+                    await window.acquire()
+                except BaseException:
+                    coroutine.close()
+                    raise
+                if errors:
+                    coroutine.close()
+                    break
+                task = asyncio.ensure_future(self.run(coroutine, size=size))
+                tasks.add(task)
+                task.add_done_callback(partial(done, index))
+                index += 1
+            while tasks and not errors:
+                await asyncio.wait(tasks)
+            if errors:
+                raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+        return [results[index] for index in sorted(results)]
+
+
+def get_dataset_scheduler():
+    """Return the scheduler of the process, created on first use."""
+    global dataset_scheduler
+    if dataset_scheduler is None:
+        dataset_scheduler = DatasetScheduler(
+            settings.DATASET_CONCURRENCY,
+            settings.IN_FLIGHT_BYTES_BUDGET,
+            settings.MAX_ACTIVE_REQUESTS,
+            settings.MAX_QUEUED_DATASETS,
+        )
+    return dataset_scheduler
+
+
+async def admit_request():
+    """Dependency of the routes processing many datasets."""
+    with get_dataset_scheduler().admit():
+        yield
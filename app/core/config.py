@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseSettings
 
@@ -16,11 +16,97 @@ class Settings(BaseSettings):
     CORS_ALLOWED_CREDENTIALS: bool = True
     CORS_HEADERS: List[str] = ["*"]
 
-    # Dataset source configurations
-    S3_SOURCE_ACCESS_KEY: str = ...
-    S3_SOURCE_SECRET_KEY: str = ...
-    S3_SOURCE_ENDPOINT_URL: str = ...
+    # Dataset source configurations, S3 credentials are needed only by the
+    # routes & scans of S3 sources, when they are not given with the request
+    S3_SOURCE_ACCESS_KEY: Optional[str] = None
+    S3_SOURCE_SECRET_KEY: Optional[str] = None
+    S3_SOURCE_ENDPOINT_URL: Optional[str] = None
     S3_SOURCE_RESOURCE: str = "S3"
+    # Maximum S3 objects downloaded at once, also size of connection pool
+    S3_MAX_CONCURRENCY: int = 16
+    # Directories, like mounted volumes, whose files are processed from
+    # their server-side paths, paths outside of them are rejected
+    FILESYSTEM_ROOTS: List[str] = []
+
+    # Streaming configurations, files larger than the threshold are parsed
+    # in chunks of rows, so memory usage does not depend on the file size
+    STREAMING_THRESHOLD_BYTES: int = 128 * 1024 * 1024
+    STREAMING_CHUNK_ROWS: int = 100_000
+    STREAMING_READ_BYTES: int = 1024 * 1024
+
+    # CSV parser, `c` is the pandas C parser, `arrow` the native pyarrow
+    # reader parsing blocks of a file in threads & `pyarrow` the pandas
+    # pyarrow engine (slower as its typed values are converted back to text),
+    # files which pyarrow can not read are parsed by the C parser instead
+    CSV_PARSER: str = "c"
+    CSV_PARSER_USE_THREADS: bool = True
+
+    # HTTP session shared by URL downloads, connections are kept alive and
+    # reused by downloads from the same host. Requests failing with a 5xx
+    # status, timeout or dropped connection are retried with backoff
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 16
+    HTTP_KEEPALIVE_SECONDS: float = 30
+    HTTP_DNS_CACHE_SECONDS: int = 300
+    HTTP_TIMEOUT_SECONDS: Optional[float] = 600
+    HTTP_CONNECT_TIMEOUT_SECONDS: Optional[float] = 10
+    HTTP_RETRIES: int = 3
+    HTTP_RETRY_BACKOFF_SECONDS: float = 0.5
+
+    # Remote csv files are sampled first with a range request of this size,
+    # rest of the file is fetched only if values of its columns are needed,
+    # 0 fetches complete files at once
+    RANGE_SAMPLE_BYTES: int = 1024 * 1024
+
+    # Encoding detection, head of a file validated as UTF-8 & the size of
+    # samples from head, middle & tail used to detect other charsets
+    ENCODING_SAMPLE_BYTES: int = 64 * 1024
+    ENCODING_DETECTION_SAMPLE_BYTES: int = 4 * 1024
+
+    # Admission control of routes processing many datasets. Datasets are
+    # processed at most `DATASET_CONCURRENCY` at once in the process and
+    # `REQUEST_DATASET_CONCURRENCY` per request, while their expected size
+    # in memory is within the in-flight bytes budget. Requests beyond
+    # `MAX_ACTIVE_REQUESTS` get 429 and while more than `MAX_QUEUED_DATASETS`
+    # datasets wait 503, both with a `Retry-After` header
+    DATASET_CONCURRENCY: int = 16
+    REQUEST_DATASET_CONCURRENCY: int = 8
+    IN_FLIGHT_BYTES_BUDGET: int = 1024 * 1024 * 1024
+    MAX_ACTIVE_REQUESTS: int = 32
+    MAX_QUEUED_DATASETS: int = 10_000
+    ADMISSION_RETRY_AFTER_SECONDS: int = 30
+
+    # Number of worker processes used to parse datasets & extract meta-data,
+    # `None` uses all the cores and 0 runs them in threads of the server
+    PROCESS_POOL_WORKERS: Optional[int] = None
+
+    # Meta-data result cache, backend is one of `memory`, `sqlite` or `none`
+    META_DATA_CACHE_BACKEND: str = "memory"
+    META_DATA_CACHE_SIZE: int = 10_000
+    META_DATA_CACHE_PATH: str = "meta_data_cache.sqlite3"
+
+    # Plans of dataset schemas (column mapping, granularity & projection),
+    # backend is one of `sqlite`, shared by worker processes, `memory` or
+    # `none`, fingerprint usage is shared only with `sqlite` backend
+    SCHEMA_CACHE_BACKEND: str = "sqlite"
+    SCHEMA_CACHE_SIZE: int = 1000
+    SCHEMA_CACHE_PATH: str = "schema_cache.sqlite3"
+
+    # State of previous S3 bucket scans used by incremental scans
+    SCAN_MANIFEST_PATH: str = "scan_manifest.sqlite3"
+
+    # Metrics of processed datasets are exposed on `/metrics`, with debug
+    # stage timings in seconds are also returned in meta-data of each file
+    METRICS_DEBUG_STAGES: bool = False
+
+    # Background jobs, number of jobs running at once & finished jobs kept.
+    # Results of jobs are kept in SQLite rather than in memory, written in
+    # batches & read a page at a time
+    JOB_WORKERS: int = 2
+    JOB_HISTORY_SIZE: int = 100
+    JOB_RESULTS_PATH: str = "job_results.sqlite3"
+    JOB_RESULTS_BATCH_SIZE: int = 500
+    JOB_RESULTS_PAGE_SIZE: int = 1000
 
     class Config:
         env_file = ".env"
@@ -42,6 +128,38 @@ class DateTimeSettings(BaseSettings):
     MONTH_FORMAT = "%B"
     DATE_FORMAT = "%d-%m-%Y"
     ALL_YEAR_FORMATS = r"^\d{4}$|^\d{4}-\d{2,4}$"
+    # Candidate formats of date, month & quarter columns in priority order,
+    # format of a column is inferred from a sample of its unique values
+    DATE_FORMATS = [
+        DATE_FORMAT,
+        "%Y-%m-%d",
+        "%d/%m/%Y",
+        "%m/%d/%Y",
+        "%Y/%m/%d",
+        "%d.%m.%Y",
+        "%d-%b-%Y",
+        "%d %b %Y",
+        "%d %B %Y",
+        "%Y%m%d",
+    ]
+    MONTH_FORMATS = [
+        f"{MONTH_FORMAT} %Y",
+        "%b %Y",
+        f"{MONTH_FORMAT}-%Y",
+        "%b-%Y",
+        "%b-%y",
+        "%Y-%m",
+        "%m-%Y",
+        "%m/%Y",
+    ]
+    QUARTER_FORMATS = [
+        rf"^(?P<quarter>{QUARTER_FORMAT})[\s_-]*(?P<year>\d{{4}})$",
+        rf"^(?P<year>\d{{4}})[\s_-]*(?P<quarter>{QUARTER_FORMAT})$",
+    ]
+    # Unique values sampled to infer a format & the share of them which
+    # should be parsed by the format
+    DATE_FORMAT_SAMPLE_SIZE = 100
+    DATE_FORMAT_MIN_MATCH = 0.9
     GRANULARITY_ORDER = {
         1: ["date"],
         2: ["week"],
@@ -83,6 +201,11 @@ class GeographySettings(BaseSettings):
         "state": "States",
         "district": "Districts",
     }
+    # Distinct values of a geography column kept exactly, beyond which they
+    # are counted by a HyperLogLog sketch with `2 ** PRECISION` registers,
+    # relative error of the count is about `1.04 / sqrt(2 ** PRECISION)`
+    DISTINCT_COUNT_EXACT_THRESHOLD = 1000
+    DISTINCT_COUNT_PRECISION = 12
 
 
 class OtherSettings(BaseSettings):
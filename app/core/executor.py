@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+from app.core.config import Settings
+
+settings = Settings()
+
+process_pool = None
+
+
+def get_process_pool():
+    """Return the process pool shared by all requests, created on first use.
+
+    Returns None when `PROCESS_POOL_WORKERS` is 0, in that case work is run
+    in the default thread pool of the event loop.
+    """
+    global process_pool
+    if process_pool is None and settings.PROCESS_POOL_WORKERS != 0:
+        # workers are spawned, as forking the server process would also copy
+        # the state of its event loop & threads into the workers
+        process_pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESS_POOL_WORKERS,
+            mp_context=get_context("spawn"),
+        )
+    return process_pool
+
+
+def shutdown_process_pool():
+    global process_pool
+    if process_pool is not None:
+        process_pool.shutdown(wait=True)
+        process_pool = None
+
+
+async def run_in_process(func, *args, **kwargs):
+    """Run CPU bound `func` in a worker process without blocking the event
+    loop, arguments & return value of `func` must be picklable.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(), partial(func, *args, **kwargs)
+    )
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """Run blocking I/O bound `func` in the default thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
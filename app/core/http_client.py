@@ -0,0 +1,72 @@
+import asyncio
+
+from aiohttp import (
+    ClientConnectionError,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+)
+from fastapi.logger import logger
+
+from app.core.config import Settings
+
+settings = Settings()
+
+http_session = None
+
+
+def get_http_session():
+    """Return the HTTP session shared by all requests, created on first use.
+
+    Connections are kept alive & reused by downloads from the same host, at
+    most `HTTP_MAX_CONNECTIONS_PER_HOST` of them at once.
+    """
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = TCPConnector(
+            limit=settings.HTTP_MAX_CONNECTIONS,
+            limit_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+        )
+        http_session = ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(
+                total=settings.HTTP_TIMEOUT_SECONDS,
+                connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+    return http_session
+
+
+async def close_http_session():
+    global http_session
+    if http_session is not None:
+        await http_session.close()
+        http_session = None
+
+
+def is_retryable(error: Exception) -> bool:
+    # server errors, timeouts & dropped connections are transient, while
+    # client errors like 404 fail the same way when retried
+    if isinstance(error, ClientResponseError):
+        return error.status >= 500
+    return isinstance(error, (asyncio.TimeoutError, ClientConnectionError))
+
+
+async def with_retries(request, *args, **kwargs):
+    """Await `request(*args, **kwargs)`, retrying it after transient errors
+    at most `HTTP_RETRIES` times with exponential backoff.
+    """
+    for attempt in range(settings.HTTP_RETRIES + 1):
+        try:
+            return await request(*args, **kwargs)
+        except Exception as e:
+            if attempt == settings.HTTP_RETRIES or not is_retryable(e):
+                raise
+            delay = settings.HTTP_RETRY_BACKOFF_SECONDS * 2**attempt
+            logger.warning(
+                f"Retrying request in {delay}s due to {type(e).__name__}: {e}"
+            )
+        await asyncio.sleep(delay)
@@ -0,0 +1,270 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4"
+
+# Upper bounds in seconds of the buckets of stage latency histograms
+STAGE_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    300,
+)
+
+stage_recorder = ContextVar("stage_recorder", default=None)
+
+
+def format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        for value in labels.values()
+    )
+    pairs = ",".join(
+        f'{name}="{value}"' for name, value in zip(labels, escaped)
+    )
+    return f"{{{pairs}}}"
+
+
+class Metric:
+    """Metric of a type with values per combination of label values,
+    rendered in the Prometheus text exposition format.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = Lock()
+        self.values = {}
+
+    def get_key(self, labels: dict):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self.lock:
+            lines.extend(
+                f"{name}{format_labels(labels)} {format_value(value)}"
+                for name, labels, value in self.samples()
+            )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self.get_key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        for key, (counts, total) in sorted(self.values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": format_value(bound)},
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(
+    Histogram(
+        "meta_facts_stage_seconds",
+        "Time spent in each stage of processing a dataset",
+        ["source_type", "stage"],
+        STAGE_BUCKETS,
+    )
+)
+BYTES_READ = registry.register(
+    Counter(
+        "meta_facts_bytes_read_total",
+        "Bytes of datasets read",
+        ["source_type"],
+    )
+)
+ROWS_PARSED = registry.register(
+    Counter(
+        "meta_facts_rows_parsed_total",
+        "Rows of datasets parsed",
+        ["source_type"],
+    )
+)
+DATASETS = registry.register(
+    Counter(
+        "meta_facts_datasets_total",
+        "Datasets by result, processed, failed or found in the cache",
+        ["source_type", "result"],
+    )
+)
+CACHE_REQUESTS = registry.register(
+    Counter(
+        "meta_facts_cache_requests_total",
+        "Lookups of meta-data & schema caches by result, hit or miss",
+        ["cache", "source_type", "result"],
+    )
+)
+SCHEDULER_STATE = registry.register(
+    Gauge(
+        "meta_facts_scheduler",
+        "Active requests, queued datasets & in-flight bytes of the scheduler",
+        ["state"],
+    )
+)
+
+
+class StageRecorder:
+    """Durations of the stages of processing a dataset and its counts, like
+    bytes read, recorded by the process running the stages & returned to
+    the server, where they are added to the metrics.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counts = {}
+
+    def to_dict(self):
+        return {"stages": dict(self.stages), "counts": dict(self.counts)}
+
+
+@contextmanager
+def start_recording():
+    recorder = StageRecorder()
+    token = stage_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        stage_recorder.reset(token)
+
+
+@contextmanager
+def record_stage(stage: str):
+    """Add the time spent in the block, or a decorated function, to the
+    stage of the dataset being processed, if it is being recorded.
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder = stage_recorder.get()
+        if recorder is not None:
+            elapsed = time.perf_counter() - started_at
+            recorder.stages[stage] = recorder.stages.get(stage, 0) + elapsed
+
+
+async def timed(stage: str, awaitable):
+    with record_stage(stage):
+        return await awaitable
+
+
+def record_count(name: str, value: int = 1):
+    recorder = stage_recorder.get()
+    if recorder is not None:
+        recorder.counts[name] = recorder.counts.get(name, 0) + value
+
+
+def record_dataset(source_type: str, stats: dict):
+    """Add stage timings & counts of a processed dataset to the metrics."""
+    for stage, seconds in stats["stages"].items():
+        STAGE_SECONDS.observe(seconds, source_type=source_type, stage=stage)
+    counts = stats["counts"]
+    BYTES_READ.inc(counts.get("bytes_read", 0), source_type=source_type)
+    ROWS_PARSED.inc(counts.get("rows_parsed", 0), source_type=source_type)
+    for result in ("hit", "miss"):
+        if f"schema_cache_{result}" in counts:
+            CACHE_REQUESTS.inc(
+                counts[f"schema_cache_{result}"],
+                cache="schema",
+                source_type=source_type,
+                result=result,
+            )
+    DATASETS.inc(source_type=source_type, result="processed")
+
+
+def record_failure(source_type: str):
+    DATASETS.inc(source_type=source_type, result="failed")
+
+
+def record_cache_lookup(source_type: str, hit: bool):
+    CACHE_REQUESTS.inc(
+        cache="meta_data",
+        source_type=source_type,
+        result="hit" if hit else "miss",
+    )
+    if hit:
+        DATASETS.inc(source_type=source_type, result="cached")
@@ -1,8 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.api.api_v1.routers.jobs import jobs_router
 from app.api.api_v1.routers.meta_data import meta_data_router
+from app.core.admission import get_dataset_scheduler
 from app.core.config import Settings
+from app.core.executor import shutdown_process_pool
+from app.core.http_client import close_http_session, get_http_session
+from app.core.metrics import PROMETHEUS_MEDIA_TYPE, SCHEDULER_STATE, registry
+from app.utils.jobs import get_job_manager, stop_job_manager
+from app.utils.schema import get_schema_cache
 
 settings = Settings()
 
@@ -19,13 +27,47 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def startup():
+    get_http_session()
+    get_job_manager()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_job_manager()
+    await close_http_session()
+    shutdown_process_pool()
+    get_schema_cache().flush()
+
+
 @app.get(settings.API_V1_STR)
 async def root():
     return {"message": "Server is up"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage latencies, bytes read, rows parsed, cache hits & failures per
+    source type, in the Prometheus text format.
+    """
+    scheduler = get_dataset_scheduler()
+    SCHEDULER_STATE.set(scheduler.active_requests, state="active_requests")
+    SCHEDULER_STATE.set(scheduler.queued_datasets, state="queued_datasets")
+    SCHEDULER_STATE.set(scheduler.in_flight_bytes, state="in_flight_bytes")
+    return PlainTextResponse(
+        registry.render(), media_type=PROMETHEUS_MEDIA_TYPE
+    )
+
+
 app.include_router(
     meta_data_router.router,
     tags=["Meta-Data"],
     prefix="/meta-data",
 )
+
+app.include_router(
+    jobs_router.router,
+    tags=["Jobs"],
+    prefix="/jobs",
+)
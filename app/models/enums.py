@@ -4,3 +4,13 @@ from enum import Enum
 class SourceType(str, Enum):
     S3 = "S3"
     LOCAL = "LOCAL"
+    URL = "URL"
+    FILESYSTEM = "FILESYSTEM"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
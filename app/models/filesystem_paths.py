@@ -0,0 +1,24 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class FilesystemPaths(BaseModel):
+    paths: List[str] = Field(...)
+    file_format: str = Field(
+        "csv",
+        description="Format of the files of directories, one of csv, "
+        "csv.gz, csv.zst, parquet or feather",
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "paths": [
+                    "local:///data/projects/rice/2015/output.csv",
+                    "/data/projects/rice/**/output.csv",
+                    "/data/projects/wheat",
+                ],
+                "file_format": "csv",
+            }
+        }
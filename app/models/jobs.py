@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.enums import JobStatus
+from app.models.meta_data import MetaData
+
+
+class Job(BaseModel):
+    id: str
+    status: JobStatus
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    objects_listed: int = 0
+    objects_processed: int = 0
+    objects_failed: int = 0
+    throughput: Optional[float] = Field(
+        None, description="Objects processed per second"
+    )
+    error: Optional[str]
+
+
+class JobResults(BaseModel):
+    id: str
+    status: JobStatus
+    offset: int
+    total: int
+    results: Dict[str, MetaData]
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import BaseModel
 
@@ -11,6 +11,8 @@ class MetaData(BaseModel):
     spatial_coverage: Optional[str]
     formats_available: Optional[str]
     is_public: Optional[bool]
+    # seconds spent in each stage, only set with `METRICS_DEBUG_STAGES`
+    stages: Optional[Dict[str, float]]
 
     class Config:
         order = True
@@ -0,0 +1,226 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+
+from app.core.config import (
+    DateTimeSettings,
+    GeographySettings,
+    NoteSettings,
+    OtherSettings,
+    Settings,
+    UnitSettings,
+)
+
+settings = Settings()
+
+# Seconds a connection waits for the lock of a SQLite file held by another
+SQLITE_BUSY_TIMEOUT_SECONDS = 10
+
+# Bump when the extractors change in a way that changes their output
+META_DATA_VERSION = 4
+
+
+def get_cache_version():
+    """Version of the meta-data rules, changes whenever any of the column
+    mapping, granularity or coverage settings is changed.
+    """
+    rules = {
+        "version": META_DATA_VERSION,
+        "datetime": DateTimeSettings().dict(),
+        "geography": GeographySettings().dict(),
+        "other": OtherSettings().dict(),
+        "unit": UnitSettings().dict(),
+        "note": NoteSettings().dict(),
+    }
+    return sha256(
+        json.dumps(rules, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+
+
+class LRUCache:
+    """In-memory cache which evicts the least recently used entries."""
+
+    backend = "memory"
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        if key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def set(self, key: str, value: dict):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "size": len(self),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def connect_sqlite(path: str):
+    """Connect to SQLite file shared by the server & worker processes.
+
+    With the write-ahead log readers are not blocked by a writer, and a
+    writer waits for the lock of another one rather than failing at once.
+    """
+    connection = sqlite3.connect(
+        path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False
+    )
+    if path != ":memory:":
+        connection.execute("PRAGMA journal_mode=WAL")
+    return connection
+
+
+class SQLiteCache(LRUCache):
+    """On-disk cache which persists entries across restarts & processes,
+    entries are kept as json and least recently used are evicted.
+
+    Reads do not write, access times of the entries read are updated in
+    batches, at most every `TOUCH_SECONDS`, so that processes sharing the
+    file mostly read it.
+    """
+
+    backend = "sqlite"
+    TOUCH_SECONDS = 30
+
+    def __init__(self, path: str, max_size: int, table: str = "meta_data"):
+        super().__init__(max_size)
+        self.table = table
+        self.lock = Lock()
+        self.accessed = {}
+        self.touched_at = time.monotonic()
+        self.connection = connect_sqlite(path)
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT, accessed_at REAL)"
+            )
+
+    def get(self, key: str):
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.accessed[key] = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if time.monotonic() - self.touched_at >= self.TOUCH_SECONDS:
+            self.touch()
+        return json.loads(row[0])
+
+    def touch(self):
+        """Write access times of the entries read since the last batch, an
+        entry evicted meanwhile is not added back.
+        """
+        with self.lock:
+            accessed, self.accessed = self.accessed, {}
+            self.touched_at = time.monotonic()
+            if not accessed:
+                return
+            with self.connection:
+                self.connection.executemany(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    [
+                        (accessed_at, key)
+                        for key, accessed_at in accessed.items()
+                    ],
+                )
+
+    def set(self, key: str, value: dict):
+        # entries read recently must not be evicted for this one
+        self.touch()
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            self.connection.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM "
+                f"{self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                f"SELECT COUNT(*) FROM {self.table}"
+            ).fetchone()[0]
+
+
+class MetaDataCache:
+    """Meta-data results keyed on the identity & version of a dataset source.
+
+    Keys include the version of the meta-data rules, hence entries created
+    with older settings are never returned and age out of the backend.
+    Sources whose version is unknown (a `None` key part) are not cached.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.version = get_cache_version()
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def make_key(self, *parts):
+        key = json.dumps([self.version, *parts], default=str)
+        return sha256(key.encode()).hexdigest()
+
+    def get(self, *parts):
+        if not self.enabled or None in parts:
+            return None
+        return self.backend.get(self.make_key(*parts))
+
+    def set(self, meta_data: dict, *parts):
+        if not self.enabled or None in parts:
+            return
+        self.backend.set(self.make_key(*parts), meta_data)
+
+    def stats(self):
+        if not self.enabled:
+            return {"backend": None}
+        return {"version": self.version, **self.backend.stats()}
+
+
+meta_data_cache = None
+
+
+def get_meta_data_cache():
+    """Return the meta-data cache of the server, created on first use."""
+    global meta_data_cache
+    if meta_data_cache is None:
+        if settings.META_DATA_CACHE_BACKEND == "sqlite":
+            backend = SQLiteCache(
+                settings.META_DATA_CACHE_PATH, settings.META_DATA_CACHE_SIZE
+            )
+        elif settings.META_DATA_CACHE_BACKEND == "memory":
+            backend = LRUCache(settings.META_DATA_CACHE_SIZE)
+        else:
+            backend = None
+        meta_data_cache = MetaDataCache(backend)
+    return meta_data_cache
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+from app.utils.parsers import to_text
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import feather
+    from pyarrow import parquet as pq
+except ImportError:
+    pa = None
+
+
+def open_arrow_source(source):
+    """Return arrow readable file of the content of a file without copying
+    it, or the path of a local file which is memory mapped by readers.
+    """
+    if pa is None:
+        raise ValueError("pyarrow is required to read parquet & feather files")
+    return pa.BufferReader(source) if isinstance(source, bytes) else source
+
+
+def to_text_values(values: pd.Series) -> pd.Series:
+    # values as the text read from a csv, with missing values as NaN
+    text = to_text(values)
+    return text.astype(object).where(text.notna(), np.nan)
+
+
+def get_unique_array_values(column) -> pd.Series:
+    """Unique values of an arrow column as text, null included.
+
+    Dictionary encoded chunks are reduced to the dictionary values their
+    indices refer to, without decoding a value for every row.
+    """
+    arrays = []
+    for chunk in column.chunks:
+        if pa.types.is_dictionary(chunk.type):
+            arrays.append(chunk.dictionary.take(pc.unique(chunk.indices)))
+        else:
+            arrays.append(chunk.unique())
+    if not arrays:
+        return pd.Series([], dtype=object)
+    return pd.concat(
+        [to_text_values(array.to_pandas()) for array in arrays],
+        ignore_index=True,
+    ).drop_duplicates()
+
+
+class ParquetReader:
+    """Unique values of parquet columns, from the footer where possible.
+
+    Row groups whose statistics show a single value of a column, like the
+    year of datasets partitioned by year, are not read. Other row groups
+    read only the column, string columns being read dictionary encoded.
+    """
+
+    def __init__(self, source):
+        source = open_arrow_source(source)
+        parquet_file = pq.ParquetFile(
+            source, memory_map=isinstance(source, str)
+        )
+        self.header = pd.Index(parquet_file.schema_arrow.names)
+        self.num_rows = parquet_file.metadata.num_rows
+        self.parquet_file = pq.ParquetFile(
+            source,
+            metadata=parquet_file.metadata,
+            memory_map=isinstance(source, str),
+            read_dictionary=list(self.header),
+        )
+        schema = parquet_file.schema
+        # statistics of nested columns are of their leaves, hence not used
+        self.column_indices = {
+            schema.column(idx).path: idx for idx in range(len(schema))
+        }
+
+    def get_statistics_values(self, row_group, column):
+        """Return unique values of a column in a row group known from its
+        statistics, None if they have to be read.
+        """
+        if column not in self.column_indices:
+            return None
+        metadata = self.parquet_file.metadata.row_group(row_group)
+        statistics = metadata.column(self.column_indices[column]).statistics
+        if statistics is None or not statistics.has_null_count:
+            return None
+        nulls = pd.Series(
+            [np.nan] if statistics.null_count else [], dtype=object
+        )
+        if statistics.null_count == metadata.num_rows:
+            return nulls
+        if statistics.has_min_max and statistics.min == statistics.max:
+            values = to_text_values(pd.Series([statistics.min]))
+            return pd.concat([values, nulls], ignore_index=True)
+        return None
+
+    def get_row_group_values(self, row_group, column):
+        values = self.get_statistics_values(row_group, column)
+        if values is None:
+            table = self.parquet_file.read_row_group(
+                row_group, columns=[column]
+            )
+            values = get_unique_array_values(table.column(0))
+        return values
+
+    def iter_unique_values(self, columns):
+        """Yield unique values of the columns in each row group."""
+        for row_group in range(self.parquet_file.num_row_groups):
+            yield {
+                column: self.get_row_group_values(row_group, column)
+                for column in columns
+            }
+
+
+class FeatherReader:
+    """Unique values of feather (Arrow IPC) columns, reading only them."""
+
+    def __init__(self, source):
+        self.source = open_arrow_source(source)
+        if isinstance(self.source, str):
+            with pa.memory_map(self.source) as file:
+                schema = pa.ipc.open_file(file).schema
+        else:
+            schema = pa.ipc.open_file(self.source).schema
+        self.header = pd.Index(schema.names)
+        # number of rows is known once the columns are read
+        self.num_rows = 0
+
+    def iter_unique_values(self, columns):
+        if not columns:
+            return
+        table = feather.read_table(
+            self.source,
+            columns=list(columns),
+            memory_map=isinstance(self.source, str),
+        )
+        self.num_rows = table.num_rows
+        yield {
+            column: get_unique_array_values(table.column(column))
+            for column in columns
+        }
+
+
+COLUMNAR_READERS = {"parquet": ParquetReader, "feather": FeatherReader}
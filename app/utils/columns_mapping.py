@@ -8,6 +8,7 @@ from app.core.config import (
     OtherSettings,
     UnitSettings,
 )
+from app.utils.cache import LRUCache
 
 datetime_settings = DateTimeSettings()
 geography_settings = GeographySettings()
@@ -16,161 +17,173 @@ note_settings = NoteSettings()
 other_settings = OtherSettings()
 
 
-def extract_pattern_from_columns(
-    columns: set,
-    pattern,
-):
-    matched_columns = set(filter(pattern.match, columns))
-    return matched_columns, columns.difference(matched_columns)
-
-
-async def find_other_granular_columns(columns: set):
-    airline_pattern = re.compile(
-        r".*({})".format(other_settings.AIRLINE_KEYWORD)
-    )
-    airport_pattern = re.compile(
-        r".*({})".format(other_settings.AIRPORT_KEYWORD)
-    )
-    language_pattern = re.compile(
-        r".*({})".format(other_settings.LANGUAGE_KEYWORD)
-    )
-    crop_pattern = re.compile(r".*({})".format(other_settings.CROPS_KEYWORD))
-    gender_pattern = re.compile(
-        r".*({})".format(other_settings.AIRPORT_KEYWORD)
-    )
-
-    airline_columns, columns = extract_pattern_from_columns(
-        columns, airline_pattern
-    )
-    airport_columns, columns = extract_pattern_from_columns(
-        columns, airport_pattern
-    )
-    language_columns, columns = extract_pattern_from_columns(
-        columns, language_pattern
-    )
-    crop_columns, columns = extract_pattern_from_columns(columns, crop_pattern)
-    gender_columns, columns = extract_pattern_from_columns(
-        columns, gender_pattern
-    )
+def get_column_rules():
+    """Rules of the column classifier, grouped by the entity they classify.
 
+    Within a group rules are in priority order, a column is classified by
+    the first rule matching it, while each group classifies independently.
+    """
+    date_keyword = datetime_settings.DATE_KEYWORD
     return {
-        "airline": airline_columns,
-        "airport": airport_columns,
-        "language": language_columns,
-        "crop": crop_columns,
-        "gender": gender_columns,
+        "datetime": [
+            ("fiscal_year", f".*({datetime_settings.FISCAL_YEAR_KEYWORD})"),
+            (
+                "academic_year",
+                f".*({datetime_settings.ACADEMIC_YEAR_KEYWORD})",
+            ),
+            (
+                "calender_year",
+                f".*({datetime_settings.CALENDAR_YEAR_KEYWORD})",
+            ),
+            ("other_year", f".*({datetime_settings.OTHER_YEAR_KEYWORD})"),
+            ("quarter", f".*({datetime_settings.QUARTER_KEYWORD})"),
+            ("month", f".*({datetime_settings.MONTH_KEYWORD})"),
+            (
+                "date",
+                f"^.*(?:^|_){date_keyword}s?(?:_|$)"
+                f"|^.*(?:^|_){date_keyword}(?:_|$)",
+            ),
+        ],
+        "geography": [
+            ("country", f".*({geography_settings.COUNTRY_KEYWORD})"),
+            ("state", f".*({geography_settings.STATE_KEYWORD})"),
+            ("district", f".*({geography_settings.DISTRICT_KEYWORD})"),
+        ],
+        "other": [
+            ("airline", f".*({other_settings.AIRLINE_KEYWORD})"),
+            ("airport", f".*({other_settings.AIRPORT_KEYWORD})"),
+            ("language", f".*({other_settings.LANGUAGE_KEYWORD})"),
+            ("crop", f".*({other_settings.CROPS_KEYWORD})"),
+            ("gender", f".*({other_settings.GENDER_KEYWORD})"),
+        ],
+        "unit": [("unit", f"({unit_settings.UNIT_KEYWORD})")],
+        "note": [("note", f"({note_settings.NOTE_KEYWORD})")],
     }
 
 
-async def find_datetime_columns(columns: set):
-    fiscal_year_pattern = re.compile(
-        r".*({})".format(
-            datetime_settings.FISCAL_YEAR_KEYWORD,
+class ColumnClassifier:
+    """Classify columns of a header into date-time, geography, other
+    granular, unit & note columns in a single pass over the header.
+
+    Rules of each group are compiled once into a single alternation of named
+    groups, alternatives are tried in order, so the name of the matched
+    group is the first rule matching a column. Datasets share a small set of
+    schemas, hence classifications are memoized per header.
+    """
+
+    # mapped columns are used to project datasets, other granular columns
+    # only contribute to granularity
+    MAPPED_GROUPS = ["datetime", "geography", "unit", "note"]
+
+    def __init__(self, rules: dict, memo_size: int = 1024):
+        self.categories = {
+            group: [category for category, _ in group_rules]
+            for group, group_rules in rules.items()
+        }
+        self.matchers = {
+            group: re.compile(
+                "|".join(
+                    f"(?P<{category}>{pattern})"
+                    for category, pattern in group_rules
+                )
+            )
+            for group, group_rules in rules.items()
+        }
+        self.as_on_date_pattern = re.compile(
+            r".*({})".format(datetime_settings.AS_ON_DATE_PATTERN)
         )
-    )
-    academic_year_pattern = re.compile(
-        r".*({})".format(
-            datetime_settings.ACADEMIC_YEAR_KEYWORD,
+        self.memo = LRUCache(memo_size)
+
+    def classify_column(self, column):
+        for group, matcher in self.matchers.items():
+            match = matcher.match(column)
+            if match is None:
+                continue
+            # `as_on_date` columns are not dates of observations
+            if match.lastgroup == "date" and self.as_on_date_pattern.match(
+                column
+            ):
+                continue
+            yield match.lastgroup
+
+    def classify(self, columns):
+        """Return columns of each category & the unmapped columns.
+
+        Returned classification is shared by all the callers with the same
+        header, hence must not be modified.
+        """
+        key = tuple(columns)
+        classification = self.memo.get(key)
+        if classification is not None:
+            return classification
+
+        classified = {
+            category: set()
+            for categories in self.categories.values()
+            for category in categories
+        }
+        mapped_categories = set(
+            chain.from_iterable(
+                self.categories[group] for group in self.MAPPED_GROUPS
+            )
         )
-    )
-    cal_year_pattern = re.compile(
-        r".*({})".format(datetime_settings.CALENDAR_YEAR_KEYWORD)
-    )
-    other_year_pattern = re.compile(
-        r".*({})".format(datetime_settings.OTHER_YEAR_KEYWORD)
-    )
-    quarter_pattern = re.compile(
-        r".*({})".format(datetime_settings.QUARTER_KEYWORD)
-    )
-    month_pattern = re.compile(
-        r".*({})".format(datetime_settings.MONTH_KEYWORD)
-    )
-    date_pattern = re.compile(
-        r"^.*(?:^|_){}s?(?:_|$)|^.*(?:^|_){}(?:_|$)".format(
-            datetime_settings.DATE_KEYWORD, datetime_settings.DATE_KEYWORD
-        )
-    )
-    as_on_date_pattern = re.compile(
-        r".*({})".format(datetime_settings.AS_ON_DATE_PATTERN)
-    )
-
-    fiscal_year_columns, columns = extract_pattern_from_columns(
-        columns, fiscal_year_pattern
-    )
-    academic_year_columns, columns = extract_pattern_from_columns(
-        columns, academic_year_pattern
-    )
-    year_columns, columns = extract_pattern_from_columns(
-        columns, cal_year_pattern
-    )
-    other_year_columns, columns = extract_pattern_from_columns(
-        columns, other_year_pattern
-    )
-    quarter_columns, columns = extract_pattern_from_columns(
-        columns, quarter_pattern
-    )
-    month_columns, columns = extract_pattern_from_columns(
-        columns, month_pattern
-    )
-    date_columns, columns = extract_pattern_from_columns(columns, date_pattern)
-
-    # filter out `as_on_date` from date columns
-    date_columns = {
-        col for col in date_columns if not as_on_date_pattern.match(col)
-    }
-    return {
-        "fiscal_year": fiscal_year_columns,
-        "academic_year": academic_year_columns,
-        "calender_year": year_columns,
-        "other_year": other_year_columns,
-        "quarter": quarter_columns,
-        "month": month_columns,
-        "date": date_columns,
-    }
+        unmapped = []
+        for column in dict.fromkeys(columns):
+            categories = list(self.classify_column(column))
+            for category in categories:
+                classified[category].add(column)
+            if mapped_categories.isdisjoint(categories):
+                unmapped.append(column)
 
+        classification = {
+            category: frozenset(category_columns)
+            for category, category_columns in classified.items()
+        }
+        classification["unmapped"] = unmapped
+        self.memo.set(key, classification)
+        return classification
 
-async def find_geography_columns(columns: set):
-    country_pattern = re.compile(
-        r".*({})".format(geography_settings.COUNTRY_KEYWORD)
-    )
-    state_pattern = re.compile(
-        r".*({})".format(geography_settings.STATE_KEYWORD)
-    )
-    district_pattern = re.compile(
-        r".*({})".format(geography_settings.DISTRICT_KEYWORD)
-    )
-
-    country_column, columns = extract_pattern_from_columns(
-        columns, country_pattern
-    )
-    state_columns, columns = extract_pattern_from_columns(
-        columns, state_pattern
-    )
-    district_columns, columns = extract_pattern_from_columns(
-        columns, district_pattern
-    )
+    def get_group(self, classification: dict, group: str):
+        return {
+            category: classification[category]
+            for category in self.categories[group]
+        }
 
-    return {
-        "country": country_column,
-        "state": state_columns,
-        "district": district_columns,
-    }
 
+column_classifier = None
 
-async def find_unit_columns(columns: set):
-    unit_pattern = re.compile(r"({})".format(unit_settings.UNIT_KEYWORD))
-    unit_column, _ = extract_pattern_from_columns(columns, unit_pattern)
-    return {
-        "unit": unit_column,
-    }
 
+def get_column_classifier():
+    """Return the column classifier of the process, created on first use."""
+    global column_classifier
+    if column_classifier is None:
+        column_classifier = ColumnClassifier(get_column_rules())
+    return column_classifier
+
+
+async def find_other_granular_columns(columns):
+    classifier = get_column_classifier()
+    return classifier.get_group(classifier.classify(columns), "other")
 
-async def find_note_columns(columns: set):
-    note_pattern = re.compile(r"({})".format(note_settings.NOTE_KEYWORD))
-    note_column, _ = extract_pattern_from_columns(columns, note_pattern)
-    return {
-        "note": note_column,
-    }
+
+async def find_datetime_columns(columns):
+    classifier = get_column_classifier()
+    return classifier.get_group(classifier.classify(columns), "datetime")
+
+
+async def find_geography_columns(columns):
+    classifier = get_column_classifier()
+    return classifier.get_group(classifier.classify(columns), "geography")
+
+
+async def find_unit_columns(columns):
+    classifier = get_column_classifier()
+    return classifier.get_group(classifier.classify(columns), "unit")
+
+
+async def find_note_columns(columns):
+    classifier = get_column_classifier()
+    return classifier.get_group(classifier.classify(columns), "note")
 
 
 async def find_object_columns(dataset):
@@ -179,21 +192,8 @@ async def find_object_columns(dataset):
 
 
 async def find_mapped_columns(columns):
-    datetime_columns = await find_datetime_columns(columns)
-    geography_columns = await find_geography_columns(columns)
-    unit_columns = await find_unit_columns(columns)
-    note_columns = await find_note_columns(columns)
-    mapped_columns = {
-        **datetime_columns,
-        **geography_columns,
-        **unit_columns,
-        **note_columns,
-    }
-
-    not_mapped_columns = list(
-        set(columns).difference(
-            list(chain.from_iterable(mapped_columns.values()))
-        )
-    )
-
-    return {**mapped_columns, "unmapped": not_mapped_columns}
+    """Return classification of the header, columns of every category along
+    with the columns which are not mapped to date-time, geography, unit or
+    note categories.
+    """
+    return get_column_classifier().classify(columns)
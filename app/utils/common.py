@@ -1,74 +1,387 @@
+import os
 import re
-from io import BytesIO
+from contextlib import ExitStack, asynccontextmanager
+from functools import partial
+from hashlib import sha256
+from io import SEEK_END, BytesIO
 from pathlib import Path
+from shutil import copyfileobj
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
 
-from charset_normalizer import from_bytes
+from fastapi.logger import logger
 from pandas import DataFrame, read_csv
 
+from app.core.config import GeographySettings, Settings
+from app.core.executor import run_in_thread
+from app.core.http_client import with_retries
+from app.core.metrics import record_count, record_stage
+from app.utils.columnar import COLUMNAR_READERS
+from app.utils.encoding import detect_encoding, get_encoding, get_samples
+from app.utils.fetch import S3Fetcher, URLFetcher
+from app.utils.file_formats import (
+    COLUMNAR_FORMATS,
+    COMPRESSED_FORMATS,
+    get_file_format,
+    get_shared_path,
+    map_file,
+    open_buffer,
+    open_decompressed,
+    open_source,
+)
+from app.utils.parsers import (
+    FALLBACK_ERRORS,
+    get_csv_parser,
+    read_csv_chunks,
+    read_projected_csv,
+)
+from app.utils.schema import get_schema_cache
+from app.utils.streaming import HeadBufferedStream, UniqueValuesAccumulator
+
+settings = Settings()
+
+GEOGRAPHY_ENTITIES = GeographySettings().SPATIAL_COVERAGE_ORDER
+
 STANDARD_YEAR_COLUMN_NAME = {"year", "fiscal_year", "academic_year"}
 YEAR_REGEX_PATTERN = re.compile(r"^\d{4}$")
 OTHER_YEAR_REGEX_PATTERN = re.compile(r"^\d{4}-\d{2}$")
 
 
-async def get_file(session, url):
-    async with session.get(url) as response:
-        return await response.read()
+async def get_url_version(session, url):
+    """Return ETag or Last-Modified of the url, None if neither is known."""
+
+    async def request():
+        async with session.head(url, allow_redirects=True) as response:
+            response.raise_for_status()
+            return response.headers.get("ETag") or response.headers.get(
+                "Last-Modified"
+            )
 
+    try:
+        return await with_retries(request)
+    except Exception as e:
+        logger.warning(f"Could not get version of: {url} : {e}")
+        return None
 
-def get_encoding(obj):
-    encoding = from_bytes(obj).best().encoding
-    return encoding
 
+def get_file_hash(file_object):
+    file_hash = sha256()
+    file_object.seek(0)
+    for chunk in iter(
+        partial(file_object.read, settings.STREAMING_READ_BYTES), b""
+    ):
+        file_hash.update(chunk)
+    file_object.seek(0)
+    return file_hash.hexdigest()
 
-async def get_dataset_from_url(session, url):
-    try:
-        dataset = read_csv(url)
-    except UnicodeDecodeError:
-        file = await get_file(session, url)
-        encoding = get_encoding(obj=file)
-        dataset = read_csv(BytesIO(file), encoding=encoding)
+
+async def read_projected_dataset(file_object, encoding="utf-8", **kwargs):
+    """Read a csv in two phases, header first and then the mapped columns.
+
+    Classification only needs the header, so the second pass reads just the
+    year, date, geography & unit columns. Complete header is kept in
+    `dataset.attrs["columns"]` & its schema plan in `dataset.attrs["schema"]`
+    for the header based extractors.
+    """
+    header = read_csv(
+        file_object, nrows=0, encoding=encoding, **kwargs
+    ).columns
+    file_object.seek(0)
+    plan = await get_schema_cache().get_plan(header)
+    # replacing undecodable characters is only supported by the C parser
+    parser = "c" if kwargs else get_csv_parser(settings.CSV_PARSER)
+    with record_stage("parse"):
+        dataset = read_projected_csv(
+            file_object, header, plan, parser, encoding=encoding, **kwargs
+        )
+    record_count("rows_parsed", len(dataset))
+    dataset.attrs["columns"] = header
+    dataset.attrs["schema"] = plan
     return dataset
 
 
-async def get_dataset_from_file(dataset_file):
-    # Reading datafrom TempSpoolfile as read_csv clears the temporary file data
-    file = dataset_file.read()
+async def read_projected_dataset_from_buffer(buffer):
+    """Read dataset from bytes or a memory mapped file, both read in place
+    by the parse with the detected encoding and by the one falling back.
+    """
+    # encoding is detected from samples before parsing, so that the file is
+    # parsed once instead of failing a UTF-8 parse first
     try:
-        dataset = read_csv(BytesIO(file))
-    except UnicodeDecodeError:
-        encoding = get_encoding(obj=file)
-        dataset = read_csv(BytesIO(file), encoding=encoding)
+        dataset = await read_projected_dataset(
+            open_buffer(buffer), encoding=get_encoding(obj=buffer)
+        )
+    except UnicodeDecodeError as e:
+        # characters outside the encoding detected from the samples, detect
+        # it again from the part of file which failed to decode
+        dataset = await read_projected_dataset(
+            open_buffer(buffer),
+            encoding=detect_encoding(get_samples(e.object)),
+            encoding_errors="replace",
+        )
     return dataset
 
 
-async def get_dataset_from_s3(s3_resource, s3_bucket, s3_key):
+def get_unique_values_accumulator(header, plan):
+    # geography columns are only counted for spatial coverage
+    counted_columns = set().union(
+        *(plan.mapped_columns[entity] for entity in GEOGRAPHY_ENTITIES)
+    )
+    return UniqueValuesAccumulator(
+        [header[idx] for idx in plan.usecols], plan.dtypes, counted_columns
+    )
+
+
+def accumulate_unique_values(stream, header, plan, parser="c", **kwargs):
+    accumulator = get_unique_values_accumulator(header, plan)
+    with record_stage("parse"), read_csv_chunks(
+        stream, header, plan, parser, **kwargs
+    ) as chunks:
+        for chunk in chunks:
+            accumulator.update(chunk)
+            record_count("rows_parsed", len(chunk))
+    return accumulator.to_dataset()
+
+
+async def read_streaming_dataset(open_stream):
+    """Read a csv larger than memory in a single pass over its stream.
+
+    Header & encoding are detected from the head of the stream, after which
+    only the mapped columns are parsed chunk by chunk and reduced to their
+    unique values, which is all that meta-data extractors need.
+
+    Args:
+        open_stream (Callable): returns a new readable stream of the file,
+            called again only if the file is not in the detected encoding
+
+    Returns:
+        DataFrame: unique values of the mapped columns
+    """
+    stream = HeadBufferedStream(open_stream(), settings.STREAMING_READ_BYTES)
+    encoding = get_encoding(obj=stream.head)
+    header = read_csv(BytesIO(stream.head), nrows=0, encoding=encoding).columns
+    plan = await get_schema_cache().get_plan(header)
+
+    def accumulate(stream, parser):
+        try:
+            return accumulate_unique_values(
+                stream, header, plan, parser, encoding=encoding
+            )
+        except UnicodeDecodeError as e:
+            # characters outside the encoding detected from the head of
+            # stream, detect it again from the part which failed to decode
+            return accumulate_unique_values(
+                HeadBufferedStream(open_stream(), 0),
+                header,
+                plan,
+                encoding=detect_encoding(get_samples(e.object)),
+                encoding_errors="replace",
+            )
+
+    parser = get_csv_parser(settings.CSV_PARSER, chunked=True)
     try:
-        file_object = (
-            s3_resource.Object(s3_bucket, s3_key).get()["Body"].read()
+        dataset = accumulate(stream, parser)
+    except FALLBACK_ERRORS as e:
+        if parser == "c":
+            raise
+        # stream is partly consumed, hence it is read again from the start
+        logger.warning(f"Could not parse with {parser}, using C: {e}")
+        dataset = accumulate(HeadBufferedStream(open_stream(), 0), "c")
+    dataset.attrs["columns"] = header
+    dataset.attrs["schema"] = plan
+    return dataset
+
+
+def get_file_size(file_object):
+    size = file_object.seek(0, SEEK_END)
+    file_object.seek(0)
+    return size
+
+
+async def read_dataset_from_file_object(file_object):
+    if get_file_size(file_object) <= settings.STREAMING_THRESHOLD_BYTES:
+        with map_file(file_object) as buffer:
+            return await read_projected_dataset_from_buffer(buffer)
+
+    def open_stream():
+        file_object.seek(0)
+        return file_object
+
+    return await read_streaming_dataset(open_stream)
+
+
+async def read_compressed_dataset(source, compression: str):
+    # compressed files are streamed, as their content can be many times
+    # larger than the file
+    with ExitStack() as stack:
+
+        def open_stream():
+            file_object = stack.enter_context(open_source(source))
+            return stack.enter_context(
+                open_decompressed(file_object, compression)
+            )
+
+        return await read_streaming_dataset(open_stream)
+
+
+async def read_columnar_dataset(source, file_format: str):
+    """Read unique values of the mapped columns of a parquet or feather
+    file, whose header is in its schema & columns are read independently.
+    """
+    reader = COLUMNAR_READERS[file_format](source)
+    plan = await get_schema_cache().get_plan(reader.header)
+    accumulator = get_unique_values_accumulator(reader.header, plan)
+    with record_stage("parse"):
+        for values in reader.iter_unique_values(
+            [reader.header[idx] for idx in plan.usecols]
+        ):
+            accumulator.update(values)
+    record_count("rows_parsed", reader.num_rows)
+    dataset = accumulator.to_dataset()
+    dataset.attrs["columns"] = reader.header
+    dataset.attrs["schema"] = plan
+    return dataset
+
+
+async def read_dataset_from_source(source, name: str = ""):
+    """Read dataset from the content of a file or from the path of a local
+    file, which are the two ways datasets are passed to worker processes.
+
+    Format of the dataset is taken from its name, csv unless it ends with
+    one of the other supported formats.
+    """
+    record_count(
+        "bytes_read",
+        len(source) if isinstance(source, bytes) else os.path.getsize(source),
+    )
+    file_format = get_file_format(name)
+    if file_format in COLUMNAR_FORMATS:
+        return await read_columnar_dataset(source, file_format)
+    if file_format in COMPRESSED_FORMATS:
+        return await read_compressed_dataset(
+            source, COMPRESSED_FORMATS[file_format]
         )
+    if isinstance(source, bytes):
+        return await read_projected_dataset_from_buffer(source)
+    with open(source, "rb") as file_object:
+        return await read_dataset_from_file_object(file_object)
+
+
+@asynccontextmanager
+async def spool_to_named_file(stream):
+    # large files are handed over to worker processes by their path
+    with NamedTemporaryFile(suffix=".csv") as named_file:
+        await run_in_thread(
+            copyfileobj, stream, named_file, settings.STREAMING_READ_BYTES
+        )
+        named_file.flush()
+        yield named_file.name
+
+
+@asynccontextmanager
+async def get_source_from_file_object(file_object):
+    """Yield path of a file which worker processes can open, like an upload
+    spooled to disk, otherwise content of the file, or for files larger than
+    the streaming threshold the path of its named temporary copy.
+    """
+    shared_path = get_shared_path(file_object)
+    if shared_path is not None:
+        # written content is read by the workers from the file
+        file_object.flush()
+        yield shared_path
+        return
+    if get_file_size(file_object) <= settings.STREAMING_THRESHOLD_BYTES:
+        # Reading datafrom TempSpoolfile as read_csv clears the temporary file
+        yield file_object.read()
+        return
+    async with spool_to_named_file(file_object) as file_path:
+        yield file_path
+
+
+async def get_sample_plan(sample: bytes):
+    """Return header of a csv & its schema plan from a sample of the file,
+    None for both if the header could not be read from the sample.
+    """
+    if b"\n" not in sample:
+        return None, None
+    try:
+        encoding = get_encoding(obj=sample)
+        header = read_csv(BytesIO(sample), nrows=0, encoding=encoding).columns
     except Exception as e:
-        raise ValueError(f"Could not get dataset from: {s3_key}. Due to {e}")
-    else:
-        try:
-            dataset = read_csv(BytesIO(file_object), encoding="utf-8")
-        except UnicodeDecodeError:
-            encoding = get_encoding(obj=file_object)
-            dataset = read_csv(BytesIO(file_object), encoding=encoding)
-        return dataset
+        logger.warning(f"Could not read header from sample: {e}")
+        return None, None
+    return header, await get_schema_cache().get_plan(header)
+
+
+@asynccontextmanager
+async def get_source_from_fetcher(fetcher, name: str):
+    """Yield source of a remote dataset, fetching a sample of csv first.
+
+    Header of the sample is classified, if values of none of its columns
+    are needed only the header is processed and rest of the file is never
+    fetched. Otherwise rest of the file is fetched after the sample, so
+    that the file is downloaded once for parsing & encoding detection.
+    """
+    sample, size = None, None
+    if settings.RANGE_SAMPLE_BYTES and get_file_format(name) in {None, "csv"}:
+        sample, size = await fetcher.fetch_sample(settings.RANGE_SAMPLE_BYTES)
+    if sample is not None and len(sample) == size:
+        yield sample
+        return
+    if sample is not None:
+        header, plan = await get_sample_plan(sample)
+        if plan is not None and not plan.usecols:
+            yield DataFrame(columns=header).to_csv(index=False).encode()
+            return
+
+    sample = sample or b""
+    if size is not None and size > settings.STREAMING_THRESHOLD_BYTES:
+        # large files are handed over to worker processes by their path
+        with NamedTemporaryFile(suffix=".csv") as named_file:
+            named_file.write(sample)
+            await fetcher.fetch(named_file, len(sample))
+            named_file.flush()
+            yield named_file.name
+        return
+    with SpooledTemporaryFile(
+        max_size=settings.STREAMING_THRESHOLD_BYTES
+    ) as file_object:
+        file_object.write(sample)
+        await fetcher.fetch(file_object, len(sample))
+        file_object.seek(0)
+        async with get_source_from_file_object(file_object) as source:
+            yield source
+
+
+@asynccontextmanager
+async def get_source_from_url(session, url):
+    async with get_source_from_fetcher(
+        URLFetcher(session, url), url
+    ) as source:
+        yield source
 
 
-async def get_files_from_directory(directory: str):
-    # function currently assumes that local path is provided
-    # ? should this method will look if dataset in local path and remote path as well
+@asynccontextmanager
+async def get_source_from_s3(s3_client, s3_bucket, s3_key):
+    fetcher = S3Fetcher(s3_client, s3_bucket, s3_key)
+    async with get_source_from_fetcher(fetcher, s3_key) as source:
+        yield source
+
+
+@asynccontextmanager
+async def get_source_from_path(file_path: str):
+    # local files are read by worker processes from their path
+    yield file_path
+
+
+async def get_files_from_directory(directory: str, file_format: str = "csv"):
+    """Return sorted paths of the files of a format in a directory tree."""
     directory_path = Path(directory)
     if not directory_path.exists():
         raise ValueError(f"Directory {directory} does not exist")
-
-    # if directory is present take all dataset within that directory or subdirectories
-    # for each_path in directory_path.rglob('**/*.csv'):
-    #     required_path = str(each_path).split("/projects/")[-1]
-    #     yield required_path
-    return [str(each_path) for each_path in directory_path.rglob("**/*.csv")]
+    return sorted(
+        str(each_path)
+        for each_path in directory_path.rglob(f"*.{file_format}")
+        if each_path.is_file()
+    )
 
 
 class ColumnAttributes:
@@ -97,9 +410,3 @@ def flatten_irregular_nested_list(nested_list):
         elif type(ele) is str:
             regular_list.append([ele.strip()])
     return regular_list
-
-
-def get_key_from_dict(val, my_dict):
-    for key, value in my_dict.items():
-        if val in value:
-            return key
@@ -0,0 +1,93 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import DateTimeSettings
+from app.utils.streaming import get_unique_values
+
+datetime_settings = DateTimeSettings()
+
+
+def get_unique_strings(values: pd.Series) -> pd.Series:
+    """Unique non-missing values of a column as strings, parsing them is
+    enough as every duplicate parses to the same value.
+    """
+    unique_values = pd.Series(
+        get_unique_values(values, dropna=True), dtype=object
+    )
+    return unique_values.astype(str).str.strip()
+
+
+def sample_values(unique_values: pd.Series, size: int) -> pd.Series:
+    # values spread over the column, rather than only its head
+    step = max(len(unique_values) // size, 1)
+    return unique_values.iloc[::step].head(size)
+
+
+def count_parsed(values: pd.Series, date_format: str) -> int:
+    dates = pd.to_datetime(values, format=date_format, errors="coerce")
+    return int(dates.count())
+
+
+def infer_format(
+    unique_values: pd.Series,
+    formats: List[str],
+    sample_size: int = datetime_settings.DATE_FORMAT_SAMPLE_SIZE,
+    min_match: float = datetime_settings.DATE_FORMAT_MIN_MATCH,
+) -> Optional[str]:
+    """Return the format parsing most of the sampled values, earlier formats
+    win ties, or None if no format parses `min_match` share of the sample.
+    """
+    sample = sample_values(unique_values, sample_size)
+    if sample.empty:
+        return None
+    counts = [count_parsed(sample, date_format) for date_format in formats]
+    best = int(np.argmax(counts))
+    if counts[best] < min_match * len(sample):
+        return None
+    return formats[best]
+
+
+def parse_dates(
+    values: pd.Series, formats: List[str] = datetime_settings.DATE_FORMATS
+) -> pd.Series:
+    """Parse unique values of a date column with the inferred format.
+
+    Returns:
+        pd.Series: unique timestamps, empty when no format is inferred
+    """
+    unique_values = get_unique_strings(values)
+    date_format = infer_format(unique_values, formats)
+    if date_format is None:
+        return pd.Series([], dtype="datetime64[ns]")
+    dates = pd.to_datetime(unique_values, format=date_format, errors="coerce")
+    return dates.dropna()
+
+
+def parse_months(values: pd.Series) -> pd.PeriodIndex:
+    """Parse unique values of a month column, values without a year like
+    `January` are not parsed as they do not cover a point in time.
+    """
+    dates = parse_dates(values, datetime_settings.MONTH_FORMATS)
+    return pd.PeriodIndex(pd.unique(dates.dt.to_period("M")), freq="M")
+
+
+def parse_quarters(values: pd.Series) -> pd.PeriodIndex:
+    """Parse unique values of a quarter column like `Q1 2020` or `2020-Q1`,
+    values without a year like `Q1` are not parsed.
+    """
+    unique_values = get_unique_strings(values).str.upper()
+    quarters = pd.DataFrame(columns=["year", "quarter"])
+    for pattern in datetime_settings.QUARTER_FORMATS:
+        matched = unique_values.str.extract(pattern).dropna()
+        if len(matched) >= datetime_settings.DATE_FORMAT_MIN_MATCH * len(
+            unique_values
+        ):
+            quarters = matched
+            break
+    return pd.PeriodIndex(
+        year=quarters["year"].astype(int),
+        quarter=quarters["quarter"].str[1:].astype(int),
+        freq="Q",
+    ).unique()
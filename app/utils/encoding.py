@@ -0,0 +1,112 @@
+from codecs import (
+    BOM_UTF8,
+    BOM_UTF16_BE,
+    BOM_UTF16_LE,
+    BOM_UTF32_BE,
+    BOM_UTF32_LE,
+    getincrementaldecoder,
+)
+from hashlib import sha256
+
+from charset_normalizer import from_bytes
+
+from app.core.config import Settings
+from app.core.metrics import record_stage
+from app.utils.cache import LRUCache
+
+settings = Settings()
+
+encoding_cache = LRUCache(max_size=1024)
+
+# UTF-32 BOMs start with UTF-16 BOMs, hence are checked first
+BOM_ENCODINGS = [
+    (BOM_UTF32_LE, "utf-32"),
+    (BOM_UTF32_BE, "utf-32"),
+    (BOM_UTF8, "utf-8-sig"),
+    (BOM_UTF16_LE, "utf-16"),
+    (BOM_UTF16_BE, "utf-16"),
+]
+
+
+def get_bom_encoding(head: bytes):
+    for bom, encoding in BOM_ENCODINGS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def skip_utf8_continuation_bytes(sample: bytes):
+    # a sample taken from the middle of a file can start in between of a
+    # multi-byte character, which has at most 3 continuation bytes
+    start = 0
+    while start < min(len(sample), 3) and 0x80 <= sample[start] <= 0xBF:
+        start += 1
+    return sample[start:]
+
+
+def is_utf8(samples):
+    # NUL is valid UTF-8 but not expected in text, it is mostly the high
+    # byte of ASCII characters in UTF-16 & UTF-32 encoded data without a BOM
+    if any(b"\x00" in sample for sample in samples):
+        return False
+    # samples can end in between of a multi-byte character, hence decoding
+    # them incrementally without finalising the decoder
+    try:
+        for sample in samples:
+            getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def get_samples(data: bytes):
+    """Return a bounded head and a few KB from the middle & tail of data.
+
+    Offsets of middle & tail samples are aligned to 4 bytes, so that they do
+    not split code units of UTF-16 & UTF-32 encoded data.
+    """
+    head = data[: settings.ENCODING_SAMPLE_BYTES]
+    if len(data) <= settings.ENCODING_SAMPLE_BYTES:
+        return [head]
+    size = settings.ENCODING_DETECTION_SAMPLE_BYTES
+    middle = (len(data) // 2) & ~3
+    middle_end = middle + size
+    tail = max(len(data) - size, 0) & ~3
+    return [head, data[middle:middle_end], data[tail:]]
+
+
+def detect_encoding(samples):
+    """Detect encoding from samples of a file, cheapest checks first.
+
+    BOM is checked on the head, then the samples are validated as UTF-8 and
+    only if they are not, charset is detected from the first few KB of the
+    samples.
+
+    Returns:
+        str: name of the encoding, `utf-8` when it could not be detected
+    """
+    encoding = get_bom_encoding(samples[0])
+    if encoding is not None:
+        return encoding
+    head, *rest = samples
+    if is_utf8([head, *map(skip_utf8_continuation_bytes, rest)]):
+        return "utf-8"
+    size = settings.ENCODING_DETECTION_SAMPLE_BYTES
+    match = from_bytes(b"".join(sample[:size] for sample in samples)).best()
+    return "utf-8" if match is None else match.encoding
+
+
+@record_stage("encoding")
+def get_encoding(obj: bytes):
+    """Return encoding of the content of a file, detected from its samples.
+
+    Decisions are cached on the digest of the samples, so a source seen
+    again by the same process is not detected again.
+    """
+    samples = get_samples(obj)
+    key = f"{len(obj)}:{sha256(b''.join(samples)).hexdigest()}"
+    encoding = encoding_cache.get(key)
+    if encoding is None:
+        encoding = detect_encoding(samples)
+        encoding_cache.set(key, encoding)
+    return encoding
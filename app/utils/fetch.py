@@ -0,0 +1,136 @@
+import re
+from shutil import copyfileobj
+
+from botocore.exceptions import ClientError
+
+from app.core.config import Settings
+from app.core.executor import run_in_thread
+from app.core.http_client import with_retries
+from app.utils.s3_files import get_fetch_semaphore
+
+settings = Settings()
+
+CONTENT_RANGE_PATTERN = re.compile(r"bytes \d+-\d+/(\d+|\*)")
+
+
+def get_range(start: int, end: int = None) -> str:
+    # `end` is exclusive, while it is inclusive in the Range header
+    return f"bytes={start}-" if end is None else f"bytes={start}-{end - 1}"
+
+
+def get_total_size(content_range):
+    """Return total size from Content-Range like `bytes 0-1023/4096`, None
+    if it is not known.
+    """
+    match = CONTENT_RANGE_PATTERN.fullmatch(content_range or "")
+    if match is None or match.group(1) == "*":
+        return None
+    return int(match.group(1))
+
+
+class URLFetcher:
+    """Fetch content of a url in ranges with HTTP Range requests, requests
+    failing with transient errors are retried.
+    """
+
+    def __init__(self, session, url: str):
+        self.session = session
+        self.url = url
+
+    async def fetch_sample(self, size: int):
+        """Return first `size` bytes of the file & its total size, or None
+        for both if the server does not support ranges.
+        """
+        return await with_retries(self.request_sample, size)
+
+    async def fetch(self, file, start: int = 0):
+        """Write content of the file from `start` to its end into `file`."""
+        position = file.tell()
+
+        async def request():
+            # content written by a failed attempt is written again
+            file.seek(position)
+            file.truncate()
+            await self.request_into(file, start)
+
+        await with_retries(request)
+
+    async def request_sample(self, size: int):
+        headers = {"Range": get_range(0, size)}
+        async with self.session.get(self.url, headers=headers) as response:
+            if response.status == 416:
+                # range of an empty file is not satisfiable
+                return b"", 0
+            response.raise_for_status()
+            if response.status != 206:
+                # body of the complete file is not read
+                return None, None
+            sample = await response.read()
+            return sample, get_total_size(
+                response.headers.get("Content-Range")
+            )
+
+    async def request_into(self, file, start: int = 0):
+        headers = {"Range": get_range(start)} if start else {}
+        async with self.session.get(self.url, headers=headers) as response:
+            response.raise_for_status()
+            if start and response.status != 206:
+                raise ValueError(f"Range requests not supported by {self.url}")
+            # chunks are joined into batches written in threads, so that
+            # disk writes do not block the event loop
+            batch = []
+            batch_size = 0
+            async for chunk in response.content.iter_chunked(
+                settings.STREAMING_READ_BYTES
+            ):
+                batch.append(chunk)
+                batch_size += len(chunk)
+                if batch_size >= settings.STREAMING_READ_BYTES:
+                    await run_in_thread(file.write, b"".join(batch))
+                    batch, batch_size = [], 0
+            if batch:
+                await run_in_thread(file.write, b"".join(batch))
+
+
+class S3Fetcher:
+    """Fetch content of a S3 object in ranges, downloads run in threads and
+    at most `S3_MAX_CONCURRENCY` at once.
+    """
+
+    def __init__(self, s3_client, s3_bucket: str, s3_key: str):
+        self.s3_client = s3_client
+        self.s3_bucket = s3_bucket
+        self.s3_key = s3_key
+
+    def get_object(self, start: int = 0, end: int = None):
+        kwargs = {}
+        if start or end is not None:
+            kwargs["Range"] = get_range(start, end)
+        return self.s3_client.get_object(
+            Bucket=self.s3_bucket, Key=self.s3_key, **kwargs
+        )
+
+    def read_sample(self, size: int):
+        try:
+            s3_object = self.get_object(0, size)
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "InvalidRange":
+                # range of an empty object is not satisfiable
+                return b"", 0
+            raise
+        sample = s3_object["Body"].read()
+        return sample, get_total_size(s3_object.get("ContentRange"))
+
+    def read_into(self, file, start: int = 0):
+        s3_object = self.get_object(start)
+        copyfileobj(s3_object["Body"], file, settings.STREAMING_READ_BYTES)
+
+    async def fetch_sample(self, size: int):
+        """Return first `size` bytes of the object & its total size."""
+        async with get_fetch_semaphore():
+            return await run_in_thread(self.read_sample, size)
+
+    async def fetch(self, file, start: int = 0):
+        """Write content of the object from `start` to its end into `file`."""
+        async with get_fetch_semaphore():
+            await run_in_thread(self.read_into, file, start)
@@ -0,0 +1,123 @@
+import gzip
+import mmap
+import os
+from contextlib import contextmanager
+from io import SEEK_SET, BufferedReader, BytesIO, RawIOBase
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from urllib.parse import urlparse
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Longer suffixes first, so that `data.csv.gz` is not taken as a csv
+FILE_FORMATS = ["csv.gz", "csv.zst", "parquet", "feather", "csv"]
+COMPRESSED_FORMATS = {"csv.gz": "gzip", "csv.zst": "zstd"}
+COLUMNAR_FORMATS = {"parquet", "feather"}
+
+
+def get_file_format(name: str):
+    """Return format of a file from the suffix of its name, url or s3-key,
+    None if it is not one of the supported formats.
+    """
+    path = urlparse(name).path.lower()
+    for file_format in FILE_FORMATS:
+        if path.endswith(f".{file_format}"):
+            return file_format
+    return None
+
+
+def get_format_suffix(name: str) -> str:
+    file_format = get_file_format(name)
+    if file_format is None:
+        return Path(urlparse(name).path).suffix.strip(".")
+    return file_format
+
+
+def open_source(source):
+    # content of small files is passed as bytes & of large files as path
+    return BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+
+class MappedFile(RawIOBase):
+    """Readable file of a memory mapped file, as parsers do not read mmap
+    objects as files, reads copy just the chunks asked for by a parser.
+    """
+
+    def __init__(self, buffer: mmap.mmap):
+        self.buffer = buffer
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, chunk):
+        data = self.buffer.read(len(chunk))
+        chunk[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=SEEK_SET):
+        self.buffer.seek(offset, whence)
+        return self.buffer.tell()
+
+    def tell(self):
+        return self.buffer.tell()
+
+
+def open_buffer(buffer):
+    # memory mapped files are read in place & bytes by a BytesIO sharing them
+    if isinstance(buffer, mmap.mmap):
+        buffer.seek(0)
+        return BufferedReader(MappedFile(buffer))
+    return BytesIO(buffer)
+
+
+@contextmanager
+def map_file(file_object):
+    """Yield content of a file memory mapped, so that its pages are shared
+    with the page cache instead of being copied into the process, or read
+    as bytes if it can not be mapped, like an empty file or a pipe.
+    """
+    try:
+        buffer = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        file_object.seek(0)
+        yield file_object.read()
+        return
+    with buffer:
+        yield buffer
+
+
+def get_shared_path(file_object):
+    """Return path by which other processes can open the file of a file
+    object without it being copied, None if its content is only in memory.
+    """
+    if isinstance(file_object, SpooledTemporaryFile):
+        # spooled files are in memory until they roll over to a file
+        if not file_object._rolled:
+            return None
+        file_object = file_object._file
+    try:
+        fd = file_object.fileno()
+    except (AttributeError, OSError):
+        return None
+    # on Linux every descriptor of the process has a path, even the ones of
+    # unnamed temporary files that uploads are spooled to
+    path = f"/proc/{os.getpid()}/fd/{fd}"
+    if os.path.exists(path):
+        return path
+    name = getattr(file_object, "name", None)
+    return name if isinstance(name, str) and os.path.isabs(name) else None
+
+
+def open_decompressed(file_object, compression: str):
+    """Return a readable stream of the decompressed content of a file."""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=file_object, mode="rb")
+    if zstandard is None:
+        raise ValueError("zstandard is required to read zstd compressed files")
+    return zstandard.ZstdDecompressor().stream_reader(file_object)
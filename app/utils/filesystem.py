@@ -0,0 +1,70 @@
+import glob
+import os
+from typing import List
+
+from app.core.config import Settings
+
+settings = Settings()
+
+LOCAL_SCHEME = "local://"
+GLOB_CHARACTERS = ("*", "?", "[")
+
+
+def get_filesystem_roots() -> List[str]:
+    return [os.path.realpath(root) for root in settings.FILESYSTEM_ROOTS]
+
+
+def check_within_roots(path: str, roots: List[str]):
+    # symbolic links & `..` are resolved, so that neither leads out of roots
+    real_path = os.path.realpath(path)
+    if not any(
+        os.path.commonpath([root, real_path]) == root for root in roots
+    ):
+        raise PermissionError(f"Path {path} is not within filesystem roots")
+
+
+def get_glob_directory(pattern: str) -> str:
+    """Return the leading directories of a glob pattern without wildcards."""
+    parts = pattern.split(os.sep)
+    for idx, part in enumerate(parts):
+        if any(character in part for character in GLOB_CHARACTERS):
+            return os.sep.join(parts[:idx]) or os.sep
+    return pattern
+
+
+def resolve_filesystem_paths(paths: List[str], file_format: str = "csv"):
+    """Return paths of the files of server-side paths, `local://` urls,
+    directories, whose files of the format are taken, or glob patterns.
+
+    Raises PermissionError for paths outside of the filesystem roots and
+    ValueError for paths which are not absolute or do not exist.
+    """
+    roots = get_filesystem_roots()
+    if not roots:
+        raise PermissionError("Filesystem roots are not configured")
+    file_paths = {}
+    for path in paths:
+        if path.startswith(LOCAL_SCHEME):
+            path = path.replace(LOCAL_SCHEME, "", 1)
+        if not os.path.isabs(path):
+            raise ValueError(f"Path {path} is not absolute")
+        if any(character in path for character in GLOB_CHARACTERS):
+            check_within_roots(get_glob_directory(path), roots)
+            matches = glob.glob(path, recursive=True)
+        else:
+            check_within_roots(path, roots)
+            if not os.path.exists(path):
+                raise ValueError(f"Path {path} does not exist")
+            matches = [path]
+            if os.path.isdir(path):
+                matches = sorted(
+                    glob.glob(
+                        os.path.join(path, "**", f"*.{file_format}"),
+                        recursive=True,
+                    )
+                )
+        for match in matches:
+            if os.path.isfile(match):
+                check_within_roots(match, roots)
+                file_paths[os.path.normpath(match)] = None
+    return list(file_paths)
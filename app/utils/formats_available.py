@@ -1,6 +1,5 @@
-from pathlib import Path
+from app.utils.file_formats import get_format_suffix
 
 
 async def get_formats_available(output_file_path: str):
-    file_path = Path(output_file_path).suffix.strip(".")
-    return {"formats_available": file_path}
+    return {"formats_available": get_format_suffix(output_file_path)}
@@ -1,20 +1,22 @@
 from app.core.config import DateTimeSettings, GeographySettings, OtherSettings
-from app.utils.columns_mapping import (
-    find_datetime_columns,
-    find_geography_columns,
-    find_other_granular_columns,
-)
-from app.utils.common import get_key_from_dict
+from app.utils.columns_mapping import get_column_classifier
 
 datetime_settings = DateTimeSettings()
 geographic_settings = GeographySettings()
 other_settings = OtherSettings()
 
 
-async def get_granularity(columns):
-    datetime_columns = await find_datetime_columns(columns)
-    geographic_columns = await find_geography_columns(columns)
-    other_granular_columns = await find_other_granular_columns(columns)
+def get_key_from_dict(val, my_dict):
+    for key, value in my_dict.items():
+        if val in value:
+            return key
+
+
+async def get_granularity(mapped_columns):
+    classifier = get_column_classifier()
+    datetime_columns = classifier.get_group(mapped_columns, "datetime")
+    geographic_columns = classifier.get_group(mapped_columns, "geography")
+    other_granular_columns = classifier.get_group(mapped_columns, "other")
 
     datetime_columns = {
         key: value for key, value in datetime_columns.items() if value
@@ -0,0 +1,244 @@
+import asyncio
+import json
+from datetime import datetime
+from threading import Lock
+from uuid import uuid4
+
+from fastapi.logger import logger
+
+from app.core.config import Settings
+from app.models.enums import JobStatus
+from app.models.jobs import Job
+from app.utils.cache import connect_sqlite
+
+settings = Settings()
+
+
+class JobResults:
+    """Meta-data of the objects processed by jobs, kept in SQLite in the
+    order they are processed, so that results of bucket scans do not take
+    the memory of the server & a page of them is read by its position.
+    Results of the jobs of a previous run of the server are dropped.
+    """
+
+    def __init__(self, path: str):
+        self.lock = Lock()
+        self.connection = connect_sqlite(path)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS job_results (job_id TEXT, "
+                "position INTEGER, key TEXT, meta_data TEXT, "
+                "PRIMARY KEY (job_id, position))"
+            )
+            self.connection.execute("DELETE FROM job_results")
+
+    def add(self, job_id: str, start: int, results):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO job_results VALUES (?, ?, ?, ?)",
+                [
+                    (job_id, start + idx, key, json.dumps(meta_data))
+                    for idx, (key, meta_data) in enumerate(results)
+                ],
+            )
+
+    def get(self, job_id: str, offset: int, limit: int):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT key, meta_data FROM job_results "
+                "WHERE job_id = ? AND position >= ? "
+                "ORDER BY position LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return {key: json.loads(meta_data) for key, meta_data in rows}
+
+    def delete(self, job_id: str):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM job_results WHERE job_id = ?", (job_id,)
+            )
+
+
+class ScanJob:
+    """Background S3 bucket scan, observes the progress of the scan and keeps
+    the meta-data of objects in the order they are processed, in batches
+    written to the job results.
+    """
+
+    def __init__(self, run, results: JobResults):
+        self.id = uuid4().hex
+        self.run = run
+        self.status = JobStatus.QUEUED
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.objects_listed = 0
+        self.objects_processed = 0
+        self.objects_failed = 0
+        self.results = results
+        self.pending = []
+        self.error = None
+        self.task = None
+
+    def listed(self, s3_key):
+        self.objects_listed += 1
+
+    def processed(self, s3_key, meta_data, failed=False):
+        self.pending.append((s3_key, meta_data))
+        self.objects_processed += 1
+        if failed:
+            self.objects_failed += 1
+        if len(self.pending) >= settings.JOB_RESULTS_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        if pending:
+            self.results.add(
+                self.id, self.objects_processed - len(pending), pending
+            )
+
+    @property
+    def is_finished(self):
+        return self.status in {
+            JobStatus.COMPLETED,
+            JobStatus.FAILED,
+            JobStatus.CANCELLED,
+        }
+
+    def get_throughput(self):
+        if self.started_at is None:
+            return None
+        elapsed = (
+            (self.finished_at or datetime.utcnow()) - self.started_at
+        ).total_seconds()
+        return round(self.objects_processed / elapsed, 3) if elapsed else None
+
+    def to_model(self) -> Job:
+        return Job(
+            id=self.id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            objects_listed=self.objects_listed,
+            objects_processed=self.objects_processed,
+            objects_failed=self.objects_failed,
+            throughput=self.get_throughput(),
+            error=self.error,
+        )
+
+    def get_results(self, offset: int = 0, limit: int = None):
+        """Return meta-data of up to `limit` objects processed after first
+        `offset`.
+        """
+        if limit is None:
+            limit = settings.JOB_RESULTS_PAGE_SIZE
+        # results not written yet are the last ones processed
+        written = self.objects_processed - len(self.pending)
+        results = self.results.get(self.id, offset, limit)
+        start = max(offset - written, 0)
+        end = start + limit - len(results)
+        results.update(self.pending[start:end])
+        return results
+
+
+class JobManager:
+    """In-process job queue, processed by a fixed number of worker tasks.
+
+    Finished jobs are kept for polling their results, oldest of them are
+    dropped when more than `JOB_HISTORY_SIZE` jobs are kept.
+    """
+
+    def __init__(self, workers: int, history_size: int, results_path: str):
+        self.history_size = history_size
+        self.results = JobResults(results_path)
+        self.jobs = {}
+        self.queue = asyncio.Queue()
+        self.workers = [
+            asyncio.ensure_future(self.work()) for _ in range(workers)
+        ]
+
+    def submit(self, run) -> ScanJob:
+        """Queue a job, `run` is called with the job once a worker is free
+        and its coroutine reports the progress to the job.
+        """
+        job = ScanJob(run, self.results)
+        self.jobs[job.id] = job
+        self.queue.put_nowait(job)
+        self.drop_finished_jobs()
+        return job
+
+    def get(self, job_id: str) -> ScanJob:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> ScanJob:
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return job
+        if job.task is not None:
+            job.task.cancel()
+        job.status = JobStatus.CANCELLED
+        job.finished_at = datetime.utcnow()
+        return job
+
+    def drop_finished_jobs(self):
+        finished_jobs = [job for job in self.jobs.values() if job.is_finished]
+        excess = max(len(self.jobs) - self.history_size, 0)
+        for job in finished_jobs[:excess]:
+            del self.jobs[job.id]
+            self.results.delete(job.id)
+
+    async def work(self):
+        while True:
+            job = await self.queue.get()
+            if job.status != JobStatus.QUEUED:
+                continue
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            job.task = asyncio.ensure_future(job.run(job))
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                if job.status != JobStatus.CANCELLED:
+                    # worker itself is cancelled at shutdown
+                    job.task.cancel()
+                    raise
+                logger.info(f"Job {job.id} cancelled")
+            except Exception as e:
+                logger.exception(f"Job {job.id} failed: {e}")
+                job.status = JobStatus.FAILED
+                job.error = f"{e}"
+            else:
+                job.status = JobStatus.COMPLETED
+            finally:
+                job.flush()
+                job.finished_at = job.finished_at or datetime.utcnow()
+                self.drop_finished_jobs()
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+
+job_manager = None
+
+
+def get_job_manager() -> JobManager:
+    """Return the job manager of the server, created on first use."""
+    global job_manager
+    if job_manager is None:
+        job_manager = JobManager(
+            settings.JOB_WORKERS,
+            settings.JOB_HISTORY_SIZE,
+            settings.JOB_RESULTS_PATH,
+        )
+    return job_manager
+
+
+async def stop_job_manager():
+    global job_manager
+    if job_manager is not None:
+        await job_manager.stop()
+        job_manager = None
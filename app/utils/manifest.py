@@ -0,0 +1,88 @@
+import json
+from threading import Lock
+
+from app.core.config import Settings
+from app.utils.cache import connect_sqlite
+
+settings = Settings()
+
+
+class ScanManifest:
+    """Persisted state of the previous scans of S3 bucket prefixes, per
+    format of the scanned objects.
+
+    For every processed object its ETag, last modified time & meta-data is
+    stored along with the version of meta-data rules, so that a re-scan only
+    has to process objects which are new or modified since the last scan.
+    """
+
+    def __init__(self, path: str):
+        self.lock = Lock()
+        self.connection = connect_sqlite(path)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS manifest ("
+                "scope TEXT, key TEXT, etag TEXT, last_modified TEXT, "
+                "version TEXT, meta_data TEXT, PRIMARY KEY (scope, key))"
+            )
+
+    @staticmethod
+    def get_scope(endpoint_url, s3_bucket, prefix, file_format):
+        # scans of other formats list other keys of the same prefix, which
+        # must not be taken as removed from the previous scan
+        return json.dumps([endpoint_url, s3_bucket, prefix or "", file_format])
+
+    def get_entries(self, scope: str, version: str):
+        """Return etag & meta-data of objects processed with same version."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT key, etag, meta_data FROM manifest "
+                "WHERE scope = ? AND version = ?",
+                (scope, version),
+            ).fetchall()
+        return {
+            key: {"etag": etag, "meta_data": json.loads(meta_data)}
+            for key, etag, meta_data in rows
+        }
+
+    def get_keys(self, scope: str):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT key FROM manifest WHERE scope = ?", (scope,)
+            ).fetchall()
+        return {key for key, in rows}
+
+    def update(self, scope: str, version: str, s3_objects, meta_data: dict):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        scope,
+                        s3_object["Key"],
+                        s3_object["ETag"],
+                        str(s3_object["LastModified"]),
+                        version,
+                        json.dumps(meta_data[s3_object["Key"]]),
+                    )
+                    for s3_object in s3_objects
+                ],
+            )
+
+    def delete(self, scope: str, keys):
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "DELETE FROM manifest WHERE scope = ? AND key = ?",
+                [(scope, key) for key in keys],
+            )
+
+
+scan_manifest = None
+
+
+def get_scan_manifest():
+    """Return the scan manifest of the server, created on first use."""
+    global scan_manifest
+    if scan_manifest is None:
+        scan_manifest = ScanManifest(settings.SCAN_MANIFEST_PATH)
+    return scan_manifest
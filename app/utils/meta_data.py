@@ -1,27 +1,51 @@
 import asyncio
-from typing import ChainMap, List
+import inspect
+import os
+import time
+from typing import AsyncIterator, ChainMap, List
 from urllib.parse import urlparse
 
 from fastapi.logger import logger
 from starlette.datastructures import UploadFile
 
+from app.core.admission import get_dataset_scheduler
 from app.core.config import Settings
+from app.core.executor import run_in_process, run_in_thread
+from app.core.http_client import get_http_session
+from app.core.metrics import (
+    record_cache_lookup,
+    record_dataset,
+    record_failure,
+    record_stage,
+    start_recording,
+    timed,
+)
 from app.models.enums import SourceType
 from app.models.meta_data import MetaData
-from app.utils.columns_mapping import find_mapped_columns
+from app.utils.cache import get_cache_version, get_meta_data_cache
 from app.utils.common import (
-    get_dataset_from_file,
-    get_dataset_from_s3,
-    get_dataset_from_url,
+    get_file_hash,
+    get_file_size,
+    get_source_from_file_object,
+    get_source_from_path,
+    get_source_from_s3,
+    get_source_from_url,
+    get_url_version,
+    read_dataset_from_source,
 )
 from app.utils.formats_available import get_formats_available
-from app.utils.granularity import get_granularity
 from app.utils.is_public import get_is_public
+from app.utils.manifest import get_scan_manifest
 from app.utils.output_file_name import (
     get_output_file_name,
     get_output_file_path,
 )
-from app.utils.s3_files import get_list_of_s3_objects, get_s3_resource
+from app.utils.s3_files import (
+    get_s3_client,
+    get_s3_object_etag,
+    iterate_s3_objects,
+)
+from app.utils.schema import get_schema_cache
 from app.utils.spatial_coverage import get_spatial_coverage
 from app.utils.temporal_coverage import get_temporal_coverage
 from app.utils.units import get_units
@@ -29,142 +53,599 @@ from app.utils.units import get_units
 settings = Settings()
 
 
-async def get_dataset_meta_data(dataset_full_path: str, session=None):
+async def extract_meta_data(
+    source, name: str, source_type: SourceType, bucket_name=None
+):
+    dataset = await read_dataset_from_source(source, name)
+    plan = dataset.attrs["schema"]
+    mapped_columns = plan.mapped_columns
+    result = await asyncio.gather(
+        get_output_file_path(
+            name=name, source_type=source_type, bucket_name=bucket_name
+        ),
+        timed("units", get_units(dataset, mapped_columns)),
+        timed(
+            "temporal_coverage",
+            get_temporal_coverage(dataset, mapped_columns),
+        ),
+        timed(
+            "spatial_coverage", get_spatial_coverage(dataset, mapped_columns)
+        ),
+        get_formats_available(name),
+        get_is_public(dataset),
+    )
+    meta_data = dict(ChainMap({"granularity": plan.granularity}, *result))
+    return meta_data, plan.fingerprint
+
+
+def get_meta_data_from_source(
+    source, name: str, source_type: SourceType, bucket_name=None
+):
+    """Parse dataset & extract its meta-data, entry point of worker processes.
+
+    Args:
+        source (bytes | str): content of the file or path of a local file
+        name (str): file name, url or s3-key of the dataset
+        source_type (SourceType): file taken from local or s3
+        bucket_name (str): for s3 object provide the s3 bucket name
+
+    Returns:
+        tuple: meta-data of the dataset & the seconds spent in each stage
+            with counts like bytes read, rows parsed & schema cache hits,
+            and the schema fingerprint, recorded by the server process
+    """
+    with start_recording() as recorder, record_stage("process"):
+        meta_data, fingerprint = asyncio.run(
+            extract_meta_data(source, name, source_type, bucket_name)
+        )
+    return meta_data, {**recorder.to_dict(), "fingerprint": fingerprint}
+
+
+async def process_dataset(
+    open_source, name: str, source_type, metrics_source_type, bucket_name=None
+):
+    """Fetch source of a dataset & extract its meta-data in a worker
+    process, adding timings of its stages to the metrics of the source type.
+
+    Args:
+        open_source: async context manager yielding source of the dataset
+        name (str): file name, url or s3-key of the dataset
+        source_type (SourceType): source type passed to the worker
+        metrics_source_type (SourceType): source type of the metrics, URL
+            datasets are passed to workers as local files
+
+    Returns:
+        tuple: meta-data of the dataset & the seconds spent in each stage
+    """
+    started_at = time.perf_counter()
+    async with open_source as source:
+        fetched_at = time.perf_counter()
+        meta_data, stats = await run_in_process(
+            get_meta_data_from_source,
+            source,
+            name,
+            source_type,
+            bucket_name=bucket_name,
+        )
+    stats["stages"]["fetch"] = fetched_at - started_at
+    stats["stages"]["total"] = time.perf_counter() - started_at
+    record_dataset(metrics_source_type, stats)
+    await get_schema_cache().record(
+        bucket_name or source_type, stats["fingerprint"]
+    )
+    return meta_data, stats["stages"]
+
+
+def with_stages(meta_data: dict, stages: dict) -> dict:
+    # timings are of a single run, hence added after meta-data is cached
+    if not settings.METRICS_DEBUG_STAGES:
+        return meta_data
+    return {
+        **meta_data,
+        "stages": {
+            stage: round(seconds, 6) for stage, seconds in stages.items()
+        },
+    }
+
+
+def without_stages(meta_data: dict) -> dict:
+    return {
+        name: value for name, value in meta_data.items() if name != "stages"
+    }
+
+
+class ScanProgress:
+    """Progress of a multi-dataset run, keeps track of the datasets which failed
+    and forwards every notification to an optional observer like background
+    job or streaming response.
+    """
+
+    def __init__(self, observer=None):
+        self.observer = observer
+        self.failed_keys = set()
+
+    def listed(self, s3_key):
+        if self.observer is not None:
+            self.observer.listed(s3_key)
+
+    async def processed(self, s3_key, meta_data, failed=False):
+        if failed:
+            self.failed_keys.add(s3_key)
+        if self.observer is not None:
+            # an observer like a streaming response may wait for its reader
+            result = self.observer.processed(s3_key, meta_data, failed)
+            if inspect.isawaitable(result):
+                await result
+
+
+async def get_dataset_meta_data(
+    dataset_full_path: str, session=None, progress=None
+):
+    session = get_http_session() if session is None else session
+    cache = get_meta_data_cache()
+    url_version = (
+        await get_url_version(session, dataset_full_path)
+        if cache.enabled
+        else None
+    )
+    cache_key = (SourceType.URL.value, dataset_full_path, url_version)
+    meta_data = cache.get(*cache_key)
+    if cache.enabled:
+        record_cache_lookup(SourceType.URL.value, meta_data is not None)
+    if meta_data is not None:
+        if progress is not None:
+            await progress.processed(dataset_full_path, meta_data)
+        return {dataset_full_path: meta_data}
+
     try:
-        dataset = await get_dataset_from_url(
-            session=session, url=dataset_full_path
+        meta_data, stages = await process_dataset(
+            get_source_from_url(session, dataset_full_path),
+            dataset_full_path,
+            SourceType.LOCAL.value,
+            SourceType.URL.value,
         )
     except Exception as e:
+        record_failure(SourceType.URL.value)
         logger.exception(
             f"Could not get datasets from: {dataset_full_path} : {e}"
         )
         logger.warning(f"Generate Blank MetaData for: {dataset_full_path}")
-        return {
-            dataset_full_path: MetaData(
-                **await get_output_file_name(dataset_full_path)
-            ).dict()
-        }
-    mapped_columns = await find_mapped_columns(dataset.columns)
-    result = await asyncio.gather(
-        get_output_file_path(
-            dataset_full_path, source_type=SourceType.LOCAL.value
-        ),
-        get_units(dataset, mapped_columns),
-        get_temporal_coverage(dataset, mapped_columns),
-        get_granularity(dataset.columns),
-        get_spatial_coverage(dataset),
-        get_formats_available(dataset_full_path),
-        get_is_public(dataset),
-    )
-    meta_data = dict(ChainMap(*result))
+        meta_data = MetaData(
+            **await get_output_file_name(dataset_full_path)
+        ).dict(exclude={"stages"})
+        if progress is not None:
+            await progress.processed(dataset_full_path, meta_data, failed=True)
+        return {dataset_full_path: meta_data}
+    cache.set(meta_data, *cache_key)
+    meta_data = with_stages(meta_data, stages)
+    if progress is not None:
+        await progress.processed(dataset_full_path, meta_data)
     return {dataset_full_path: meta_data}
 
 
-async def create_meta_data_for_dataset_urls(urls: List[str], **kwargs) -> dict:
-    tasks = [
-        asyncio.ensure_future(get_dataset_meta_data(url, **kwargs))
-        for url in urls
-    ]
+async def create_meta_data_for_dataset_urls(
+    urls: List[str], observer=None, **kwargs
+) -> dict:
+    progress = ScanProgress(observer)
+    tasks = []
+    limiter = get_dataset_scheduler().limiter()
+    for url in urls:
+        progress.listed(url)
+        tasks.append(
+            asyncio.ensure_future(
+                limiter.run(
+                    get_dataset_meta_data(url, progress=progress, **kwargs)
+                )
+            )
+        )
 
     results = await asyncio.gather(*tasks)
     return ChainMap(*results)
 
 
-async def get_dataset_meta_data_for_file_object(file_object, filename: str):
+async def get_dataset_meta_data_for_file_object(
+    file_object, filename: str, progress=None
+):
+    cache = get_meta_data_cache()
+    file_hash = (
+        await run_in_thread(get_file_hash, file_object)
+        if cache.enabled
+        else None
+    )
+    cache_key = (SourceType.LOCAL.value, filename, file_hash)
+    meta_data = cache.get(*cache_key)
+    if cache.enabled:
+        record_cache_lookup(SourceType.LOCAL.value, meta_data is not None)
+    if meta_data is not None:
+        if progress is not None:
+            await progress.processed(filename, meta_data)
+        return {filename: meta_data}
+
     try:
-        dataset = await get_dataset_from_file(file_object)
+        meta_data, stages = await process_dataset(
+            get_source_from_file_object(file_object),
+            filename,
+            SourceType.LOCAL.value,
+            SourceType.LOCAL.value,
+        )
     except Exception as e:
+        record_failure(SourceType.LOCAL.value)
         logger.exception(f"Could not get datasets from: {filename} : {e}")
         logger.warning(f"Generate Blank MetaData for: {filename}")
-        return {
-            filename: MetaData(**await get_output_file_name(filename)).dict()
-        }
-    else:
-        mapped_columns = await find_mapped_columns(dataset.columns)
-        result = await asyncio.gather(
-            get_output_file_path(
-                name=filename, source_type=SourceType.LOCAL.value
-            ),
-            get_units(dataset, mapped_columns),
-            get_temporal_coverage(dataset, mapped_columns),
-            get_granularity(dataset.columns),
-            get_spatial_coverage(dataset),
-            get_formats_available(filename),
-            get_is_public(dataset),
+        meta_data = MetaData(**await get_output_file_name(filename)).dict(
+            exclude={"stages"}
         )
-        meta_data = dict(ChainMap(*result))
+        if progress is not None:
+            await progress.processed(filename, meta_data, failed=True)
+        return {filename: meta_data}
+    else:
+        cache.set(meta_data, *cache_key)
+        meta_data = with_stages(meta_data, stages)
+        if progress is not None:
+            await progress.processed(filename, meta_data)
         return {filename: meta_data}
 
 
 async def create_meta_data_for_dataset_csv(
-    csv_file_objects: List[UploadFile],
+    csv_file_objects: List[UploadFile], observer=None
 ) -> dict:
-    tasks = [
-        asyncio.ensure_future(
-            get_dataset_meta_data_for_file_object(
-                csv_file.file, csv_file.filename
+    progress = ScanProgress(observer)
+    tasks = []
+    limiter = get_dataset_scheduler().limiter()
+    for csv_file in csv_file_objects:
+        progress.listed(csv_file.filename)
+        tasks.append(
+            asyncio.ensure_future(
+                limiter.run(
+                    get_dataset_meta_data_for_file_object(
+                        csv_file.file, csv_file.filename, progress=progress
+                    ),
+                    size=get_file_size(csv_file.file),
+                )
             )
         )
-        for csv_file in csv_file_objects
-    ]
 
     results = await asyncio.gather(*tasks)
     return ChainMap(*results)
 
 
-async def get_dataset_meta_data_for_s3_file(s3_resource, s3_bucket, s3_key):
+async def get_dataset_meta_data_for_upload(upload: UploadFile, progress=None):
     try:
-        dataset = await get_dataset_from_s3(
-            s3_resource=s3_resource, s3_bucket=s3_bucket, s3_key=s3_key
+        return await get_dataset_meta_data_for_file_object(
+            upload.file, upload.filename, progress=progress
+        )
+    finally:
+        await upload.close()
+
+
+async def create_meta_data_for_uploaded_files(
+    uploads: AsyncIterator[UploadFile], observer=None
+) -> dict:
+    """Create meta-data of the files of a multipart upload, each of them
+    processed as soon as its part is received rather than once the whole
+    body is received.
+
+    Args:
+        uploads: uploaded files in the order their parts are received
+        observer (optional): notified with `listed(filename)` when a file is
+            received and `processed(filename, meta_data, failed)` when its
+            meta-data is ready
+
+    Returns:
+        Mapping[str, dict]: meta-data for each file name
+    """
+    progress = ScanProgress(observer)
+    tasks = []
+    limiter = get_dataset_scheduler().limiter()
+    async for upload in uploads:
+        progress.listed(upload.filename)
+        tasks.append(
+            asyncio.ensure_future(
+                limiter.run(
+                    get_dataset_meta_data_for_upload(
+                        upload, progress=progress
+                    ),
+                    size=get_file_size(upload.file),
+                )
+            )
+        )
+
+    results = await asyncio.gather(*tasks)
+    return ChainMap(*results)
+
+
+async def get_dataset_meta_data_for_local_file(file_path: str, progress=None):
+    """Return meta-data of a file of the server filesystem, like a mounted
+    volume, which worker processes read from its path & memory map when
+    it is not streamed, so that repeated reads hit the OS page cache.
+    Cached meta-data is found by modification time & size of the file
+    rather than its hash, so that the file is not read to look it up.
+    """
+    cache = get_meta_data_cache()
+    try:
+        file_stat = await run_in_thread(os.stat, file_path)
+    except OSError:
+        file_stat = None
+    cache_key = (
+        SourceType.FILESYSTEM.value,
+        file_path,
+        (
+            None
+            if file_stat is None
+            else f"{file_stat.st_mtime_ns}:{file_stat.st_size}"
+        ),
+    )
+    meta_data = cache.get(*cache_key)
+    if cache.enabled:
+        record_cache_lookup(SourceType.FILESYSTEM.value, meta_data is not None)
+    if meta_data is not None:
+        if progress is not None:
+            await progress.processed(file_path, meta_data)
+        return {file_path: meta_data}
+
+    try:
+        meta_data, stages = await process_dataset(
+            get_source_from_path(file_path),
+            file_path,
+            SourceType.FILESYSTEM.value,
+            SourceType.FILESYSTEM.value,
+        )
+    except Exception as e:
+        record_failure(SourceType.FILESYSTEM.value)
+        logger.exception(f"Could not get datasets from: {file_path} : {e}")
+        logger.warning(f"Generate Blank MetaData for: {file_path}")
+        meta_data = MetaData(**await get_output_file_name(file_path)).dict(
+            exclude={"stages"}
+        )
+        if progress is not None:
+            await progress.processed(file_path, meta_data, failed=True)
+        return {file_path: meta_data}
+    cache.set(meta_data, *cache_key)
+    meta_data = with_stages(meta_data, stages)
+    if progress is not None:
+        await progress.processed(file_path, meta_data)
+    return {file_path: meta_data}
+
+
+def get_path_size(file_path: str):
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        # processing the file fails & gives its blank meta-data
+        return None
+
+
+async def create_meta_data_for_local_files(
+    file_paths: List[str], observer=None
+) -> dict:
+    """Create meta-data of local files, paths are taken as their datasets
+    are processed & results are kept only when there is no observer.
+    """
+    progress = ScanProgress(observer)
+    limiter = get_dataset_scheduler().limiter()
+
+    async def iterate_datasets():
+        for file_path in file_paths:
+            progress.listed(file_path)
+            yield (
+                get_dataset_meta_data_for_local_file(
+                    file_path, progress=progress
+                ),
+                await run_in_thread(get_path_size, file_path),
+            )
+
+    results = await limiter.run_all(
+        iterate_datasets(), collect=observer is None
+    )
+    return ChainMap(*results)
+
+
+async def get_s3_cache_key(s3_client, s3_bucket, s3_key, etag=None):
+    if etag is None and get_meta_data_cache().enabled:
+        try:
+            etag = await get_s3_object_etag(s3_client, s3_bucket, s3_key)
+        except ValueError as e:
+            logger.warning(f"{e}")
+    endpoint_url = s3_client.meta.endpoint_url
+    return (SourceType.S3.value, endpoint_url, s3_bucket, s3_key, etag)
+
+
+async def generate_meta_data_for_s3_file(
+    s3_client, s3_bucket, s3_key, etag=None
+):
+    """Return meta-data of S3 object from the cache or by processing it.
+
+    Raises exception when the object can not be downloaded or processed.
+    """
+    cache = get_meta_data_cache()
+    cache_key = await get_s3_cache_key(s3_client, s3_bucket, s3_key, etag)
+    meta_data = cache.get(*cache_key)
+    if cache.enabled:
+        record_cache_lookup(SourceType.S3.value, meta_data is not None)
+    if meta_data is not None:
+        logger.info(f"Meta-data found in cache for {s3_key}")
+        return meta_data
+
+    meta_data, stages = await process_dataset(
+        get_source_from_s3(
+            s3_client=s3_client, s3_bucket=s3_bucket, s3_key=s3_key
+        ),
+        s3_key,
+        SourceType.S3.value,
+        SourceType.S3.value,
+        bucket_name=s3_bucket,
+    )
+    logger.info(f"Meta-data created for {s3_key}")
+    cache.set(meta_data, *cache_key)
+    return with_stages(meta_data, stages)
+
+
+async def get_dataset_meta_data_for_s3_file(
+    s3_client, s3_bucket, s3_key, etag=None, progress=None
+):
+    try:
+        meta_data = await generate_meta_data_for_s3_file(
+            s3_client, s3_bucket, s3_key, etag
         )
     except Exception as e:
+        record_failure(SourceType.S3.value)
         logger.exception(f"Could not get datasets from: {s3_key} : {e}")
         logger.warning(f"Generate Blank MetaData for: {s3_key}")
-        return {s3_key: MetaData(**await get_output_file_name(s3_key)).dict()}
-    else:
-        logger.info(f"Data-frame created for {s3_key}")
-        mapped_columns = await find_mapped_columns(dataset.columns)
-        result = await asyncio.gather(
-            get_output_file_path(
-                name=s3_key,
-                source_type=SourceType.S3.value,
-                bucket_name=s3_bucket,
-            ),
-            get_units(dataset, mapped_columns),
-            get_temporal_coverage(dataset, mapped_columns),
-            get_granularity(dataset.columns),
-            get_spatial_coverage(dataset),
-            get_formats_available(s3_key),
-            get_is_public(dataset),
+        meta_data = MetaData(**await get_output_file_name(s3_key)).dict(
+            exclude={"stages"}
         )
-        meta_data = dict(ChainMap(*result))
-        logger.info(f"Meta-data created for {s3_key}")
-        return {s3_key: meta_data}
+        if progress is not None:
+            await progress.processed(s3_key, meta_data, failed=True)
+    else:
+        if progress is not None:
+            await progress.processed(s3_key, meta_data)
+    return {s3_key: meta_data}
 
 
 async def create_meta_data_for_s3_bucket(
-    s3_resource, s3_bucket, prefix, file_format
+    s3_client,
+    s3_bucket,
+    prefix,
+    file_format,
+    incremental=False,
+    observer=None,
+    skip_keys=frozenset(),
 ):
-    objects = await get_list_of_s3_objects(s3_resource, s3_bucket, prefix)
-    tasks = [
-        asyncio.ensure_future(
-            get_dataset_meta_data_for_s3_file(
-                s3_resource=s3_resource,
-                s3_bucket=s3_bucket,
-                s3_key=s3_file_obj.key,
-            )
+    """Create meta-data for all the objects of given format in S3 bucket.
+
+    Args:
+        s3_client: S3 client
+        s3_bucket (str): name of S3 bucket
+        prefix (str): prefix of the objects to process
+        file_format (str): suffix of the objects to process
+        incremental (bool): process only objects new or modified since the
+            previous scan of the prefix
+        observer (optional): notified with `listed(s3_key)` when an object
+            is listed and `processed(s3_key, meta_data, failed)` when its
+            meta-data is ready, awaited when it returns an awaitable
+        skip_keys (set): keys of the objects not to process, like the ones
+            processed before a batch scan was interrupted
+
+    Returns:
+        Mapping[str, dict]: meta-data for each S3 key
+    """
+    if incremental:
+        return await create_meta_data_for_s3_bucket_incrementally(
+            s3_client, s3_bucket, prefix, file_format, observer=observer
         )
-        for s3_file_obj in objects
-        if s3_file_obj.key.endswith(file_format)
-    ]
 
-    results = await asyncio.gather(*tasks)
+    # start processing objects of a page while the next page is listed, the
+    # listing is paused while the request has enough objects in flight
+    progress = ScanProgress(observer)
+    limiter = get_dataset_scheduler().limiter()
+
+    async def iterate_datasets():
+        async for s3_object in iterate_s3_objects(
+            s3_client, s3_bucket, prefix
+        ):
+            s3_key = s3_object["Key"]
+            if s3_key.endswith(file_format) and s3_key not in skip_keys:
+                progress.listed(s3_key)
+                yield (
+                    get_dataset_meta_data_for_s3_file(
+                        s3_client=s3_client,
+                        s3_bucket=s3_bucket,
+                        s3_key=s3_key,
+                        etag=s3_object["ETag"],
+                        progress=progress,
+                    ),
+                    s3_object["Size"],
+                )
+
+    results = await limiter.run_all(
+        iterate_datasets(), collect=observer is None
+    )
     return ChainMap(*results)
 
 
-async def create_meta_data_for_s3_files(s3_urls: List[str]):
+async def create_meta_data_for_s3_bucket_incrementally(
+    s3_client, s3_bucket, prefix, file_format, observer=None
+):
+    """Re-scan S3 bucket prefix, processing only the objects which are new or
+    modified since the previous scan as recorded in the scan manifest.
+
+    Objects which could not be processed get blank meta-data and are not
+    recorded, so that they are processed again in the next scan.
+    """
+    manifest = get_scan_manifest()
+    scope = manifest.get_scope(
+        s3_client.meta.endpoint_url, s3_bucket, prefix, file_format
+    )
+    version = get_cache_version()
+    previous_entries = await run_in_thread(
+        manifest.get_entries, scope, version
+    )
+    previous_keys = await run_in_thread(manifest.get_keys, scope)
+
+    progress = ScanProgress(observer)
+    limiter = get_dataset_scheduler().limiter()
+    meta_data, listed_keys, changed_objects = {}, set(), []
+
+    async def iterate_datasets():
+        async for s3_object in iterate_s3_objects(
+            s3_client, s3_bucket, prefix
+        ):
+            s3_key = s3_object["Key"]
+            if not s3_key.endswith(file_format):
+                continue
+            listed_keys.add(s3_key)
+            progress.listed(s3_key)
+            entry = previous_entries.get(s3_key)
+            if entry is not None and entry["etag"] == s3_object["ETag"]:
+                meta_data[s3_key] = entry["meta_data"]
+                await progress.processed(s3_key, entry["meta_data"])
+                continue
+            changed_objects.append(s3_object)
+            yield (
+                get_dataset_meta_data_for_s3_file(
+                    s3_client,
+                    s3_bucket,
+                    s3_key,
+                    etag=s3_object["ETag"],
+                    progress=progress,
+                ),
+                s3_object["Size"],
+            )
+
+    # meta-data of processed objects is needed to update the manifest
+    for result in await limiter.run_all(iterate_datasets()):
+        meta_data.update(result)
+    processed_objects = [
+        s3_object
+        for s3_object in changed_objects
+        if s3_object["Key"] not in progress.failed_keys
+    ]
+    removed_keys = previous_keys - listed_keys
+    # timings are of this scan only, unchanged objects are returned without
+    await run_in_thread(
+        manifest.update,
+        scope,
+        version,
+        processed_objects,
+        {
+            s3_object["Key"]: without_stages(meta_data[s3_object["Key"]])
+            for s3_object in processed_objects
+        },
+    )
+    await run_in_thread(manifest.delete, scope, removed_keys)
+    logger.info(
+        f"Scanned {s3_bucket}/{prefix or ''}: {len(processed_objects)} "
+        f"processed, {len(listed_keys) - len(changed_objects)} unchanged, "
+        f"{len(removed_keys)} removed"
+    )
+    return meta_data
+
+
+async def create_meta_data_for_s3_files(s3_urls: List[str], observer=None):
+    progress = ScanProgress(observer)
+    limiter = get_dataset_scheduler().limiter()
     tasks = []
-    s3_resource = await get_s3_resource(
+    s3_client = await get_s3_client(
         s3_access_key=settings.S3_SOURCE_ACCESS_KEY,
         s3_secret_key=settings.S3_SOURCE_SECRET_KEY,
         s3_endpoint_url=settings.S3_SOURCE_ENDPOINT_URL,
@@ -173,12 +654,16 @@ async def create_meta_data_for_s3_files(s3_urls: List[str]):
     for s3_url in s3_urls:
         url_parts = urlparse(s3_url)
         s3_bucket, s3_key = url_parts.netloc, url_parts.path.lstrip("/")
+        progress.listed(s3_key)
         tasks.append(
             asyncio.ensure_future(
-                get_dataset_meta_data_for_s3_file(
-                    s3_resource=s3_resource,
-                    s3_bucket=s3_bucket,
-                    s3_key=s3_key,
+                limiter.run(
+                    get_dataset_meta_data_for_s3_file(
+                        s3_client=s3_client,
+                        s3_bucket=s3_bucket,
+                        s3_key=s3_key,
+                        progress=progress,
+                    )
                 )
             )
         )
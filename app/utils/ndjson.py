@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+
+from fastapi.logger import logger
+
+from app.models.meta_data import MetaData
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Lines waiting for the client to read them, datasets wait to be queued
+# beyond that, pausing the scan while the client does not read
+STREAM_QUEUE_SIZE = 64
+
+
+class MetaDataStream:
+    """Observer which queues the meta-data of each dataset as soon as it is
+    processed, to be written as a line of a streaming NDJSON response.
+    """
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.started_at = time.perf_counter()
+        self.listed_count = 0
+        self.failed_keys = []
+        self.timings = {}
+
+    def listed(self, key):
+        self.listed_count += 1
+
+    async def processed(self, key, meta_data, failed=False):
+        self.timings[key] = round(time.perf_counter() - self.started_at, 3)
+        if failed:
+            self.failed_keys.append(key)
+        # same fields & order as the non-streaming response model
+        await self.queue.put(
+            {key: MetaData(**meta_data).dict(exclude_unset=True)}
+        )
+
+    def get_summary(self, error=None):
+        return {
+            "summary": {
+                "total": self.listed_count,
+                "processed": len(self.timings),
+                "failed": self.failed_keys,
+                "elapsed_seconds": round(
+                    time.perf_counter() - self.started_at, 3
+                ),
+                "completed_after_seconds": self.timings,
+                "error": error,
+            }
+        }
+
+
+def to_ndjson_line(value: dict) -> str:
+    return json.dumps(value, default=str) + "\n"
+
+
+async def stream_meta_data(create_meta_data, *args, **kwargs):
+    """Yield NDJSON lines of `{name: meta_data}` in the order datasets are
+    processed, followed by a summary line with failures & timings.
+
+    Args:
+        create_meta_data: coroutine function accepting an `observer` keyword
+            argument, like `create_meta_data_for_dataset_urls`
+        *args, **kwargs: arguments of `create_meta_data`
+    """
+    stream = MetaDataStream()
+    task = asyncio.ensure_future(
+        create_meta_data(*args, observer=stream, **kwargs)
+    )
+    try:
+        while not task.done() or not stream.queue.empty():
+            get_item = asyncio.ensure_future(stream.queue.get())
+            await asyncio.wait(
+                {get_item, task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if get_item.done():
+                yield to_ndjson_line(get_item.result())
+            else:
+                get_item.cancel()
+    finally:
+        # client disconnected before all the datasets were processed
+        if not task.done():
+            task.cancel()
+
+    error = None
+    if task.exception() is not None:
+        logger.error(f"Could not stream meta-data: {task.exception()}")
+        error = f"{task.exception()}"
+    yield to_ndjson_line(stream.get_summary(error))
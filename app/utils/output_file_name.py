@@ -16,7 +16,8 @@ async def get_output_file_path(
     name: str, source_type: SourceType, bucket_name: Union[str, None] = None
 ) -> Dict[str, str]:
     """Return file path for given source type. For local files return name ,
-        but for s3 object return full path with proper s3 convention url.
+        but for s3 object return full path with proper s3 convention url
+        and for filesystem files their path trimmed like output file name.
 
     Args:
         name (str): file name or s3-key
@@ -28,6 +29,8 @@ async def get_output_file_path(
     """
     if source_type == SourceType.S3.value:
         output_file_path = f"s3://{bucket_name}/{name}"
+    elif source_type == SourceType.FILESYSTEM.value:
+        return await get_output_file_name(name)
     else:
         output_file_path = f"{name}"
 
@@ -0,0 +1,168 @@
+import codecs
+from contextlib import contextmanager
+from functools import lru_cache
+from io import BufferedReader
+
+import pandas as pd
+from fastapi.logger import logger
+from pandas import read_csv
+
+from app.core.config import Settings
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+settings = Settings()
+
+CSV_PARSERS = ("c", "pyarrow", "arrow")
+
+# Errors of the pyarrow parsers on files they can not read, like rows with
+# missing fields or lines longer than a block, which are read by C instead
+FALLBACK_ERRORS = () if pa is None else (pa.ArrowException, ValueError)
+
+
+@lru_cache()
+def get_csv_parser(parser: str, chunked: bool = False) -> str:
+    """Return the parser to be used for the configured `parser`.
+
+    Parsers using pyarrow fall back to the C parser when it is not
+    installed. pandas `pyarrow` engine can not read in chunks, so chunked
+    reads use the native pyarrow reader instead.
+    """
+    if parser not in CSV_PARSERS:
+        raise ValueError(
+            f"Unknown CSV parser: {parser}, expected one of {CSV_PARSERS}"
+        )
+    if parser != "c" and pa is None:
+        logger.warning(
+            f"pyarrow is not installed, using C instead of {parser}"
+        )
+        return "c"
+    if parser == "pyarrow" and chunked:
+        return "arrow"
+    return parser
+
+
+def get_arrow_options(header, plan, encoding="utf-8", **read_options):
+    # columns are named by position from the pandas header, so duplicated &
+    # unnamed columns are projected the same as by the C parser
+    columns = [str(column) for column in header]
+    projected_columns = [columns[idx] for idx in plan.usecols]
+    return {
+        "read_options": pa_csv.ReadOptions(
+            column_names=columns,
+            skip_rows=1,
+            encoding=encoding,
+            use_threads=settings.CSV_PARSER_USE_THREADS,
+            **read_options,
+        ),
+        "convert_options": pa_csv.ConvertOptions(
+            include_columns=projected_columns,
+            # read as text like the C parser, dictionary encoded values are
+            # converted to categories
+            column_types={
+                column: pa.dictionary(pa.int32(), pa.string())
+                for column in projected_columns
+            },
+            strings_can_be_null=True,
+        ),
+    }
+
+
+def to_text(column: pd.Series) -> pd.Series:
+    """Convert values of a column typed by pyarrow back to text."""
+    values = column.dropna()
+    if pd.api.types.is_float_dtype(column) and (values % 1 == 0).all():
+        # integers with missing values are read as floats
+        column = column.astype("Int64")
+    elif pd.api.types.is_datetime64_any_dtype(column):
+        date_only = (values == values.dt.normalize()).all()
+        column = column.dt.strftime(
+            "%Y-%m-%d" if date_only else "%Y-%m-%d %H:%M:%S"
+        )
+    text = column.astype("string")
+    return text.mask(text == "")
+
+
+def read_csv_with_c(file_object, header, plan, **kwargs):
+    return read_csv(
+        file_object, usecols=plan.usecols, dtype=plan.dtypes, **kwargs
+    )
+
+
+def read_csv_with_pandas_pyarrow(file_object, header, plan, encoding="utf-8"):
+    # the engine neither decodes other encodings nor reads values as text,
+    # hence values inferred as numbers or dates are converted back to text
+    if codecs.lookup(encoding).name != "utf-8":
+        raise ValueError(f"pandas pyarrow engine can not read {encoding}")
+    dataset = read_csv(
+        file_object,
+        engine="pyarrow",
+        usecols=[header[idx] for idx in plan.usecols],
+    )
+    return dataset.apply(to_text).astype(plan.dtypes)
+
+
+def read_csv_with_arrow(file_object, header, plan, encoding="utf-8"):
+    table = pa_csv.read_csv(
+        file_object, **get_arrow_options(header, plan, encoding)
+    )
+    return table.to_pandas()
+
+
+READERS = {
+    "c": read_csv_with_c,
+    "pyarrow": read_csv_with_pandas_pyarrow,
+    "arrow": read_csv_with_arrow,
+}
+
+
+def read_projected_csv(file_object, header, plan, parser="c", **kwargs):
+    """Read projected columns of a seekable csv with the parser, and with
+    the C parser if the file can not be read by it.
+    """
+    # pyarrow reads every column when none is included
+    if parser != "c" and plan.usecols:
+        try:
+            return READERS[parser](file_object, header, plan, **kwargs)
+        except FALLBACK_ERRORS as e:
+            logger.warning(f"Could not parse with {parser}, using C: {e}")
+            file_object.seek(0)
+    return read_csv_with_c(file_object, header, plan, **kwargs)
+
+
+@contextmanager
+def read_csv_chunks(stream, header, plan, parser="c", **kwargs):
+    """Yield an iterator over chunks of projected columns of a csv stream.
+
+    Fallback is left to the caller, as a consumed stream needs to be opened
+    again to be read by another parser.
+    """
+    buffered = BufferedReader(
+        stream, buffer_size=settings.STREAMING_READ_BYTES
+    )
+    # pyarrow reads every column when none is included
+    if parser == "c" or not plan.usecols:
+        with read_csv(
+            buffered,
+            usecols=plan.usecols,
+            dtype=plan.dtypes,
+            chunksize=settings.STREAMING_CHUNK_ROWS,
+            **kwargs,
+        ) as chunks:
+            yield chunks
+        return
+
+    reader = pa_csv.open_csv(
+        buffered,
+        **get_arrow_options(
+            header, plan, block_size=settings.STREAMING_READ_BYTES, **kwargs
+        ),
+    )
+    try:
+        yield (batch.to_pandas() for batch in reader)
+    finally:
+        reader.close()
@@ -1,14 +1,38 @@
+import asyncio
+from functools import lru_cache
+
 import boto3
-from fastapi import HTTPException, status
+from botocore.config import Config
 
 from app.core.config import Settings
+from app.core.executor import run_in_thread
 
 settings = Settings()
 
+fetch_semaphore = None
+
+
+@lru_cache(maxsize=32)
+def create_s3_client(
+    s3_access_key: str, s3_secret_key: str, s3_endpoint_url: str, resource: str
+):
+    # boto3 clients are thread safe, so one client & its connection pool is
+    # shared by all the downloads running in the thread pool
+    session = boto3.Session(
+        aws_access_key_id=s3_access_key,
+        aws_secret_access_key=s3_secret_key,
+    )
+    return session.client(
+        resource.lower(),
+        endpoint_url=s3_endpoint_url,
+        config=Config(max_pool_connections=settings.S3_MAX_CONCURRENCY),
+    )
+
 
-async def get_s3_resource(
+async def get_s3_client(
     s3_access_key: str, s3_secret_key: str, s3_endpoint_url: str, resource: str
 ):
+    """Return the S3 client shared by all requests with same credentials."""
     s3_access_key = (
         settings.S3_SOURCE_ACCESS_KEY
         if s3_access_key is None
@@ -25,39 +49,60 @@ async def get_s3_resource(
         else s3_endpoint_url
     )
     resource = settings.S3_SOURCE_RESOURCE if resource is None else resource
+    if s3_access_key is None or s3_secret_key is None:
+        raise ValueError(
+            "S3 access & secret keys are required, set S3_SOURCE_ACCESS_KEY "
+            "& S3_SOURCE_SECRET_KEY or give them with the request"
+        )
     try:
-        session = boto3.Session(
-            aws_access_key_id=s3_access_key,
-            aws_secret_access_key=s3_secret_key,
+        s3_client = create_s3_client(
+            s3_access_key, s3_secret_key, s3_endpoint_url, resource
         )
-
-        s3_resource = session.resource(resource, endpoint_url=s3_endpoint_url)
     except Exception as e:
         raise ValueError(f"Error connecting to S3: {e}")
     else:
-        return s3_resource
+        return s3_client
 
 
-async def get_list_of_s3_objects(s3_resource, s3_bucket, prefix):
-    try:
-        if prefix:
-            s3_objects = s3_resource.Bucket(s3_bucket).objects.filter(
-                Prefix=prefix
-            )
-        else:
-            s3_objects = s3_resource.Bucket(s3_bucket).objects.all()
-    except Exception as e:
-        raise ValueError(f"Error getting list of S3 objects: {e}")
-    else:
-        return s3_objects
+async def iterate_s3_objects(s3_client, s3_bucket, prefix):
+    """Yield S3 objects under the prefix, page by page as they are listed.
+
+    Objects are dicts with `Key`, `LastModified`, `ETag` & `Size` keys.
+    """
+    paginator = s3_client.get_paginator("list_objects_v2")
+    pages = iter(paginator.paginate(Bucket=s3_bucket, Prefix=prefix or ""))
+    while True:
+        try:
+            page = await run_in_thread(next, pages, None)
+        except Exception as e:
+            raise ValueError(f"Error getting list of S3 objects: {e}")
+        if page is None:
+            break
+        for s3_object in page.get("Contents", []):
+            yield s3_object
+
 
+async def get_list_of_s3_objects(s3_client, s3_bucket, prefix):
+    return [
+        s3_object
+        async for s3_object in iterate_s3_objects(s3_client, s3_bucket, prefix)
+    ]
 
-async def get_s3_object(s3_resource, s3_bucket, s3_key):
+
+async def get_s3_object_etag(s3_client, s3_bucket, s3_key):
     try:
-        s3_object = s3_resource.Object(s3_bucket, s3_key)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"{e}"
+        s3_object = await run_in_thread(
+            s3_client.head_object, Bucket=s3_bucket, Key=s3_key
         )
+    except Exception as e:
+        raise ValueError(f"Error getting S3 object {s3_key}: {e}")
     else:
-        return s3_object
+        return s3_object["ETag"]
+
+
+def get_fetch_semaphore():
+    # created lazily to bind it with the running event loop
+    global fetch_semaphore
+    if fetch_semaphore is None:
+        fetch_semaphore = asyncio.Semaphore(settings.S3_MAX_CONCURRENCY)
+    return fetch_semaphore
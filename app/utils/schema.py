@@ -0,0 +1,283 @@
+import json
+import sqlite3
+import time
+from collections import Counter
+from hashlib import sha256
+from threading import Lock
+
+from fastapi.logger import logger
+
+from app.core.config import Settings
+from app.core.executor import run_in_thread
+from app.core.metrics import record_count, record_stage
+from app.utils.cache import (
+    LRUCache,
+    SQLiteCache,
+    connect_sqlite,
+    get_cache_version,
+)
+from app.utils.columns_mapping import find_mapped_columns
+from app.utils.granularity import get_granularity
+
+settings = Settings()
+
+# Only these mapped columns are read by the meta-data extractors, every other
+# column is needed just in the header to classify the dataset.
+# All of them have few distinct values repeated over the rows, so they are
+# read as categories, whose codes take a fraction of the memory of strings &
+# extractors only look at their categories. Year, date, month & quarter
+# values are parsed by the extractors from the string categories.
+PROJECTED_COLUMN_DTYPES = {
+    "calender_year": "category",
+    "fiscal_year": "category",
+    "academic_year": "category",
+    "other_year": "category",
+    "date": "category",
+    "month": "category",
+    "quarter": "category",
+    "country": "category",
+    "state": "category",
+    "district": "category",
+    "unit": "category",
+}
+
+
+def get_schema_fingerprint(header, version: str):
+    """Hash of the ordered column names of a dataset & version of the rules.
+
+    Dtypes of the columns read are decided by their names, hence they are
+    part of the plan cached for a fingerprint rather than the fingerprint.
+    """
+    schema = json.dumps([version, [str(column) for column in header]])
+    return sha256(schema.encode()).hexdigest()
+
+
+def get_projection(header, mapped_columns):
+    """Return positions and dtypes of the columns required by the extractors.
+
+    Positions are used instead of names, so that duplicated column names
+    (mangled by pandas as `name.1`) are projected correctly.
+    """
+    dtypes = {
+        column: dtype
+        for column_type, dtype in PROJECTED_COLUMN_DTYPES.items()
+        for column in mapped_columns[column_type]
+    }
+    usecols = [idx for idx, column in enumerate(header) if column in dtypes]
+    return usecols, dtypes
+
+
+class SchemaPlan:
+    """Everything derived from the header of a dataset, column mapping,
+    granularity & the projection of columns to be read.
+    """
+
+    def __init__(
+        self, fingerprint, mapped_columns, granularity, usecols, dtypes
+    ):
+        self.fingerprint = fingerprint
+        self.mapped_columns = mapped_columns
+        self.granularity = granularity
+        self.usecols = usecols
+        self.dtypes = dtypes
+
+    @classmethod
+    async def create(cls, fingerprint, header):
+        with record_stage("column_mapping"):
+            mapped_columns = await find_mapped_columns(header)
+        with record_stage("granularity"):
+            granularity = await get_granularity(mapped_columns)
+        usecols, dtypes = get_projection(header, mapped_columns)
+        return cls(
+            fingerprint,
+            mapped_columns,
+            granularity["granularity"],
+            usecols,
+            dtypes,
+        )
+
+    def to_dict(self):
+        return {
+            "mapped_columns": {
+                category: list(columns)
+                for category, columns in self.mapped_columns.items()
+            },
+            "granularity": self.granularity,
+            "usecols": self.usecols,
+            "dtypes": self.dtypes,
+        }
+
+    @classmethod
+    def from_dict(cls, fingerprint, plan: dict):
+        mapped_columns = {
+            category: frozenset(columns)
+            for category, columns in plan["mapped_columns"].items()
+        }
+        mapped_columns["unmapped"] = list(mapped_columns["unmapped"])
+        return cls(
+            fingerprint,
+            mapped_columns,
+            plan["granularity"],
+            plan["usecols"],
+            plan["dtypes"],
+        )
+
+
+class SchemaUsage:
+    """Number of datasets parsed per schema fingerprint in every scope, like
+    a S3 bucket, kept in SQLite so that it persists across restarts.
+
+    Datasets are counted in memory by the server process & written in
+    batches. It is only a statistic, so a batch which can not be written,
+    like while the database is locked, is logged & dropped.
+    """
+
+    FLUSH_DATASETS = 1000
+    FLUSH_SECONDS = 5
+
+    def __init__(self, path: str):
+        self.lock = Lock()
+        self.pending = Counter()
+        self.flushed_at = time.monotonic()
+        self.connection = connect_sqlite(path)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS schema_usage (scope TEXT, "
+                "fingerprint TEXT, datasets INTEGER, "
+                "PRIMARY KEY (scope, fingerprint))"
+            )
+
+    def add(self, scope: str, fingerprint: str) -> bool:
+        """Count a dataset, returns whether pending counts are to be flushed."""
+        with self.lock:
+            self.pending[scope, fingerprint] += 1
+            return (
+                sum(self.pending.values()) >= self.FLUSH_DATASETS
+                or time.monotonic() - self.flushed_at >= self.FLUSH_SECONDS
+            )
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flushed_at = time.monotonic()
+            if not pending:
+                return
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT INTO schema_usage VALUES (?, ?, ?) "
+                        "ON CONFLICT (scope, fingerprint) "
+                        "DO UPDATE SET datasets = datasets + excluded.datasets",
+                        [
+                            (scope, fingerprint, datasets)
+                            for (
+                                scope,
+                                fingerprint,
+                            ), datasets in pending.items()
+                        ],
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not record schema usage: {e}")
+
+    def stats(self, scope=None):
+        self.flush()
+        query = "SELECT scope, fingerprint, datasets FROM schema_usage"
+        params = ()
+        if scope is not None:
+            query, params = f"{query} WHERE scope = ?", (scope,)
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+
+        scopes = {}
+        for row_scope, fingerprint, datasets in rows:
+            scopes.setdefault(row_scope, {})[fingerprint] = datasets
+        return {
+            row_scope: {
+                "datasets": sum(fingerprints.values()),
+                "schemas": len(fingerprints),
+                # share of datasets whose schema was seen before in the scope
+                "hit_rate": round(
+                    1 - len(fingerprints) / sum(fingerprints.values()), 3
+                ),
+                "fingerprints": fingerprints,
+            }
+            for row_scope, fingerprints in scopes.items()
+        }
+
+
+class SchemaCache:
+    """Schema plans keyed on the fingerprint of dataset headers.
+
+    Datasets produced by the same pipelines share their header, so the
+    classification & projection of a header is done once per schema.
+    """
+
+    def __init__(self, backend, usage: SchemaUsage):
+        self.backend = backend
+        self.usage = usage
+        self.version = get_cache_version()
+
+    async def get_plan(self, header) -> SchemaPlan:
+        fingerprint = get_schema_fingerprint(header, self.version)
+        plan = None
+        if self.backend is not None:
+            try:
+                plan = self.backend.get(fingerprint)
+            except sqlite3.Error as e:
+                # the plan is only cached, it is created again instead
+                logger.warning(f"Could not read schema plan: {e}")
+        if plan is not None:
+            record_count("schema_cache_hit")
+            return SchemaPlan.from_dict(fingerprint, plan)
+
+        record_count("schema_cache_miss")
+        schema_plan = await SchemaPlan.create(fingerprint, header)
+        if self.backend is not None:
+            try:
+                self.backend.set(fingerprint, schema_plan.to_dict())
+            except sqlite3.Error as e:
+                logger.warning(f"Could not cache schema plan: {e}")
+        return schema_plan
+
+    async def record(self, scope: str, fingerprint: str):
+        # batches of counts are written to SQLite in a thread
+        if self.usage.add(scope, fingerprint):
+            await run_in_thread(self.usage.flush)
+
+    def flush(self):
+        self.usage.flush()
+
+    def stats(self, scope=None):
+        return {
+            "cache": (
+                {"backend": None}
+                if self.backend is None
+                else self.backend.stats()
+            ),
+            "scopes": self.usage.stats(scope),
+        }
+
+
+schema_cache = None
+
+
+def get_schema_cache():
+    """Return the schema cache of the process, created on first use."""
+    global schema_cache
+    if schema_cache is None:
+        if settings.SCHEMA_CACHE_BACKEND == "sqlite":
+            backend = SQLiteCache(
+                settings.SCHEMA_CACHE_PATH,
+                settings.SCHEMA_CACHE_SIZE,
+                table="schema_plans",
+            )
+            usage = SchemaUsage(settings.SCHEMA_CACHE_PATH)
+        else:
+            backend = (
+                LRUCache(settings.SCHEMA_CACHE_SIZE)
+                if settings.SCHEMA_CACHE_BACKEND == "memory"
+                else None
+            )
+            usage = SchemaUsage(":memory:")
+        schema_cache = SchemaCache(backend, usage)
+    return schema_cache
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from app.core.config import GeographySettings
+
+geography_settings = GeographySettings()
+
+
+def get_bit_length(values: np.ndarray) -> np.ndarray:
+    """Number of bits needed to represent each of unsigned 64 bit values."""
+    values = values.copy()
+    bit_length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        shifted = values >= (np.uint64(1) << np.uint64(shift))
+        bit_length[shifted] += shift
+        values[shifted] >>= np.uint64(shift)
+    return bit_length + (values > 0)
+
+
+class HyperLogLog:
+    """Cardinality sketch using `2 ** precision` registers of memory, with a
+    relative error of about `1.04 / sqrt(2 ** precision)`.
+    """
+
+    def __init__(self, precision: int):
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.int64)
+
+    def add(self, values: np.ndarray):
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        suffix_bits = 64 - self.precision
+        indices = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        suffixes = hashes & np.uint64((1 << suffix_bits) - 1)
+        # position of the leftmost 1 bit in the suffix of the hash
+        ranks = suffix_bits - get_bit_length(suffixes) + 1
+        np.maximum.at(self.registers, indices, ranks)
+
+    def estimate(self) -> int:
+        registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        estimate = (
+            alpha * registers**2 / np.sum(2.0 ** -self.registers.astype(float))
+        )
+        empty_registers = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * registers and empty_registers:
+            # linear counting is more accurate for small cardinalities
+            estimate = registers * np.log(registers / empty_registers)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """Count distinct non-null values fed chunk by chunk in bounded memory.
+
+    Values are kept exactly till there are more than `threshold` of them,
+    after which they spill into a HyperLogLog sketch & only an estimate is
+    known. First value seen is kept to represent a single valued column.
+    """
+
+    def __init__(
+        self,
+        threshold: int = geography_settings.DISTINCT_COUNT_EXACT_THRESHOLD,
+        precision: int = geography_settings.DISTINCT_COUNT_PRECISION,
+    ):
+        self.threshold = threshold
+        self.precision = precision
+        self.values = {}
+        self.sketch = None
+        self.first_value = None
+
+    @classmethod
+    def from_values(cls, values, **kwargs):
+        counter = cls(**kwargs)
+        counter.update(values)
+        return counter
+
+    def update(self, values):
+        values = pd.unique(np.asarray(values, dtype=object))
+        values = values[pd.notna(values)]
+        if len(values) == 0:
+            return
+        if self.first_value is None:
+            self.first_value = values[0]
+
+        if self.sketch is None:
+            self.values.update(dict.fromkeys(values))
+            if len(self.values) <= self.threshold:
+                return
+            values = np.array(list(self.values), dtype=object)
+            self.values = {}
+            self.sketch = HyperLogLog(self.precision)
+        self.sketch.add(values)
+
+    @property
+    def is_exact(self):
+        return self.sketch is None
+
+    def count(self) -> int:
+        if self.is_exact:
+            return len(self.values)
+        return self.sketch.estimate()
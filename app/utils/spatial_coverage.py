@@ -1,24 +1,38 @@
-import pandas as pd
 from fastapi.logger import logger
 
 from app.core.config import GeographySettings
-from app.utils.columns_mapping import find_geography_columns
+from app.utils.columns_mapping import get_column_classifier
+from app.utils.sketch import DistinctCounter
+from app.utils.streaming import get_unique_values
 
 geography_settings = GeographySettings()
 
 
+def get_distinct_counters(dataset, columns):
+    """Return distinct counters of the columns, streamed datasets count
+    their geography columns while they are read, others are counted here
+    in a single pass over unique values of each column.
+    """
+    distinct_counters = dataset.attrs.get("distinct_counters", {})
+    return [
+        (
+            distinct_counters[column]
+            if column in distinct_counters
+            else DistinctCounter.from_values(
+                get_unique_values(dataset[column], dropna=True)
+            )
+        )
+        for column in columns
+    ]
+
+
 class GeoCoverage:
-    def __init__(self, dataset, columns, geo_entity_type):
-        self.dataset = dataset
-        self.get_geographic_columns = columns
+    def __init__(self, distinct_counters, geo_entity_type):
+        self.distinct_counters = distinct_counters
         self.geo_entity_type = geo_entity_type
 
     def nunique(self):
-        return sum(
-            self.dataset[list(self.get_geographic_columns)].nunique(
-                dropna=True
-            )
-        )
+        return sum(counter.count() for counter in self.distinct_counters)
 
     def single_unique_value(self):
         if self.nunique() > 1:
@@ -26,24 +40,18 @@ class GeoCoverage:
                 self.geo_entity_type
             )
 
-        unique_values_with_nan = pd.unique(
-            self.dataset[list(self.get_geographic_columns)].values.ravel()
-        )
-        unique_values_without_nan = unique_values_with_nan[
-            pd.notna(unique_values_with_nan)
-        ]
-        try:
-            return unique_values_without_nan[0]
-        except IndexError as ie:
-            logger.exception(
-                f"No unique value found for {self.geo_entity_type}: {ie}"
-            )
-            return ""
+        for counter in self.distinct_counters:
+            if counter.first_value is not None:
+                return counter.first_value
+        logger.warning(f"No unique value found for {self.geo_entity_type}")
+        return ""
 
 
-async def get_spatial_coverage(dataset):
+async def get_spatial_coverage(dataset, mapped_columns):
 
-    geographic_columns = await find_geography_columns(dataset.columns)
+    geographic_columns = get_column_classifier().get_group(
+        mapped_columns, "geography"
+    )
 
     # remove all columns whose values are null
     geographic_columns = {
@@ -58,7 +66,8 @@ async def get_spatial_coverage(dataset):
     geo_coverage_dict = {}
     for column_type in geographic_columns:
         column_type_geo_coverage = GeoCoverage(
-            dataset, geographic_columns[column_type], column_type
+            get_distinct_counters(dataset, geographic_columns[column_type]),
+            column_type,
         )
         geo_coverage_dict[column_type] = {
             "nunique": column_type_geo_coverage.nunique(),
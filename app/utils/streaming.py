@@ -0,0 +1,111 @@
+from io import RawIOBase
+
+import numpy as np
+import pandas as pd
+
+from app.utils.sketch import DistinctCounter
+
+
+def get_unique_values(column: pd.Series, dropna: bool = False):
+    """Return unique values of a column, null included unless `dropna`.
+
+    Categorical columns already hold their unique values as categories, so
+    only their codes are checked for nulls instead of hashing every row.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        values = column.cat.categories.to_numpy(dtype=object)
+        if not dropna and column.hasnans:
+            values = np.append(values, np.nan)
+        return values
+    values = pd.unique(column)
+    return values[pd.notna(values)] if dropna else values
+
+
+class HeadBufferedStream(RawIOBase):
+    """Readable stream which keeps the first bytes of a non seekable stream
+    (like S3 `Body`) in `head`, so that header & encoding can be detected
+    before the complete stream is parsed.
+    """
+
+    def __init__(self, stream, head_size: int):
+        self.stream = stream
+        self.head = stream.read(head_size)
+        # make sure complete header line is available in the head
+        while b"\n" not in self.head:
+            data = stream.read(head_size)
+            if not data:
+                break
+            self.head += data
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.position < len(self.head):
+            start, end = self.position, self.position + len(buffer)
+            data = self.head[start:end]
+            self.position += len(data)
+        else:
+            data = self.stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class UniqueValuesAccumulator:
+    """Collect unique values (null included) of every column chunk by chunk.
+
+    Meta-data extractors only look at unique values of the mapped columns,
+    hence the memory used depends on distinct values and not on the number
+    of rows in the dataset. Columns whose distinct values are only counted
+    are fed to a `DistinctCounter` instead, bounding their memory as well.
+    """
+
+    def __init__(self, columns, dtypes, counted_columns=()):
+        self.dtypes = dtypes
+        self.unique_values = {
+            column: np.array([], dtype=object)
+            for column in columns
+            if column not in counted_columns
+        }
+        self.distinct_counters = {
+            column: DistinctCounter()
+            for column in columns
+            if column in counted_columns
+        }
+
+    def update(self, chunk):
+        """Add unique values of a chunk, a dataset or a mapping of columns
+        to their values, like unique values of a parquet row group.
+        """
+        for column, previous_values in self.unique_values.items():
+            chunk_values = np.asarray(
+                get_unique_values(chunk[column]), dtype=object
+            )
+            self.unique_values[column] = pd.unique(
+                np.concatenate([previous_values, chunk_values])
+            )
+        for column, counter in self.distinct_counters.items():
+            counter.update(get_unique_values(chunk[column], dropna=True))
+
+    def to_dataset(self) -> pd.DataFrame:
+        """Return the unique values as a dataset.
+
+        Shorter columns are padded by repeating their first value, this keeps
+        the unique values & their count unchanged for every column. Counted
+        columns are in `dataset.attrs["distinct_counters"]`.
+        """
+        length = max(
+            (len(values) for values in self.unique_values.values()), default=0
+        )
+        dataset = {}
+        for column, values in self.unique_values.items():
+            if 0 < len(values) < length:
+                padding = np.full(length - len(values), values[0], object)
+                values = np.concatenate([values, padding])
+            dataset[column] = pd.Series(values, dtype=object)
+            if self.dtypes.get(column) == "category":
+                dataset[column] = dataset[column].astype("category")
+        dataset = pd.DataFrame(dataset, columns=list(self.unique_values))
+        dataset.attrs["distinct_counters"] = self.distinct_counters
+        return dataset
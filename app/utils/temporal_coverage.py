@@ -1,11 +1,12 @@
-import re
 from itertools import chain
-from typing import List
 
+import numpy as np
 import pandas as pd
 from fastapi.logger import logger
 
 from app.core.config import DateTimeSettings
+from app.utils.date_formats import parse_dates, parse_months, parse_quarters
+from app.utils.streaming import get_unique_values
 
 datetime_settings = DateTimeSettings()
 
@@ -31,12 +32,9 @@ def convert_to_fiscal_year(calender_year):
 
 
 def verify_proper_format_of_year_values(
-    list_of_values: List, year_pattern=datetime_settings.ALL_YEAR_FORMATS
+    year_values: pd.Series, year_pattern=datetime_settings.ALL_YEAR_FORMATS
 ):
-    year_regex_pattern = re.compile(year_pattern)
-    return all(
-        bool(year_regex_pattern.match(year_val)) for year_val in list_of_values
-    )
+    return bool(year_values.str.match(year_pattern).all())
 
 
 def get_list_of_years_in_interval(year_period):
@@ -93,45 +91,92 @@ def temporal_coverage_representation(is_sequence, year_mapping):
     return f"{year_values_from_mapping[0]} to {year_values_from_mapping[-1]}"
 
 
-def is_fiscal_check(unique_years):
-    for year in unique_years:
-        if "-" not in year:
-            return False
-    return True
+def is_fiscal_check(year_values: pd.Series):
+    return bool(year_values.str.contains("-", regex=False).all())
 
 
-def get_time_periods(years, is_fiscal=False):
-    if not is_fiscal:
-        years = sorted(map(int, years))
-        years = list(map(str, years))
-    else:
-        # sort the fiscal years
-        years = sorted(years, key=lambda x: int(x.split("-")[0]))
-    time_periods = []
-    start_year = years[0]
-    end_year = years[0]
-
-    for year in years[1:]:
-        if int(year.split("-")[0]) == int(end_year.split("-")[0]) + 1:
-            end_year = year
-        else:
-            if start_year == end_year:
-                time_periods.append(start_year)
-            else:
-                time_periods.append(f"{start_year} to {end_year}")
-            start_year = year
-            end_year = year
-
-    # Add the last time period
-    if start_year == end_year:
-        time_periods.append(start_year)
-    else:
-        time_periods.append(f"{start_year} to {end_year}")
+def get_start_years(year_values: pd.Series):
+    # input values : 2020, 2020-21
+    # output values : 2020, 2020
+    return (
+        year_values.str.extract(r"^(\d{4})", expand=False)
+        .astype(np.int64)
+        .to_numpy()
+    )
+
 
+def get_time_periods(year_values: pd.Series):
+    """Represent years as ranges of consecutive years, like
+    `2015 to 2018, 2020`, years are consecutive when their start years are.
+    """
+    labels = year_values.to_numpy()
+    start_years = get_start_years(year_values)
+    order = np.argsort(start_years, kind="stable")
+    labels, start_years = labels[order], start_years[order]
+
+    # a new time period starts wherever the next year is not consecutive
+    starts = np.flatnonzero(np.diff(start_years) != 1) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.concatenate((starts[1:], [len(labels)])) - 1
+    time_periods = [
+        labels[start] if start == end else f"{labels[start]} to {labels[end]}"
+        for start, end in zip(starts, ends)
+    ]
     return ", ".join(time_periods)
 
 
+def get_period_ranges(periods: pd.PeriodIndex, label_format: str):
+    """Represent months or quarters as ranges of consecutive periods, like
+    `Jan 2019 to Mar 2020, May 2020`.
+    """
+    periods = periods.sort_values()
+    ordinals = periods.asi8
+    starts = np.flatnonzero(np.diff(ordinals) != 1) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.concatenate((starts[1:], [len(periods)])) - 1
+    labels = periods.strftime(label_format)
+    return ", ".join(
+        labels[start] if start == end else f"{labels[start]} to {labels[end]}"
+        for start, end in zip(starts, ends)
+    )
+
+
+def get_unique_years_of_dates(date_values: pd.Series):
+    # dates repeat a lot more than the years, so only unique dates are parsed
+    unique_years = parse_dates(date_values).dt.year
+    return pd.Series(pd.unique(unique_years))
+
+
+def get_unique_year_values(year_values: pd.Series):
+    unique_years = pd.Series(get_unique_values(year_values), dtype=object)
+    return unique_years[unique_years.astype(bool)]
+
+
+def get_year_coverage(unique_year_values: pd.Series):
+    # missing years are represented as `nan`, failing the format
+    unique_year_values = unique_year_values.astype(str)
+    # years written as floats, like `2015.0`, are years whichever parser or
+    # file format typed them as floats or kept them as text
+    unique_year_values = unique_year_values.str.replace(
+        r"^(\d{4})\.0+$", r"\1", regex=True
+    ).drop_duplicates()
+    if unique_year_values.empty or not verify_proper_format_of_year_values(
+        unique_year_values
+    ):
+        return ""
+    # either all or none of the years should be fiscal years
+    if not is_fiscal_check(unique_year_values) and any(
+        unique_year_values.str.contains("-", regex=False)
+    ):
+        return ""
+    return get_time_periods(unique_year_values)
+
+
 async def get_temporal_coverage(dataset, mapped_columns: dict):
+    """Coverage from the finest temporal column whose values can be parsed,
+    dates are represented by their years, months & quarters with a year as
+    ranges of months & quarters and otherwise the years of year columns.
+    """
     year_columns = (
         list(mapped_columns["calender_year"])
         + list(mapped_columns["fiscal_year"])
@@ -140,27 +185,28 @@ async def get_temporal_coverage(dataset, mapped_columns: dict):
     )
     year_columns = [year_column for year_column in year_columns if year_column]
     date_columns = list(mapped_columns["date"])
+    month_columns = list(mapped_columns["month"])
+    quarter_columns = list(mapped_columns["quarter"])
 
     if len(date_columns) != 0:
-        date_column = date_columns[0]
-        # Extract unique years
-        unique_year_values = pd.to_datetime(
-            dataset[date_column], format="%d-%m-%Y"
-        ).dt.year.unique()
-        unique_year_values = [str(year) for year in unique_year_values]
-    elif len(year_columns) != 0:
-        year_column = year_columns[0]
-        unique_year_values = [
-            str(year_val)
-            for year_val in dataset[year_column].unique()
-            if year_val
-        ]
-    else:
-        return {"temporal_coverage": ""}
+        unique_year_values = get_unique_years_of_dates(
+            dataset[date_columns[0]]
+        )
+        if not unique_year_values.empty:
+            return {"temporal_coverage": get_year_coverage(unique_year_values)}
+
+    if len(month_columns) != 0:
+        months = parse_months(dataset[month_columns[0]])
+        if not months.empty:
+            return {"temporal_coverage": get_period_ranges(months, "%b %Y")}
+
+    if len(quarter_columns) != 0:
+        quarters = parse_quarters(dataset[quarter_columns[0]])
+        if not quarters.empty:
+            return {"temporal_coverage": get_period_ranges(quarters, "Q%q %Y")}
 
-    if not verify_proper_format_of_year_values(unique_year_values):
-        return {"temporal_coverage": ""}
-    is_fiscal = is_fiscal_check(unique_year_values)
-    temporal_coverage = get_time_periods(unique_year_values, is_fiscal)
+    if len(year_columns) != 0:
+        unique_year_values = get_unique_year_values(dataset[year_columns[0]])
+        return {"temporal_coverage": get_year_coverage(unique_year_values)}
 
-    return {"temporal_coverage": temporal_coverage}
+    return {"temporal_coverage": ""}
@@ -1,5 +1,7 @@
 from itertools import chain
 
+from app.utils.streaming import get_unique_values
+
 unit_columns = ["unit"]
 
 
@@ -14,7 +16,7 @@ async def get_units(dataset, mapped_columns):
     # find all unique set of units presnt in a dataset
     unit_column_unique_values = [
         unit.split(",")
-        for unit in dataset[unit_columns[0]].unique()
+        for unit in get_unique_values(dataset[unit_columns[0]], dropna=True)
         if isinstance(unit, str)
     ]
     unique_units_from_unit_columns = list(
@@ -0,0 +1,87 @@
+from fastapi import HTTPException, Request, status
+from multipart import MultipartParser
+from multipart.multipart import parse_options_header
+from starlette.datastructures import Headers, UploadFile
+from starlette.formparsers import MultiPartMessage, MultiPartParser
+
+
+def decode_option(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+class UploadedFilesParser(MultiPartParser):
+    """Multipart parser yielding each uploaded file as soon as its part is
+    received, instead of the whole form once all of the body is received.
+    Fields which are not files are skipped.
+    """
+
+    def create_file(self, headers):
+        options = parse_options_header(
+            dict(headers).get(b"content-disposition")
+        )[1]
+        if b"filename" not in options:
+            return None
+        return UploadFile(
+            filename=decode_option(options[b"filename"]),
+            content_type=dict(headers)
+            .get(b"content-type", b"")
+            .decode("latin-1"),
+            headers=Headers(raw=headers),
+        )
+
+    async def iter_files(self):
+        content_type, params = parse_options_header(
+            self.headers.get("Content-Type")
+        )
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a multipart/form-data body with a boundary",
+            )
+        parser = MultipartParser(
+            params[b"boundary"],
+            {
+                "on_part_begin": self.on_part_begin,
+                "on_part_data": self.on_part_data,
+                "on_part_end": self.on_part_end,
+                "on_header_field": self.on_header_field,
+                "on_header_value": self.on_header_value,
+                "on_header_end": self.on_header_end,
+                "on_headers_finished": self.on_headers_finished,
+                "on_end": self.on_end,
+            },
+        )
+        header_field, header_value, headers, file = b"", b"", [], None
+        async for chunk in self.stream:
+            parser.write(chunk)
+            messages = list(self.messages)
+            self.messages.clear()
+            for message_type, message_bytes in messages:
+                if message_type == MultiPartMessage.PART_BEGIN:
+                    headers, file = [], None
+                elif message_type == MultiPartMessage.HEADER_FIELD:
+                    header_field += message_bytes
+                elif message_type == MultiPartMessage.HEADER_VALUE:
+                    header_value += message_bytes
+                elif message_type == MultiPartMessage.HEADER_END:
+                    headers.append((header_field.lower(), header_value))
+                    header_field, header_value = b"", b""
+                elif message_type == MultiPartMessage.HEADERS_FINISHED:
+                    file = self.create_file(headers)
+                elif file is None:
+                    continue
+                elif message_type == MultiPartMessage.PART_DATA:
+                    await file.write(message_bytes)
+                elif message_type == MultiPartMessage.PART_END:
+                    await file.seek(0)
+                    yield file
+                    file = None
+        parser.finalize()
+
+
+def iterate_uploaded_files(request: Request):
+    """Yield files of a multipart request body as their parts are received."""
+    return UploadedFilesParser(request.headers, request.stream()).iter_files()
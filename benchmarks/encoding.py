@@ -0,0 +1,77 @@
+"""Benchmark encoding detection over UTF-8, Latin-1 & UTF-16 datasets.
+
+Compares detecting encoding from samples before parsing, against parsing as
+UTF-8 and on failure detecting charset from the whole file & parsing again.
+
+    python -m benchmarks.encoding --rows 200000
+"""
+
+import argparse
+import random
+from io import BytesIO
+from time import perf_counter
+
+from charset_normalizer import from_bytes
+from pandas import read_csv
+
+from app.utils.encoding import detect_encoding, get_samples
+
+ENCODINGS = ["utf-8", "latin-1", "utf-16"]
+STATES = ["Tamil Nadu", "Kerala", "Assam", "Goa", "Odisha"]
+UNITS = ["température in °C", "value in Rs", "área in Ha"]
+
+
+def make_dataset(rows: int, encoding: str) -> bytes:
+    random.seed(rows)
+    lines = ["year,state,unit,value"]
+    lines.extend(
+        f"{random.randint(2000, 2020)},{random.choice(STATES)},"
+        f"{random.choice(UNITS)},{random.random():.4f}"
+        for _ in range(rows)
+    )
+    return "\n".join(lines).encode(encoding)
+
+
+def parse_with_retry(data: bytes):
+    try:
+        return read_csv(BytesIO(data))
+    except UnicodeDecodeError:
+        encoding = from_bytes(data).best().encoding
+        return read_csv(BytesIO(data), encoding=encoding)
+
+
+def parse_with_sampled_detection(data: bytes):
+    # detected without the encoding cache, which would answer every run
+    # after the first one
+    encoding = detect_encoding(get_samples(data))
+    return read_csv(BytesIO(data), encoding=encoding)
+
+
+def measure(func, data: bytes, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func(data)
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'encoding':<10}{'size MB':>10}{'retry s':>10}{'sampled s':>12}")
+    for encoding in ENCODINGS:
+        data = make_dataset(args.rows, encoding)
+        retry = measure(parse_with_retry, data, args.repeat)
+        sampled = measure(parse_with_sampled_detection, data, args.repeat)
+        print(
+            f"{encoding:<10}{len(data) / 1e6:>10.1f}"
+            f"{retry:>10.3f}{sampled:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark each stage of meta-data extraction of a synthetic dataset.
+
+Encoding detection, column mapping & granularity of the header, parsing of
+the mapped columns and each extractor are measured on their own, with the
+best of `--repeat` runs reported. Caches of encodings & column mappings are
+bypassed, so that every run does the work.
+
+    python -m benchmarks.extractors --rows 1000000 --temporal date
+    python -m benchmarks.extractors --encoding latin-1 --output results.json
+"""
+
+import argparse
+import asyncio
+from io import BytesIO
+from time import perf_counter
+
+from pandas import read_csv
+
+from app.core.config import Settings
+from app.utils.columns_mapping import ColumnClassifier, get_column_rules
+from app.utils.encoding import detect_encoding, get_samples
+from app.utils.granularity import get_granularity
+from app.utils.parsers import get_csv_parser, read_projected_csv
+from app.utils.schema import SchemaPlan, get_projection
+from app.utils.spatial_coverage import get_spatial_coverage
+from app.utils.temporal_coverage import get_temporal_coverage
+from app.utils.units import get_units
+from benchmarks.generator import (
+    add_dataset_arguments,
+    get_dataset_kwargs,
+    make_dataset,
+)
+from benchmarks.results import write_results
+
+settings = Settings()
+
+
+async def measure(func, repeat: int):
+    """Return best time of `repeat` calls of `func` & its last result,
+    awaited if `func` returns a coroutine.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        if asyncio.iscoroutine(result):
+            result = await result
+        timings.append(perf_counter() - start)
+    return min(timings), result
+
+
+async def run(data: bytes, repeat: int):
+    timings = {}
+    timings["encoding"], encoding = await measure(
+        lambda: detect_encoding(get_samples(data)), repeat
+    )
+    header = read_csv(BytesIO(data), nrows=0, encoding=encoding).columns
+    # a new classifier for every run, as it memoizes classified headers
+    classifiers = iter(
+        [ColumnClassifier(get_column_rules()) for _ in range(repeat)]
+    )
+    timings["column_mapping"], mapped_columns = await measure(
+        lambda: next(classifiers).classify(header), repeat
+    )
+    timings["granularity"], granularity = await measure(
+        lambda: get_granularity(mapped_columns), repeat
+    )
+    plan = SchemaPlan(
+        None,
+        mapped_columns,
+        granularity["granularity"],
+        *get_projection(header, mapped_columns),
+    )
+    parser = get_csv_parser(settings.CSV_PARSER)
+    timings["parse"], dataset = await measure(
+        lambda: read_projected_csv(
+            BytesIO(data), header, plan, parser, encoding=encoding
+        ),
+        repeat,
+    )
+    for name, extractor in [
+        ("units", get_units),
+        ("temporal_coverage", get_temporal_coverage),
+        ("spatial_coverage", get_spatial_coverage),
+    ]:
+        timings[name], _ = await measure(
+            lambda: extractor(dataset, mapped_columns), repeat
+        )
+    return timings, len(dataset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_dataset_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    data = make_dataset(**get_dataset_kwargs(args))
+    timings, rows = asyncio.run(run(data, args.repeat))
+    print(f"rows: {rows}, csv: {len(data) / 1e6:.1f} MB")
+    print(f"{'stage':<20}{'seconds':>12}")
+    results = {}
+    for stage, seconds in timings.items():
+        results[stage] = {"seconds": seconds}
+        print(f"{stage:<20}{seconds:>12.6f}")
+    # extractors work on the unique values of columns, not on their rows
+    results["parse"]["rows_per_second"] = rows / timings["parse"]
+    results["parse"]["mb_per_second"] = len(data) / 1e6 / timings["parse"]
+    if args.output is not None:
+        write_results(args.output, "extractors", args, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Generate synthetic datasets shaped like Indian government open data.
+
+Datasets have a temporal column (year, fiscal year or date), state and
+district columns, a unit column & measure columns, in the encoding asked
+for. Non UTF-8 encodings get units with accented characters, so that their
+bytes are not valid UTF-8.
+
+    python -m benchmarks.generator --rows 100000 --files 10 --out ./datasets
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TEMPORAL_COLUMNS = ("year", "fiscal_year", "date", "none")
+GEOGRAPHY_COLUMNS = ("district", "state", "none")
+ENCODINGS = ("utf-8", "latin-1", "cp1252", "utf-16")
+
+STATES = {
+    "Maharashtra": ["Pune", "Nagpur", "Nashik", "Thane", "Satara"],
+    "Tamil Nadu": ["Chennai", "Madurai", "Salem", "Vellore"],
+    "Karnataka": ["Mysuru", "Belagavi", "Udupi", "Hassan", "Mandya"],
+    "Bihar": ["Patna", "Gaya", "Purnia", "Saran"],
+    "Kerala": ["Kollam", "Thrissur", "Idukki", "Wayanad"],
+    "Odisha": ["Cuttack", "Puri", "Ganjam", "Koraput"],
+}
+UNITS = ["value in Rs", "area in Ha", "production in Tonnes"]
+ACCENTED_UNITS = ["température in °C", "área in Ha", "value in Rs"]
+MEASURES = ["area", "production", "yield", "value", "count", "amount"]
+CROPS = ["Rice", "Wheat", "Maize", "Jowar", "Bajra", "Ragi"]
+
+
+def get_temporal_values(rng, temporal: str, rows: int):
+    years = rng.integers(2001, 2021, size=rows)
+    if temporal == "year":
+        return years.astype(str)
+    if temporal == "fiscal_year":
+        return np.char.add(
+            np.char.add(years.astype(str), "-"),
+            np.char.zfill(((years + 1) % 100).astype(str), 2),
+        )
+    days = pd.date_range("2001-01-01", "2020-12-31").strftime("%d-%m-%Y")
+    return rng.choice(days, rows)
+
+
+def make_frame(
+    rows: int,
+    columns: int = 6,
+    temporal: str = "year",
+    geography: str = "district",
+    units: bool = True,
+    accented: bool = False,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Return a dataset with the mapped columns asked for and measure
+    columns, at least `columns` of them in total.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    if temporal != "none":
+        data[temporal] = get_temporal_values(rng, temporal, rows)
+    if geography != "none":
+        districts = [
+            (state, district)
+            for state, state_districts in STATES.items()
+            for district in state_districts
+        ]
+        picked = rng.integers(len(districts), size=rows)
+        data["state"] = np.array([districts[idx][0] for idx in picked])
+        if geography == "district":
+            data["district"] = np.array([districts[idx][1] for idx in picked])
+    data["crop"] = rng.choice(CROPS, rows)
+    if units:
+        data["unit"] = rng.choice(ACCENTED_UNITS if accented else UNITS, rows)
+    for idx in range(max(columns - len(data), 1)):
+        name = MEASURES[idx % len(MEASURES)]
+        if idx >= len(MEASURES):
+            name = f"{name}_{idx // len(MEASURES)}"
+        data[name] = rng.random(rows).round(4)
+    return pd.DataFrame(data)
+
+
+def make_dataset(rows: int, encoding: str = "utf-8", **kwargs) -> bytes:
+    """Return csv of `make_frame(rows, **kwargs)` in the encoding."""
+    kwargs.setdefault("accented", encoding != "utf-8")
+    return make_frame(rows, **kwargs).to_csv(index=False).encode(encoding)
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument("--temporal", choices=TEMPORAL_COLUMNS, default="year")
+    parser.add_argument(
+        "--geography", choices=GEOGRAPHY_COLUMNS, default="district"
+    )
+    parser.add_argument("--no-units", dest="units", action="store_false")
+    parser.add_argument("--encoding", choices=ENCODINGS, default="utf-8")
+
+
+def get_dataset_kwargs(args) -> dict:
+    return {
+        "rows": args.rows,
+        "columns": args.columns,
+        "temporal": args.temporal,
+        "geography": args.geography,
+        "units": args.units,
+        "encoding": args.encoding,
+    }
+
+
+def make_datasets(files: int, **kwargs):
+    """Yield name & content of `files` datasets, each with its own seed so
+    that their content, and hence their cache keys, differ.
+    """
+    for seed in range(files):
+        yield f"dataset_{seed:05d}.csv", make_dataset(seed=seed, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_dataset_arguments(parser)
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--out", required=True, help="output directory")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for name, data in make_datasets(args.files, **get_dataset_kwargs(args)):
+        (out / name).write_bytes(data)
+        print(f"{out / name}: {len(data) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
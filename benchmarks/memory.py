@@ -0,0 +1,82 @@
+"""Benchmark memory of a district-level dataset read for meta-data.
+
+Compares reading every column as Python objects, against reading only the
+mapped columns as categories.
+
+    python -m benchmarks.memory --rows 1000000
+"""
+
+import argparse
+import asyncio
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from app.utils.common import read_projected_dataset
+
+STATES = {
+    "Maharashtra": ["Pune", "Nagpur", "Nashik", "Thane", "Satara"],
+    "Tamil Nadu": ["Chennai", "Madurai", "Salem", "Vellore"],
+    "Karnataka": ["Mysuru", "Belagavi", "Udupi", "Hassan", "Mandya"],
+    "Bihar": ["Patna", "Gaya", "Purnia", "Saran"],
+}
+UNITS = ["value in Rs", "area in Ha", "production in Tonnes"]
+
+
+def make_dataset(rows: int) -> bytes:
+    rng = np.random.default_rng(rows)
+    districts = [
+        (state, district)
+        for state, state_districts in STATES.items()
+        for district in state_districts
+    ]
+    picked = rng.integers(len(districts), size=rows)
+    dataset = pd.DataFrame(
+        {
+            "year": rng.integers(2001, 2021, size=rows).astype(str),
+            "state": [districts[idx][0] for idx in picked],
+            "district": [districts[idx][1] for idx in picked],
+            "crop": rng.choice(["Rice", "Wheat", "Maize", "Jowar"], rows),
+            "unit": rng.choice(UNITS, rows),
+            "value": rng.random(rows).round(4),
+        }
+    )
+    return dataset.to_csv(index=False).encode()
+
+
+def read_all_columns(data: bytes):
+    return pd.read_csv(BytesIO(data), dtype=str)
+
+
+def read_mapped_columns(data: bytes):
+    return asyncio.run(read_projected_dataset(BytesIO(data)))
+
+
+def measure(read, data: bytes):
+    tracemalloc.start()
+    dataset = read(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dataset.memory_usage(deep=True).sum(), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    data = make_dataset(args.rows)
+    print(f"rows: {args.rows}, csv: {len(data) / 1e6:.1f} MB")
+    print(f"{'read':<16}{'dataset MB':>12}{'peak MB':>12}")
+    for name, read in [
+        ("all as objects", read_all_columns),
+        ("mapped as cats", read_mapped_columns),
+    ]:
+        size, peak = measure(read, data)
+        print(f"{name:<16}{size / 1e6:>12.1f}{peak / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
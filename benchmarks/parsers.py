@@ -0,0 +1,71 @@
+"""Benchmark CSV parsers reading the mapped columns of datasets.
+
+Compares the pandas C parser, pandas pyarrow engine & native pyarrow reader
+on a synthetic district-level dataset, or on every csv of a corpus directory.
+Files a parser can not read are reported as failed, these are read by the C
+parser in the service.
+
+    python -m benchmarks.parsers --rows 1000000
+    python -m benchmarks.parsers --corpus ./datasets
+"""
+
+import argparse
+import asyncio
+from io import BytesIO
+from pathlib import Path
+from time import perf_counter
+
+from pandas import read_csv
+
+from app.utils.encoding import get_encoding
+from app.utils.parsers import CSV_PARSERS, FALLBACK_ERRORS, READERS, pa
+from app.utils.schema import get_schema_cache
+from benchmarks.memory import make_dataset
+
+
+def get_corpus(args):
+    if args.corpus is None:
+        return {f"synthetic-{args.rows}": make_dataset(args.rows)}
+    return {
+        path.name: path.read_bytes()
+        for path in sorted(Path(args.corpus).rglob("*.csv"))
+    }
+
+
+def measure(parser: str, data: bytes, repeat: int):
+    encoding = get_encoding(obj=data)
+    header = read_csv(BytesIO(data), nrows=0, encoding=encoding).columns
+    plan = asyncio.run(get_schema_cache().get_plan(header))
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        try:
+            READERS[parser](BytesIO(data), header, plan, encoding=encoding)
+        except FALLBACK_ERRORS:
+            return None
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--corpus", help="directory of csv files")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    parsers = CSV_PARSERS if pa is not None else ("c",)
+    print(f"{'dataset':<30}{'size MB':>10}", *(f"{p:>10}" for p in parsers))
+    for name, data in get_corpus(args).items():
+        timings = [measure(p, data, args.repeat) for p in parsers]
+        print(
+            f"{name[:29]:<30}{len(data) / 1e6:>10.1f}",
+            *(
+                f"{'failed':>10}" if timing is None else f"{timing:>10.3f}"
+                for timing in timings
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Benchmark end-to-end meta-data extraction of synthetic datasets.
+
+Measures files & MB per second of uploaded files processed by
+`get_dataset_meta_data_for_file_object` and, when a S3 endpoint like a moto
+server is given, of the objects of a bucket processed by
+`create_meta_data_for_s3_bucket`. Every dataset has its own content and is
+uploaded under a new prefix, so none is found in the meta-data cache.
+
+    python -m benchmarks.pipeline --rows 100000 --files 20
+    moto_server -p 5000
+    python -m benchmarks.pipeline --files 20 \\
+        --s3-endpoint-url http://localhost:5000 --output results.json
+"""
+
+import argparse
+import asyncio
+import os
+from io import BytesIO
+from time import perf_counter
+from uuid import uuid4
+
+from app.core.admission import get_dataset_scheduler
+from app.core.executor import shutdown_process_pool
+from app.utils.meta_data import (
+    ScanProgress,
+    create_meta_data_for_s3_bucket,
+    get_dataset_meta_data_for_file_object,
+)
+from app.utils.s3_files import get_s3_client
+from benchmarks.generator import (
+    add_dataset_arguments,
+    get_dataset_kwargs,
+    make_datasets,
+)
+from benchmarks.results import write_results
+
+
+class FailureCounter:
+    def __init__(self):
+        self.failed = 0
+
+    def listed(self, key):
+        pass
+
+    def processed(self, key, meta_data, failed=False):
+        self.failed += failed
+
+
+async def process_file_objects(datasets):
+    limiter = get_dataset_scheduler().limiter()
+    counter = FailureCounter()
+    progress = ScanProgress(counter)
+    await asyncio.gather(
+        *(
+            limiter.run(
+                get_dataset_meta_data_for_file_object(
+                    BytesIO(data), name, progress=progress
+                ),
+                size=len(data),
+            )
+            for name, data in datasets
+        )
+    )
+    return counter.failed
+
+
+async def process_s3_objects(s3_client, s3_bucket, prefix):
+    counter = FailureCounter()
+    await create_meta_data_for_s3_bucket(
+        s3_client, s3_bucket, prefix, "csv", observer=counter
+    )
+    return counter.failed
+
+
+def upload(s3_client, s3_bucket, prefix, datasets):
+    try:
+        s3_client.create_bucket(Bucket=s3_bucket)
+    except s3_client.exceptions.BucketAlreadyOwnedByYou:
+        pass
+    for name, data in datasets:
+        s3_client.put_object(
+            Bucket=s3_bucket, Key=f"{prefix}{name}", Body=data
+        )
+
+
+async def measure(process, datasets):
+    start = perf_counter()
+    failed = await process
+    elapsed = perf_counter() - start
+    size = sum(len(data) for _, data in datasets)
+    return {
+        "seconds": elapsed,
+        "files_per_second": len(datasets) / elapsed,
+        "mb_per_second": size / 1e6 / elapsed,
+        "failed": failed,
+    }
+
+
+async def run(args, datasets, warm_up):
+    # worker processes are started by datasets which are not measured
+    await process_file_objects(warm_up)
+    results = {
+        "file_objects": await measure(process_file_objects(datasets), datasets)
+    }
+    if args.s3_endpoint_url is not None:
+        s3_client = await get_s3_client(
+            args.s3_access_key, args.s3_secret_key, args.s3_endpoint_url, "s3"
+        )
+        prefix = f"benchmarks/{uuid4().hex}/"
+        upload(s3_client, args.s3_bucket, prefix, datasets)
+        results["s3"] = await measure(
+            process_s3_objects(s3_client, args.s3_bucket, prefix), datasets
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_dataset_arguments(parser)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--s3-endpoint-url", help="S3 endpoint, like moto")
+    parser.add_argument("--s3-bucket", default="meta-facts-benchmarks")
+    parser.add_argument("--s3-access-key", default="testing")
+    parser.add_argument("--s3-secret-key", default="testing")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    kwargs = get_dataset_kwargs(args)
+    datasets = list(make_datasets(args.files, **kwargs))
+    warm_up = list(
+        make_datasets(os.cpu_count() or 1, **{**kwargs, "rows": 10})
+    )
+    size = sum(len(data) for _, data in datasets)
+    print(f"files: {args.files}, csv: {size / 1e6:.1f} MB")
+    try:
+        results = asyncio.run(run(args, datasets, warm_up))
+    finally:
+        shutdown_process_pool()
+
+    print(
+        f"{'path':<14}{'seconds':>10}{'files/s':>10}{'MB/s':>10}{'failed':>8}"
+    )
+    for path, result in results.items():
+        print(
+            f"{path:<14}{result['seconds']:>10.3f}"
+            f"{result['files_per_second']:>10.2f}"
+            f"{result['mb_per_second']:>10.2f}{result['failed']:>8}"
+        )
+    if args.output is not None:
+        write_results(args.output, "pipeline", args, results)
+
+
+if __name__ == "__main__":
+    main()
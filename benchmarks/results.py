@@ -0,0 +1,129 @@
+"""Compare results of two benchmark runs written as JSON.
+
+Results are written by benchmarks run with `--output`, as the metrics of
+each case along with the parameters & environment of the run. Metrics
+ending in `_per_second` are better when higher, the others when lower.
+
+    python -m benchmarks.results baseline.json candidate.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+
+RESULTS_FORMAT_VERSION = 1
+PACKAGES = ("pandas", "numpy", "pyarrow", "charset-normalizer")
+
+
+def get_package_versions():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": get_git_commit(),
+        "packages": get_package_versions(),
+    }
+
+
+def write_results(path: str, benchmark: str, args, results: dict):
+    """Write results of a run, a mapping of case names to their metrics."""
+    document = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "benchmark": benchmark,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            name: value
+            for name, value in vars(args).items()
+            if name != "output"
+        },
+        "environment": get_environment(),
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(document, file, indent=2)
+
+
+def read_results(path: str):
+    with open(path) as file:
+        document = json.load(file)
+    if document.get("format_version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported results format of {path}")
+    return document
+
+
+def get_change(metric: str, baseline: float, candidate: float):
+    """Return relative change of a metric, positive when it improved."""
+    if not baseline or not candidate:
+        return None
+    if metric.endswith("_per_second"):
+        return candidate / baseline - 1
+    return baseline / candidate - 1
+
+
+def compare(baseline: dict, candidate: dict):
+    """Yield case, metric, both values & the change of the metrics present
+    in both runs.
+    """
+    for case, metrics in baseline["results"].items():
+        for metric, value in metrics.items():
+            other = candidate["results"].get(case, {}).get(metric)
+            if other is None or not isinstance(value, (int, float)):
+                continue
+            yield case, metric, value, other, get_change(metric, value, other)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline = read_results(args.baseline)
+    candidate = read_results(args.candidate)
+    if baseline["benchmark"] != candidate["benchmark"]:
+        raise SystemExit(
+            f"Results of different benchmarks: {baseline['benchmark']} "
+            f"and {candidate['benchmark']}"
+        )
+    if baseline["parameters"] != candidate["parameters"]:
+        print("Warning: runs have different parameters")
+    print(
+        f"{'case':<24}{'metric':<20}{'baseline':>12}{'candidate':>12}"
+        f"{'change':>10}"
+    )
+    for case, metric, value, other, change in compare(baseline, candidate):
+        change = "" if change is None else f"{change:+.1%}"
+        print(
+            f"{case[:23]:<24}{metric[:19]:<20}{value:>12.4g}{other:>12.4g}"
+            f"{change:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
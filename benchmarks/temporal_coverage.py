@@ -0,0 +1,94 @@
+"""Benchmark temporal coverage of a date column with a million rows.
+
+Compares the vectorized engine, which parses unique dates only, against
+parsing every date & walking the unique years in Python.
+
+    python -m benchmarks.temporal_coverage --rows 1000000
+"""
+
+import argparse
+import asyncio
+import re
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import DateTimeSettings
+from app.utils.temporal_coverage import get_temporal_coverage
+
+datetime_settings = DateTimeSettings()
+
+MAPPED_COLUMNS = {
+    "calender_year": set(),
+    "fiscal_year": set(),
+    "academic_year": set(),
+    "other_year": set(),
+    "month": set(),
+    "quarter": set(),
+    "date": {"date"},
+}
+
+
+def make_dataset(rows: int):
+    rng = np.random.default_rng(rows)
+    days = pd.date_range("2001-01-01", "2020-12-31").strftime("%d-%m-%Y")
+    # a gap in the years, so that coverage has more than one time period
+    days = days[~days.str.endswith("2010")]
+    return pd.DataFrame({"date": rng.choice(days, rows)})
+
+
+def get_temporal_coverage_per_value(dataset):
+    # parses every date & checks every unique year with Python loops
+    years = pd.to_datetime(dataset["date"], format="%d-%m-%Y").dt.year
+    years = [str(year) for year in years.unique()]
+    pattern = re.compile(datetime_settings.ALL_YEAR_FORMATS)
+    if not all(pattern.match(year) for year in years):
+        return ""
+    years = [str(year) for year in sorted(map(int, years))]
+    time_periods, start, end = [], years[0], years[0]
+    for year in years[1:]:
+        if int(year) == int(end) + 1:
+            end = year
+            continue
+        time_periods.append(start if start == end else f"{start} to {end}")
+        start = end = year
+    time_periods.append(start if start == end else f"{start} to {end}")
+    return ", ".join(time_periods)
+
+
+def get_temporal_coverage_vectorized(dataset):
+    result = asyncio.run(get_temporal_coverage(dataset, MAPPED_COLUMNS))
+    return result["temporal_coverage"]
+
+
+def measure(func, dataset, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func(dataset)
+        timings.append(perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.rows)
+    per_value, expected = measure(
+        get_temporal_coverage_per_value, dataset, args.repeat
+    )
+    vectorized, result = measure(
+        get_temporal_coverage_vectorized, dataset, args.repeat
+    )
+    assert result == expected, (result, expected)
+    print(f"rows: {args.rows}, temporal coverage: {result}")
+    print(f"per value  : {per_value:.3f} s")
+    print(f"vectorized : {vectorized:.3f} s ({per_value / vectorized:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
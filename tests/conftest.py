@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+# settings are read as app modules are imported, datasets are processed in
+# threads of the tests & the SQLite state is kept out of the working tree
+STATE_DIRECTORY = tempfile.mkdtemp(prefix="meta-facts-tests-")
+os.environ.update(
+    {
+        "PROCESS_POOL_WORKERS": "0",
+        "CSV_PARSER": "c",
+        "META_DATA_CACHE_BACKEND": "memory",
+        "SCHEMA_CACHE_PATH": os.path.join(STATE_DIRECTORY, "schema.sqlite3"),
+        "SCAN_MANIFEST_PATH": os.path.join(
+            STATE_DIRECTORY, "manifest.sqlite3"
+        ),
+        "JOB_RESULTS_PATH": os.path.join(STATE_DIRECTORY, "jobs.sqlite3"),
+        "S3_SOURCE_ACCESS_KEY": "test",
+        "S3_SOURCE_SECRET_KEY": "test",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    }
+)
+
+from app.core.config import Settings  # noqa: E402
+from tests.datasets import DATASETS, write_datasets  # noqa: E402
+
+
+@pytest.fixture
+def dataset_directory(tmp_path):
+    return write_datasets(str(tmp_path / "datasets"))
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    """Singletons bound to the event loop of a previous test or holding its
+    results are created again by each test.
+    """
+    from app.core import admission, http_client
+    from app.utils import cache, manifest, s3_files
+
+    monkeypatch.setattr(admission, "dataset_scheduler", None)
+    monkeypatch.setattr(http_client, "http_session", None)
+    monkeypatch.setattr(s3_files, "fetch_semaphore", None)
+    monkeypatch.setattr(cache, "meta_data_cache", None)
+    monkeypatch.setattr(manifest, "scan_manifest", None)
+
+
+@pytest.fixture
+def override_settings(monkeypatch):
+    """Return a function overriding settings read by every app module."""
+
+    def override(**values):
+        for name, module in list(sys.modules.items()):
+            module_settings = getattr(module, "settings", None)
+            if name.startswith("app.") and isinstance(
+                module_settings, Settings
+            ):
+                for setting, value in values.items():
+                    monkeypatch.setattr(module_settings, setting, value)
+
+    return override
+
+
+@pytest.fixture(scope="session")
+def s3_endpoint_url():
+    moto_server = pytest.importorskip("moto.server")
+    server = moto_server.ThreadedMotoServer(
+        ip_address="127.0.0.1", port=0, verbose=False
+    )
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def s3_client(s3_endpoint_url):
+    from app.utils.s3_files import create_s3_client
+
+    return create_s3_client("test", "test", s3_endpoint_url, "s3")
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    """Return name of a new bucket holding the datasets under `processed/`."""
+    s3_bucket = f"datasets-{uuid4().hex[:12]}"
+    s3_client.create_bucket(Bucket=s3_bucket)
+    for name, content in DATASETS.items():
+        s3_client.put_object(
+            Bucket=s3_bucket, Key=f"processed/{name}", Body=content
+        )
+    return s3_bucket
+
+
+@pytest.fixture
+def api_client():
+    """Return a function opening a client of the app, requests are handled
+    in the event loop of the test, like background jobs of the app.
+    """
+    httpx = pytest.importorskip("httpx")
+
+    from app.core.http_client import close_http_session
+    from app.main import app
+    from app.utils.jobs import stop_job_manager
+
+    @asynccontextmanager
+    async def open_client():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            try:
+                yield client
+            finally:
+                await stop_job_manager()
+                await close_http_session()
+
+    return open_client
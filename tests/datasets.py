@@ -0,0 +1,81 @@
+import os
+
+YEARS = [2015, 2016, 2017, 2018, 2020]
+STATES = ["Andhra Pradesh", "Assam", "Bihar", "Goa", "Kerala"]
+
+
+def get_lines(header, rows):
+    return "\n".join([header] + [",".join(row) for row in rows]) + "\n"
+
+
+# Datasets covering each of the extractors, names are the file names
+DATASETS = {
+    "year_state.csv": get_lines(
+        "year,state,unit,value",
+        (
+            (
+                str(YEARS[idx % 5]),
+                STATES[idx % 3],
+                '"value in Rs, area in Ha"' if idx % 2 else "value in Rs",
+                str(idx),
+            )
+            for idx in range(60)
+        ),
+    ).encode(),
+    "fiscal_district.csv": get_lines(
+        "fiscal_year,state,district,note,v",
+        (
+            (year, "Telangana", district, "x: y", str(idx))
+            for idx, (year, district) in enumerate(
+                [
+                    ("2012-13", "Adilabad"),
+                    ("2013-14", "Hyderabad"),
+                    ("2015-16", "Adilabad"),
+                ]
+                * 10
+            )
+        ),
+    ).encode(),
+    "date_country.csv": get_lines(
+        "date,country,v",
+        (
+            (f"{day:02d}-{month:02d}-{year}", "India", "1")
+            for year in range(2014, 2018)
+            for month in (1, 6, 12)
+            for day in (1, 15)
+        ),
+    ).encode(),
+    "latin1.csv": get_lines(
+        "year,state,district,unit,v",
+        (
+            ("2019", "Tamil Nadu", district, "température in °C", str(idx))
+            for idx, district in enumerate(
+                ["Chennai", "Madurai", "Salem", "Erode", "Vellore"]
+            )
+        ),
+    ).encode("latin-1"),
+    "unmapped.csv": get_lines(
+        "a,b", ((str(idx), str(idx)) for idx in range(10))
+    ).encode(),
+    "other.csv": get_lines(
+        "year,airline_names,crop,gender,quarter,month",
+        [
+            ("2019", "a", "rice", "m", "Q1", "January"),
+            ("2020", "b", "wheat", "f", "Q2", "February"),
+        ],
+    ).encode(),
+    "missing.csv": get_lines(
+        "year,state", [("2019", "Goa"), ("", ""), ("2021", "Goa")]
+    ).encode(),
+    "duplicated.csv": get_lines(
+        "year,year", [("2019", "1"), ("2020", "2")]
+    ).encode(),
+}
+
+
+def write_datasets(directory, datasets=DATASETS):
+    os.makedirs(directory, exist_ok=True)
+    for name, content in datasets.items():
+        with open(os.path.join(directory, name), "wb") as file:
+            file.write(content)
+    return directory
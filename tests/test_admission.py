@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import admission
+from app.core.admission import DatasetScheduler, RequestLimiter
+
+
+def test_requests_beyond_active_limit_get_429(override_settings):
+    override_settings(ADMISSION_RETRY_AFTER_SECONDS=7)
+    scheduler = DatasetScheduler(4, 1000, 1, 10)
+    with scheduler.admit():
+        with pytest.raises(HTTPException) as error:
+            with scheduler.admit():
+                pass
+    assert error.value.status_code == 429
+    assert error.value.headers == {"Retry-After": "7"}
+    with scheduler.admit():
+        assert scheduler.active_requests == 1
+    assert scheduler.active_requests == 0
+
+
+def test_requests_while_datasets_are_queued_get_503():
+    scheduler = DatasetScheduler(4, 1000, 10, 2)
+    scheduler.queued_datasets = 2
+    with pytest.raises(HTTPException) as error:
+        with scheduler.admit():
+            pass
+    assert error.value.status_code == 503
+    assert "Retry-After" in error.value.headers
+
+
+def test_admission_of_routes(api_client, monkeypatch):
+    async def post_urls(scheduler):
+        monkeypatch.setattr(admission, "dataset_scheduler", scheduler)
+        async with api_client() as client:
+            return await client.post(
+                "/meta-data/urls", json=["http://host/a.csv"]
+            )
+
+    response = asyncio.run(post_urls(DatasetScheduler(4, 1000, 0, 10)))
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    response = asyncio.run(post_urls(DatasetScheduler(4, 1000, 10, 0)))
+    assert response.status_code == 503
+
+
+async def run_datasets(limiter, sizes, duration=0.01):
+    """Run datasets of the sizes, returns the most of them running at once
+    and the most bytes in flight.
+    """
+    running, peaks = [], {"datasets": 0, "bytes": 0}
+
+    async def process(size):
+        running.append(size)
+        peaks["datasets"] = max(peaks["datasets"], len(running))
+        peaks["bytes"] = max(peaks["bytes"], sum(running))
+        await asyncio.sleep(duration)
+        running.remove(size)
+        return size
+
+    results = await asyncio.gather(
+        *(limiter.run(process(size), size=size) for size in sizes)
+    )
+    assert results == sizes
+    return peaks
+
+
+def test_datasets_are_limited_by_slots():
+    async def run():
+        scheduler = DatasetScheduler(3, 10_000, 10, 100)
+        return await run_datasets(RequestLimiter(scheduler, 8), [1] * 12)
+
+    assert asyncio.run(run())["datasets"] == 3
+
+
+def test_datasets_are_limited_by_request_concurrency():
+    async def run():
+        scheduler = DatasetScheduler(8, 10_000, 10, 100)
+        return await run_datasets(RequestLimiter(scheduler, 2), [1] * 12)
+
+    assert asyncio.run(run())["datasets"] == 2
+
+
+def test_datasets_are_limited_by_bytes_budget():
+    async def run():
+        scheduler = DatasetScheduler(8, 100, 10, 100)
+        peaks = await run_datasets(
+            RequestLimiter(scheduler, 8), [40, 40, 40, 30, 30]
+        )
+        # a dataset larger than the budget runs alone
+        alone = await run_datasets(RequestLimiter(scheduler, 8), [500, 10])
+        assert scheduler.in_flight_bytes == 0
+        return peaks, alone
+
+    peaks, alone = asyncio.run(run())
+    assert peaks["bytes"] <= 100
+    assert alone["datasets"] == 1
+
+
+def test_queued_datasets_are_counted():
+    async def run():
+        scheduler = DatasetScheduler(1, 10_000, 10, 100)
+        limiter = RequestLimiter(scheduler, 1)
+        tasks = [
+            asyncio.ensure_future(limiter.run(asyncio.sleep(0.01)))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        queued = scheduler.queued_datasets
+        await asyncio.gather(*tasks)
+        return queued, scheduler.queued_datasets
+
+    assert asyncio.run(run()) == (4, 0)
+
+
+def test_run_all_consumes_listing_as_datasets_are_processed():
+    async def run():
+        scheduler = DatasetScheduler(8, 10_000, 10, 100)
+        limiter = RequestLimiter(scheduler, 2)
+        listed, most_ahead = [], 0
+        processed = []
+
+        async def process(idx):
+            await asyncio.sleep(0.001)
+            processed.append(idx)
+            return idx
+
+        async def iterate_datasets():
+            nonlocal most_ahead
+            for idx in range(20):
+                listed.append(idx)
+                most_ahead = max(most_ahead, len(listed) - len(processed))
+                yield process(idx), 1
+
+        results = await limiter.run_all(iterate_datasets())
+        return results, most_ahead
+
+    results, most_ahead = asyncio.run(run())
+    assert results == list(range(20))
+    assert most_ahead <= 2 * 2 + 1
+
+
+def test_run_all_raises_errors_of_datasets():
+    async def run():
+        scheduler = DatasetScheduler(8, 10_000, 10, 100)
+        limiter = RequestLimiter(scheduler, 2)
+
+        async def process(idx):
+            if idx == 3:
+                raise ValueError("Could not process")
+            await asyncio.sleep(0.001)
+            return idx
+
+        async def iterate_datasets():
+            for idx in range(20):
+                yield process(idx), None
+
+        with pytest.raises(ValueError):
+            await limiter.run_all(iterate_datasets())
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scheduler.queued_datasets == 0
+    assert scheduler.in_flight_bytes == 0
@@ -0,0 +1,129 @@
+import asyncio
+import os
+
+from app.utils import cache as cache_module
+from app.utils.cache import (
+    LRUCache,
+    MetaDataCache,
+    SQLiteCache,
+    connect_sqlite,
+    get_cache_version,
+    get_meta_data_cache,
+)
+from app.utils.meta_data import (
+    create_meta_data_for_local_files,
+    create_meta_data_for_s3_bucket,
+)
+from tests.datasets import DATASETS
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+    cache.set("c", {"value": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.stats() == {
+        "backend": "memory",
+        "size": 2,
+        "max_size": 2,
+        "hits": 2,
+        "misses": 1,
+    }
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, 2)
+    cache.set("a", {"value": 1})
+    cache.set("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+    # entries read are not evicted for new ones
+    cache.set("c", {"value": 3})
+    reopened = SQLiteCache(path, 2)
+    assert len(reopened) == 2
+    assert reopened.get("a") == {"value": 1}
+    assert reopened.get("b") is None
+
+
+def test_sqlite_cache_reads_while_another_process_writes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, 10)
+    cache.set("a", {"value": 1})
+    writer = connect_sqlite(path)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert cache.get("a") == {"value": 1}
+        assert cache.get("b") is None
+    finally:
+        writer.rollback()
+
+
+def test_meta_data_cache_keys_on_version_of_rules(monkeypatch):
+    backend = LRUCache(10)
+    cache = MetaDataCache(backend)
+    cache.set({"units": "Rs"}, "local", "a.csv", "hash")
+    assert cache.get("local", "a.csv", "hash") == {"units": "Rs"}
+    assert cache.get("local", "a.csv", "other hash") is None
+
+    monkeypatch.setenv("CALENDAR_YEAR_KEYWORD", "^yr$")
+    assert get_cache_version() != cache.version
+    assert MetaDataCache(backend).get("local", "a.csv", "hash") is None
+
+
+def test_meta_data_cache_skips_unknown_versions():
+    cache = MetaDataCache(LRUCache(10))
+    cache.set({"units": "Rs"}, "url", "http://host/a.csv", None)
+    assert len(cache.backend) == 0
+    assert cache.get("url", "http://host/a.csv", None) is None
+
+    disabled = MetaDataCache(None)
+    disabled.set({"units": "Rs"}, "local", "a.csv", "hash")
+    assert disabled.get("local", "a.csv", "hash") is None
+    assert disabled.stats() == {"backend": None}
+
+
+def test_modified_local_files_are_processed_again(dataset_directory):
+    file_path = os.path.join(dataset_directory, "year_state.csv")
+    first = asyncio.run(create_meta_data_for_local_files([file_path]))
+    asyncio.run(create_meta_data_for_local_files([file_path]))
+    assert get_meta_data_cache().stats()["hits"] == 1
+
+    with open(file_path, "wb") as file:
+        file.write(DATASETS["missing.csv"])
+    modified = asyncio.run(create_meta_data_for_local_files([file_path]))
+    assert get_meta_data_cache().stats()["hits"] == 1
+    assert first[file_path]["spatial_coverage"] == "States of India"
+    assert modified[file_path]["spatial_coverage"] == "Goa"
+
+
+def test_modified_s3_objects_are_processed_again(s3_client, s3_bucket):
+    def scan():
+        return asyncio.run(
+            create_meta_data_for_s3_bucket(
+                s3_client, s3_bucket, "processed/year_state", "csv"
+            )
+        )
+
+    first = scan()
+    assert scan() == first
+    assert get_meta_data_cache().stats()["hits"] == 1
+
+    s3_client.put_object(
+        Bucket=s3_bucket,
+        Key="processed/year_state.csv",
+        Body=DATASETS["missing.csv"],
+    )
+    modified = scan()
+    assert get_meta_data_cache().stats()["hits"] == 1
+    assert modified["processed/year_state.csv"]["spatial_coverage"] == "Goa"
+
+
+def test_cache_is_created_from_settings(override_settings):
+    override_settings(META_DATA_CACHE_BACKEND="none")
+    assert not get_meta_data_cache().enabled
+    cache_module.meta_data_cache = None
+    override_settings(META_DATA_CACHE_BACKEND="memory")
+    assert get_meta_data_cache().stats()["backend"] == "memory"
@@ -0,0 +1,103 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app.cli import main
+from tests.datasets import DATASETS
+
+UNREADABLE_CONTENT = b'year,state\n"2019,Goa\n2020,Goa\n'
+
+
+def read_jsonl(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def test_scan_writes_record_per_dataset(dataset_directory, tmp_path):
+    output = str(tmp_path / "meta_data.jsonl")
+    assert main(["scan", dataset_directory, "--output", output]) == 0
+    records = read_jsonl(output)
+    assert sorted(record["name"] for record in records) == sorted(
+        os.path.join(dataset_directory, name) for name in DATASETS
+    )
+    year_state = next(
+        record
+        for record in records
+        if record["name"].endswith("year_state.csv")
+    )
+    assert year_state["temporal_coverage"] == "2015 to 2018, 2020"
+    assert sorted(read_jsonl(f"{output}.checkpoint")) == sorted(
+        record["name"] for record in records
+    )
+    assert read_jsonl(f"{output}.failed") == []
+
+
+def test_scan_resumes_after_checkpoint(dataset_directory, tmp_path):
+    output = str(tmp_path / "meta_data.jsonl")
+    first_name = os.path.join(dataset_directory, "date_country.csv")
+    with open(f"{output}.checkpoint", "w") as checkpoint:
+        checkpoint.write(f"{json.dumps(first_name)}\n")
+    assert main(["scan", dataset_directory, "--output", output]) == 0
+    names = [record["name"] for record in read_jsonl(output)]
+    assert first_name not in names
+    assert len(names) == len(DATASETS) - 1
+
+    # nothing is left to process by another run
+    assert main(["scan", dataset_directory, "--output", output]) == 0
+    assert len(read_jsonl(output)) == len(DATASETS) - 1
+    assert len(read_jsonl(f"{output}.checkpoint")) == len(DATASETS)
+
+
+def test_failed_datasets_are_retried_by_next_run(dataset_directory, tmp_path):
+    output = str(tmp_path / "meta_data.jsonl")
+    bad_path = os.path.join(dataset_directory, "bad.csv")
+    with open(bad_path, "wb") as file:
+        file.write(UNREADABLE_CONTENT)
+    arguments = ["scan", dataset_directory, "--output", output]
+    arguments += ["--batch-size", "3"]
+    assert main(arguments) == 1
+    assert read_jsonl(f"{output}.failed") == [bad_path]
+    assert bad_path not in read_jsonl(f"{output}.checkpoint")
+    assert len(read_jsonl(output)) == len(DATASETS)
+
+    with open(bad_path, "wb") as file:
+        file.write(DATASETS["missing.csv"])
+    assert main(arguments) == 0
+    records = read_jsonl(output)
+    assert read_jsonl(f"{output}.failed") == []
+    assert len(records) == len({record["name"] for record in records})
+    assert [
+        record["spatial_coverage"]
+        for record in records
+        if record["name"] == bad_path
+    ] == ["Goa"]
+
+
+def test_scan_writes_parquet_parts(dataset_directory, tmp_path):
+    pytest.importorskip("pyarrow")
+    output = str(tmp_path / "meta_data")
+    arguments = ["scan", dataset_directory, "--output", output]
+    assert main(arguments + ["--format", "parquet", "--batch-size", "5"]) == 0
+    parts = sorted(os.listdir(output))
+    assert len(parts) == 2
+    meta_data = pd.read_parquet(output)
+    assert len(meta_data) == len(DATASETS)
+    assert list(meta_data.columns[:2]) == ["name", "output_file_name"]
+    assert "stages" not in meta_data.columns
+
+
+def test_scan_of_s3_prefix(s3_endpoint_url, s3_bucket, tmp_path, monkeypatch):
+    # options are set as environment variables, which are restored
+    monkeypatch.setenv("S3_SOURCE_ENDPOINT_URL", s3_endpoint_url)
+    output = str(tmp_path / "meta_data.jsonl")
+    arguments = ["scan", f"s3://{s3_bucket}/processed/", "--output", output]
+    arguments += ["--s3-endpoint-url", s3_endpoint_url]
+    arguments += ["--s3-access-key", "test", "--s3-secret-key", "test"]
+    with open(f"{output}.checkpoint", "w") as checkpoint:
+        checkpoint.write(f"{json.dumps('processed/latin1.csv')}\n")
+    assert main(arguments) == 0
+    assert sorted(record["name"] for record in read_jsonl(output)) == sorted(
+        f"processed/{name}" for name in DATASETS if name != "latin1.csv"
+    )
@@ -0,0 +1,86 @@
+import asyncio
+import re
+
+import pytest
+
+from app.core.config import DateTimeSettings
+from app.utils.columns_mapping import (
+    ColumnClassifier,
+    find_mapped_columns,
+    get_column_classifier,
+    get_column_rules,
+)
+
+HEADERS = [
+    ["year", "state", "unit", "value"],
+    ["fiscal_year", "state", "district", "note", "v"],
+    ["date", "country", "v"],
+    ["academic_year", "financial_year", "quarter", "month", "notes"],
+    ["as_on_date", "report_date", "dates", "updated", "date_of_birth"],
+    ["state_name", "district_name", "country_code", "unit_of_measure"],
+    ["airline_names", "airports", "language", "crops", "gender", "crop"],
+    ["year_of_sowing", "calendar_year", "yearly", "month_name"],
+    ["a", "b", "c"],
+    [],
+]
+
+
+def classify_with_regex_loop(columns):
+    """Classification of columns as it was before the classifier, each rule
+    matching the columns left over by the previous rules of its group.
+    """
+    as_on_date_pattern = re.compile(
+        r".*({})".format(DateTimeSettings().AS_ON_DATE_PATTERN)
+    )
+    classification = {}
+    for group, rules in get_column_rules().items():
+        remaining = set(columns)
+        for category, pattern in rules:
+            matched = set(filter(re.compile(pattern).match, remaining))
+            remaining = remaining.difference(matched)
+            classification[category] = matched
+    # `as_on_date` columns are filtered out of the date columns
+    classification["date"] = {
+        column
+        for column in classification["date"]
+        if not as_on_date_pattern.match(column)
+    }
+    return classification
+
+
+@pytest.mark.parametrize("header", HEADERS)
+def test_classifier_matches_regex_loop(header):
+    expected = classify_with_regex_loop(header)
+    classification = ColumnClassifier(get_column_rules()).classify(header)
+    assert {
+        category: set(columns)
+        for category, columns in classification.items()
+        if category != "unmapped"
+    } == expected
+
+    mapped = set().union(
+        *(
+            expected[category]
+            for group in ColumnClassifier.MAPPED_GROUPS
+            for category, _ in get_column_rules()[group]
+        )
+    )
+    assert set(classification["unmapped"]) == set(header) - mapped
+
+
+def test_classifications_are_memoized_per_header():
+    classifier = ColumnClassifier(get_column_rules(), memo_size=1)
+    first = classifier.classify(["year", "state"])
+    assert classifier.classify(("year", "state")) is first
+    classifier.classify(["date"])
+    assert classifier.classify(["year", "state"]) is not first
+
+
+def test_find_mapped_columns_uses_classifier_of_process():
+    classification = asyncio.run(find_mapped_columns(["year", "state", "x"]))
+    assert classification["calender_year"] == {"year"}
+    assert classification["state"] == {"state"}
+    assert classification["unmapped"] == ["x"]
+    assert get_column_classifier().get_group(classification, "unit") == {
+        "unit": frozenset()
+    }
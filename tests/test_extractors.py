@@ -0,0 +1,171 @@
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+
+from app.utils import common, parsers
+from app.utils.meta_data import get_dataset_meta_data_for_file_object
+from tests.datasets import DATASETS
+
+# Meta-data of the datasets by the extractors before datasets were
+# projected, streamed & parsed by pluggable parsers, except for gender
+# columns which are classified since the gender rule was fixed
+BASELINE = {
+    "date_country.csv": {
+        "granularity": "Day, Country",
+        "spatial_coverage": "India",
+        "temporal_coverage": "2014 to 2017",
+        "units": [""],
+    },
+    "duplicated.csv": {
+        "granularity": "Year",
+        "spatial_coverage": "India",
+        "temporal_coverage": "2019 to 2020",
+        "units": [""],
+    },
+    "fiscal_district.csv": {
+        "granularity": "Fiscal Year, State",
+        "spatial_coverage": "Districts of Telangana",
+        "temporal_coverage": "2012-13 to 2013-14, 2015-16",
+        "units": [""],
+    },
+    "latin1.csv": {
+        "granularity": "Year, State",
+        "spatial_coverage": "Districts of Tamil Nadu",
+        "temporal_coverage": "2019",
+        "units": ["température in °C"],
+    },
+    "missing.csv": {
+        "granularity": "Year, State",
+        "spatial_coverage": "Goa",
+        "temporal_coverage": "",
+        "units": [""],
+    },
+    "other.csv": {
+        "granularity": "Month, Airline, Crop, Gender",
+        "spatial_coverage": "India",
+        "temporal_coverage": "2019 to 2020",
+        "units": [""],
+    },
+    "unmapped.csv": {
+        "granularity": "",
+        "spatial_coverage": "India",
+        "temporal_coverage": "",
+        "units": [""],
+    },
+    "year_state.csv": {
+        "granularity": "Year, State",
+        "spatial_coverage": "States of India",
+        "temporal_coverage": "2015 to 2018, 2020",
+        "units": ["area in Ha", "value in Rs"],
+    },
+}
+
+PARSERS = ["c", "pyarrow", "arrow"]
+
+
+def get_meta_data(file_paths):
+    async def get_all():
+        meta_data = {}
+        for file_path in file_paths:
+            with open(file_path, "rb") as file_object:
+                meta_data.update(
+                    await get_dataset_meta_data_for_file_object(
+                        file_object, os.path.basename(file_path)
+                    )
+                )
+        return meta_data
+
+    return asyncio.run(get_all())
+
+
+def normalize(meta_data: dict, file_format="csv"):
+    # units are joined in no particular order
+    assert meta_data["formats_available"] == file_format
+    assert meta_data["is_public"] is True
+    return {
+        "granularity": meta_data["granularity"],
+        "spatial_coverage": meta_data["spatial_coverage"],
+        "temporal_coverage": meta_data["temporal_coverage"],
+        "units": sorted(
+            unit.strip() for unit in meta_data["units"].split(",")
+        ),
+    }
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_meta_data_of_parsers_matches_baseline(
+    parser, dataset_directory, override_settings
+):
+    if parser != "c":
+        pytest.importorskip("pyarrow")
+    override_settings(CSV_PARSER=parser)
+    meta_data = get_meta_data(
+        os.path.join(dataset_directory, name) for name in DATASETS
+    )
+    assert {name: normalize(meta_data[name]) for name in DATASETS} == BASELINE
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_meta_data_of_streamed_chunks_matches_baseline(
+    parser, dataset_directory, override_settings, monkeypatch
+):
+    if parser != "c":
+        pytest.importorskip("pyarrow")
+    streamed = []
+
+    def read_csv_chunks(*args, **kwargs):
+        streamed.append(args[0])
+        return parsers.read_csv_chunks(*args, **kwargs)
+
+    monkeypatch.setattr(common, "read_csv_chunks", read_csv_chunks)
+    override_settings(
+        CSV_PARSER=parser,
+        STREAMING_THRESHOLD_BYTES=16,
+        STREAMING_READ_BYTES=64,
+        STREAMING_CHUNK_ROWS=7,
+    )
+    meta_data = get_meta_data(
+        os.path.join(dataset_directory, name) for name in DATASETS
+    )
+    assert {name: normalize(meta_data[name]) for name in DATASETS} == BASELINE
+    assert len(streamed) == len(DATASETS)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_meta_data_of_columnar_formats_matches_baseline(
+    file_format, dataset_directory, tmp_path
+):
+    pytest.importorskip("pyarrow")
+    # columns of the csv are kept as text, like the C parser reads them
+    names = [name for name in DATASETS if name != "duplicated.csv"]
+    file_paths = []
+    for name in names:
+        dataset = pd.read_csv(
+            os.path.join(dataset_directory, name),
+            dtype=str,
+            encoding="latin-1" if name == "latin1.csv" else "utf-8",
+        )
+        file_path = str(tmp_path / name.replace(".csv", f".{file_format}"))
+        getattr(dataset, f"to_{file_format}")(file_path)
+        file_paths.append(file_path)
+    meta_data = get_meta_data(file_paths)
+    assert {
+        name: normalize(
+            meta_data[name.replace(".csv", f".{file_format}")], file_format
+        )
+        for name in names
+    } == {name: BASELINE[name] for name in names}
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_integral_float_years_are_years(parser, tmp_path, override_settings):
+    if parser != "c":
+        pytest.importorskip("pyarrow")
+    override_settings(CSV_PARSER=parser)
+    (tmp_path / "float_year.csv").write_text(
+        "year,state,value\n2015.0,Kerala,1\n2016.0,Goa,2\n2016.0,Goa,3\n"
+    )
+    meta_data = get_meta_data([str(tmp_path / "float_year.csv")])
+    assert meta_data["float_year.csv"]["temporal_coverage"] == "2015 to 2016"
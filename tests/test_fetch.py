@@ -0,0 +1,225 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from io import BytesIO
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from app.utils.common import get_source_from_fetcher
+from app.utils.fetch import S3Fetcher, URLFetcher, get_range, get_total_size
+from app.utils.meta_data import (
+    create_meta_data_for_dataset_urls,
+    create_meta_data_for_s3_files,
+)
+from tests.datasets import DATASETS
+from tests.test_extractors import BASELINE, normalize
+
+
+@asynccontextmanager
+async def serve(directory, ranges=True, failures=0):
+    """Serve files of the directory, with or without range requests, the
+    first `failures` requests fail with 503. Yields the base url & a list
+    of the `(method, path, range)` of the requests served.
+    """
+    requests = []
+
+    @web.middleware
+    async def record(request, handler):
+        requests.append(
+            (request.method, request.path, request.headers.get("Range"))
+        )
+        if len(requests) <= failures:
+            raise web.HTTPServiceUnavailable()
+        return await handler(request)
+
+    async def get_without_ranges(request):
+        path = os.path.join(directory, request.match_info["name"])
+        with open(path, "rb") as file:
+            return web.Response(body=file.read())
+
+    app = web.Application(middlewares=[record])
+    if ranges:
+        app.router.add_static("/", directory)
+    else:
+        app.router.add_get("/{name}", get_without_ranges)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    try:
+        yield str(server.make_url("/")), requests
+    finally:
+        await server.close()
+
+
+def test_get_range_and_total_size():
+    assert get_range(0, 10) == "bytes=0-9"
+    assert get_range(10) == "bytes=10-"
+    assert get_total_size("bytes 0-1023/4096") == 4096
+    assert get_total_size("bytes 0-1023/*") is None
+    assert get_total_size(None) is None
+
+
+def test_url_fetcher_fetches_sample_and_rest(dataset_directory):
+    content = DATASETS["year_state.csv"]
+
+    async def fetch():
+        async with serve(dataset_directory) as (url, requests):
+            async with ClientSession() as session:
+                fetcher = URLFetcher(session, f"{url}year_state.csv")
+                sample, size = await fetcher.fetch_sample(100)
+                file = BytesIO()
+                file.write(sample)
+                await fetcher.fetch(file, len(sample))
+        return sample, size, file.getvalue(), requests
+
+    sample, size, fetched, requests = asyncio.run(fetch())
+    assert sample == content[:100]
+    assert size == len(content)
+    assert fetched == content
+    assert [range_ for _, _, range_ in requests] == [
+        "bytes=0-99",
+        "bytes=100-",
+    ]
+
+
+def test_url_fetcher_without_ranges(dataset_directory):
+    async def fetch():
+        async with serve(dataset_directory, ranges=False) as (url, _):
+            async with ClientSession() as session:
+                fetcher = URLFetcher(session, f"{url}year_state.csv")
+                sample = await fetcher.fetch_sample(100)
+                file = BytesIO()
+                await fetcher.fetch(file)
+                with pytest.raises(ValueError):
+                    await fetcher.fetch(BytesIO(), 100)
+        return sample, file.getvalue()
+
+    sample, fetched = asyncio.run(fetch())
+    assert sample == (None, None)
+    assert fetched == DATASETS["year_state.csv"]
+
+
+def test_url_fetcher_samples_empty_file(tmp_path):
+    (tmp_path / "empty.csv").write_bytes(b"")
+
+    async def fetch():
+        async with serve(str(tmp_path)) as (url, _):
+            async with ClientSession() as session:
+                return await URLFetcher(
+                    session, f"{url}empty.csv"
+                ).fetch_sample(100)
+
+    assert asyncio.run(fetch()) == (b"", 0)
+
+
+def test_url_fetcher_retries_transient_errors(
+    dataset_directory, override_settings
+):
+    override_settings(HTTP_RETRY_BACKOFF_SECONDS=0)
+
+    async def fetch(failures):
+        async with serve(dataset_directory, failures=failures) as (url, _):
+            async with ClientSession() as session:
+                fetcher = URLFetcher(session, f"{url}unmapped.csv")
+                file = BytesIO(b"written by a failed attempt")
+                await fetcher.fetch(file)
+                return file.getvalue()
+
+    assert asyncio.run(fetch(failures=2)) == DATASETS["unmapped.csv"]
+
+
+UNMAPPED_CONTENT = b"a,b\n" + b"0,0\n" * 20
+
+
+@pytest.mark.parametrize(
+    "name, content, fetched_ranges, expected_source",
+    [
+        # values of its columns are not needed, only the header is processed
+        ("unmapped.csv", UNMAPPED_CONTENT, ["bytes=0-63"], b"a,b\n"),
+        (
+            "year_state.csv",
+            DATASETS["year_state.csv"],
+            ["bytes=0-63", "bytes=64-"],
+            DATASETS["year_state.csv"],
+        ),
+        # complete file is in the sample
+        (
+            "duplicated.csv",
+            DATASETS["duplicated.csv"],
+            ["bytes=0-63"],
+            DATASETS["duplicated.csv"],
+        ),
+    ],
+)
+def test_range_sampling(
+    name, content, fetched_ranges, expected_source, tmp_path, override_settings
+):
+    override_settings(RANGE_SAMPLE_BYTES=64)
+    (tmp_path / name).write_bytes(content)
+
+    async def get_source():
+        async with serve(str(tmp_path)) as (url, requests):
+            async with ClientSession() as session:
+                fetcher = URLFetcher(session, f"{url}{name}")
+                async with get_source_from_fetcher(fetcher, name) as source:
+                    return source, requests
+
+    source, requests = asyncio.run(get_source())
+    assert [range_ for _, _, range_ in requests] == fetched_ranges
+    assert source == expected_source
+
+
+def test_meta_data_of_urls_matches_baseline(dataset_directory):
+    async def create_meta_data():
+        async with serve(dataset_directory) as (url, _):
+            async with ClientSession() as session:
+                return await create_meta_data_for_dataset_urls(
+                    [f"{url}{name}" for name in DATASETS], session=session
+                )
+
+    meta_data = asyncio.run(create_meta_data())
+    assert {
+        os.path.basename(url): normalize(url_meta_data)
+        for url, url_meta_data in meta_data.items()
+    } == BASELINE
+
+
+def test_s3_fetcher_fetches_sample_and_rest(s3_client, s3_bucket):
+    content = DATASETS["year_state.csv"]
+    fetcher = S3Fetcher(s3_client, s3_bucket, "processed/year_state.csv")
+
+    async def fetch():
+        sample, size = await fetcher.fetch_sample(100)
+        file = BytesIO()
+        file.write(sample)
+        await fetcher.fetch(file, len(sample))
+        return sample, size, file.getvalue()
+
+    sample, size, fetched = asyncio.run(fetch())
+    assert sample == content[:100]
+    assert size == len(content)
+    assert fetched == content
+
+
+def test_s3_fetcher_samples_empty_object(s3_client, s3_bucket):
+    s3_client.put_object(Bucket=s3_bucket, Key="empty.csv", Body=b"")
+    fetcher = S3Fetcher(s3_client, s3_bucket, "empty.csv")
+    assert asyncio.run(fetcher.fetch_sample(100)) == (b"", 0)
+
+
+def test_meta_data_of_s3_files_matches_baseline(
+    s3_endpoint_url, s3_bucket, override_settings
+):
+    override_settings(
+        S3_SOURCE_ENDPOINT_URL=s3_endpoint_url, RANGE_SAMPLE_BYTES=64
+    )
+    meta_data = asyncio.run(
+        create_meta_data_for_s3_files(
+            [f"s3://{s3_bucket}/processed/{name}" for name in DATASETS]
+        )
+    )
+    assert {
+        os.path.basename(s3_key): normalize(s3_meta_data)
+        for s3_key, s3_meta_data in meta_data.items()
+    } == BASELINE
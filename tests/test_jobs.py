@@ -0,0 +1,103 @@
+import asyncio
+
+from app.models.enums import JobStatus
+from app.utils.jobs import JobManager, JobResults, ScanJob
+from tests.datasets import DATASETS
+
+
+def test_job_results_are_read_by_page(tmp_path):
+    results = JobResults(str(tmp_path / "jobs.sqlite3"))
+    results.add(
+        "a", 0, [(f"{idx}.csv", {"units": f"{idx}"}) for idx in range(5)]
+    )
+    results.add("b", 0, [("other.csv", {})])
+    assert list(results.get("a", 0, 2)) == ["0.csv", "1.csv"]
+    assert results.get("a", 3, 10) == {
+        "3.csv": {"units": "3"},
+        "4.csv": {"units": "4"},
+    }
+    results.delete("a")
+    assert results.get("a", 0, 10) == {}
+    assert list(results.get("b", 0, 10)) == ["other.csv"]
+
+    # results of a previous run of the server are dropped
+    assert JobResults(str(tmp_path / "jobs.sqlite3")).get("b", 0, 10) == {}
+
+
+def test_job_results_are_written_in_batches(tmp_path, override_settings):
+    override_settings(JOB_RESULTS_BATCH_SIZE=3)
+    results = JobResults(str(tmp_path / "jobs.sqlite3"))
+    job = ScanJob(None, results)
+    for idx in range(7):
+        job.processed(f"{idx}.csv", {}, failed=idx == 6)
+    assert len(job.pending) == 1
+    assert list(results.get(job.id, 0, 10)) == [
+        f"{idx}.csv" for idx in range(6)
+    ]
+    # pending results follow the written ones
+    assert list(job.get_results(5, 2)) == ["5.csv", "6.csv"]
+    assert list(job.get_results(6, 2)) == ["6.csv"]
+    assert job.objects_failed == 1
+    job.flush()
+    assert job.pending == []
+    assert len(results.get(job.id, 0, 10)) == 7
+
+
+def test_results_of_dropped_jobs_are_deleted(tmp_path):
+    async def run_jobs():
+        manager = JobManager(1, 1, str(tmp_path / "jobs.sqlite3"))
+
+        async def run(job):
+            job.processed("a.csv", {})
+
+        first = manager.submit(run)
+        await asyncio.sleep(0.01)
+        second = manager.submit(run)
+        await asyncio.sleep(0.01)
+        await manager.stop()
+        return manager, first, second
+
+    manager, first, second = asyncio.run(run_jobs())
+    assert manager.get(first.id) is None
+    assert manager.results.get(first.id, 0, 10) == {}
+    assert second.status == JobStatus.COMPLETED
+    assert list(second.get_results()) == ["a.csv"]
+
+
+def test_s3_bucket_job(api_client, s3_endpoint_url, s3_bucket):
+    async def run_job():
+        async with api_client() as client:
+            response = await client.post(
+                "/jobs/s3",
+                data={
+                    "s3_bucket": s3_bucket,
+                    "prefix": "processed/",
+                    "s3_endpoint_url": s3_endpoint_url,
+                    "s3_access_key": "test",
+                    "s3_secret_key": "test",
+                },
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+            for _ in range(100):
+                job = (await client.get(f"/jobs/{job_id}")).json()
+                if job["status"] == JobStatus.COMPLETED:
+                    break
+                await asyncio.sleep(0.05)
+            pages = [
+                (
+                    await client.get(
+                        f"/jobs/{job_id}/results",
+                        params={"offset": offset, "limit": 3},
+                    )
+                ).json()
+                for offset in range(0, len(DATASETS), 3)
+            ]
+            return job, pages
+
+    job, pages = asyncio.run(run_job())
+    assert job["status"] == JobStatus.COMPLETED
+    assert job["objects_processed"] == len(DATASETS)
+    assert all(page["total"] == len(DATASETS) for page in pages)
+    keys = [key for page in pages for key in page["results"]]
+    assert sorted(keys) == sorted(f"processed/{name}" for name in DATASETS)
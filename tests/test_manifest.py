@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from app.utils import meta_data as meta_data_module
+from app.utils.manifest import ScanManifest, get_scan_manifest
+from app.utils.meta_data import create_meta_data_for_s3_bucket
+from tests.datasets import DATASETS
+
+KEYS = {f"processed/{name}" for name in DATASETS}
+
+
+@pytest.fixture
+def processed_keys(monkeypatch):
+    """Keys of the objects processed rather than taken from the manifest."""
+    processed_keys = []
+    get_meta_data = meta_data_module.get_dataset_meta_data_for_s3_file
+
+    async def get_dataset_meta_data_for_s3_file(
+        s3_client, s3_bucket, s3_key, **kwargs
+    ):
+        processed_keys.append(s3_key)
+        return await get_meta_data(s3_client, s3_bucket, s3_key, **kwargs)
+
+    monkeypatch.setattr(
+        meta_data_module,
+        "get_dataset_meta_data_for_s3_file",
+        get_dataset_meta_data_for_s3_file,
+    )
+    return processed_keys
+
+
+def scan(s3_client, s3_bucket, file_format="csv"):
+    return asyncio.run(
+        create_meta_data_for_s3_bucket(
+            s3_client, s3_bucket, "processed/", file_format, incremental=True
+        )
+    )
+
+
+def get_scope(s3_client, s3_bucket, file_format="csv"):
+    return ScanManifest.get_scope(
+        s3_client.meta.endpoint_url, s3_bucket, "processed/", file_format
+    )
+
+
+def test_rescan_processes_only_new_and_modified_objects(
+    s3_client, s3_bucket, processed_keys
+):
+    first = scan(s3_client, s3_bucket)
+    assert set(processed_keys) == set(first) == KEYS
+
+    processed_keys.clear()
+    assert scan(s3_client, s3_bucket) == first
+    assert processed_keys == []
+
+    s3_client.put_object(
+        Bucket=s3_bucket,
+        Key="processed/year_state.csv",
+        Body=DATASETS["missing.csv"],
+    )
+    s3_client.put_object(
+        Bucket=s3_bucket, Key="processed/new.csv", Body=DATASETS["other.csv"]
+    )
+    s3_client.delete_object(Bucket=s3_bucket, Key="processed/latin1.csv")
+    processed_keys.clear()
+    third = scan(s3_client, s3_bucket)
+    assert sorted(processed_keys) == [
+        "processed/new.csv",
+        "processed/year_state.csv",
+    ]
+    assert third["processed/year_state.csv"]["spatial_coverage"] == "Goa"
+    assert "processed/latin1.csv" not in third
+    assert get_scan_manifest().get_keys(get_scope(s3_client, s3_bucket)) == (
+        KEYS - {"processed/latin1.csv"}
+    ) | {"processed/new.csv"}
+
+
+def test_failed_objects_are_processed_again(
+    s3_client, s3_bucket, processed_keys, monkeypatch
+):
+    generate_meta_data = meta_data_module.generate_meta_data_for_s3_file
+
+    async def fail_year_state(s3_client, s3_bucket, s3_key, etag=None):
+        if s3_key == "processed/year_state.csv":
+            raise ValueError("Could not download")
+        return await generate_meta_data(s3_client, s3_bucket, s3_key, etag)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            meta_data_module, "generate_meta_data_for_s3_file", fail_year_state
+        )
+        first = scan(s3_client, s3_bucket)
+    assert first["processed/year_state.csv"]["temporal_coverage"] is None
+    assert "processed/year_state.csv" not in get_scan_manifest().get_keys(
+        get_scope(s3_client, s3_bucket)
+    )
+
+    processed_keys.clear()
+    second = scan(s3_client, s3_bucket)
+    assert processed_keys == ["processed/year_state.csv"]
+    assert second["processed/year_state.csv"]["temporal_coverage"] == (
+        "2015 to 2018, 2020"
+    )
+
+
+def test_objects_are_processed_again_with_new_rules(
+    s3_client, s3_bucket, processed_keys, monkeypatch
+):
+    scan(s3_client, s3_bucket)
+    monkeypatch.setattr(
+        meta_data_module, "get_cache_version", lambda: "changed rules"
+    )
+    processed_keys.clear()
+    scan(s3_client, s3_bucket)
+    assert set(processed_keys) == KEYS
+
+
+def test_scans_of_other_formats_keep_their_own_scope(
+    s3_client, s3_bucket, processed_keys
+):
+    scan(s3_client, s3_bucket)
+    scan(s3_client, s3_bucket, file_format="parquet")
+    assert (
+        get_scan_manifest().get_keys(
+            get_scope(s3_client, s3_bucket, "parquet")
+        )
+        == set()
+    )
+
+    processed_keys.clear()
+    scan(s3_client, s3_bucket)
+    assert processed_keys == []
+
+
+def test_stage_timings_are_not_recorded(
+    s3_client, s3_bucket, override_settings
+):
+    override_settings(METRICS_DEBUG_STAGES=True)
+    first = scan(s3_client, s3_bucket)
+    assert all("stages" in meta_data for meta_data in first.values())
+    entries = get_scan_manifest().get_entries(
+        get_scope(s3_client, s3_bucket), meta_data_module.get_cache_version()
+    )
+    assert set(entries) == KEYS
+    assert not any(
+        "stages" in entry["meta_data"] for entry in entries.values()
+    )
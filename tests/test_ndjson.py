@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+
+from app.utils.meta_data import create_meta_data_for_local_files
+from app.utils.ndjson import (
+    NDJSON_MEDIA_TYPE,
+    STREAM_QUEUE_SIZE,
+    stream_meta_data,
+)
+from tests.datasets import DATASETS
+
+
+async def read_lines(lines):
+    return [json.loads(line) async for line in lines]
+
+
+def test_stream_has_line_per_dataset_and_summary(dataset_directory):
+    file_paths = [
+        os.path.join(dataset_directory, name) for name in DATASETS
+    ] + [os.path.join(dataset_directory, "missing", "a.csv")]
+    lines = asyncio.run(
+        read_lines(
+            stream_meta_data(create_meta_data_for_local_files, file_paths)
+        )
+    )
+    *meta_data_lines, summary_line = lines
+    assert sorted(key for line in meta_data_lines for key in line) == sorted(
+        file_paths
+    )
+    year_state = next(
+        line[file_paths[0]]
+        for line in meta_data_lines
+        if file_paths[0] in line
+    )
+    assert year_state["temporal_coverage"] == "2015 to 2018, 2020"
+    summary = summary_line["summary"]
+    assert summary["total"] == summary["processed"] == len(file_paths)
+    assert summary["failed"] == [file_paths[-1]]
+    assert set(summary["completed_after_seconds"]) == set(file_paths)
+    assert summary["error"] is None
+
+
+def test_stream_ends_with_error_of_scan():
+    async def create_meta_data(observer):
+        observer.listed("a.csv")
+        await observer.processed("a.csv", {"output_file_name": "a.csv"})
+        raise ValueError("Error getting list of S3 objects")
+
+    lines = asyncio.run(read_lines(stream_meta_data(create_meta_data)))
+    assert lines[0] == {"a.csv": {"output_file_name": "a.csv"}}
+    assert lines[1]["summary"]["error"] == "Error getting list of S3 objects"
+
+
+def test_scan_waits_while_stream_is_not_read():
+    processed = []
+
+    async def create_meta_data(observer):
+        for idx in range(10 * STREAM_QUEUE_SIZE):
+            observer.listed(f"{idx}.csv")
+            await observer.processed(f"{idx}.csv", {})
+            processed.append(idx)
+
+    async def read_slowly():
+        lines = stream_meta_data(create_meta_data)
+        first = await lines.__anext__()
+        await asyncio.sleep(0.05)
+        waiting = len(processed)
+        rest = await read_lines(lines)
+        return first, waiting, rest
+
+    first, waiting, rest = asyncio.run(read_slowly())
+    assert json.loads(first) == {"0.csv": {}}
+    assert waiting <= STREAM_QUEUE_SIZE + 2
+    assert rest[-1]["summary"]["processed"] == 10 * STREAM_QUEUE_SIZE
+
+
+def test_scan_is_cancelled_when_client_disconnects():
+    cancelled = asyncio.Event()
+
+    async def create_meta_data(observer):
+        try:
+            for idx in range(1000):
+                await observer.processed(f"{idx}.csv", {})
+                await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def disconnect():
+        lines = stream_meta_data(create_meta_data)
+        await lines.__anext__()
+        await lines.aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    asyncio.run(disconnect())
+
+
+def test_streaming_route(api_client, dataset_directory, override_settings):
+    override_settings(FILESYSTEM_ROOTS=[dataset_directory])
+
+    async def post_paths():
+        async with api_client() as client:
+            return await client.post(
+                "/meta-data/filesystem",
+                params={"stream": True},
+                json={"paths": [dataset_directory]},
+            )
+
+    response = asyncio.run(post_paths())
+    assert response.status_code == 200
+    assert response.headers["content-type"] == NDJSON_MEDIA_TYPE
+    *meta_data_lines, summary_line = map(
+        json.loads, response.text.splitlines()
+    )
+    assert len(meta_data_lines) == len(DATASETS)
+    assert summary_line["summary"]["failed"] == []
@@ -0,0 +1,56 @@
+import numpy as np
+
+from app.utils.sketch import DistinctCounter, HyperLogLog, get_bit_length
+
+
+def test_bit_length():
+    values = np.array([0, 1, 2, 3, 255, 256, 2**63], dtype=np.uint64)
+    assert get_bit_length(values).tolist() == [0, 1, 2, 2, 8, 9, 64]
+
+
+def test_counts_exactly_within_threshold():
+    counter = DistinctCounter(threshold=10, precision=10)
+    counter.update(["Goa", "Assam", None, "Goa"])
+    counter.update(np.array(["Bihar", np.nan, "Assam"], dtype=object))
+    assert counter.is_exact
+    assert counter.count() == 3
+    assert counter.first_value == "Goa"
+
+
+def test_ignores_chunks_without_values():
+    counter = DistinctCounter(threshold=10, precision=10)
+    counter.update([None, np.nan])
+    counter.update([])
+    assert counter.count() == 0
+    assert counter.first_value is None
+
+
+def test_spills_into_sketch_beyond_threshold():
+    counter = DistinctCounter(threshold=100, precision=12)
+    for start in range(0, 20_000, 1000):
+        counter.update(
+            [f"district {idx}" for idx in range(start, start + 1000)]
+        )
+        # values seen again are not counted twice
+        counter.update([f"district {idx}" for idx in range(0, 500)])
+    assert not counter.is_exact
+    assert counter.values == {}
+    assert abs(counter.count() - 20_000) / 20_000 < 0.05
+    assert counter.first_value == "district 0"
+
+
+def test_spilled_values_are_added_to_sketch():
+    counter = DistinctCounter(threshold=3, precision=10)
+    counter.update(["a", "b", "c"])
+    assert counter.is_exact
+    counter.update(["d"])
+    assert not counter.is_exact
+    assert counter.count() == 4
+
+
+def test_sketch_estimates_small_cardinalities():
+    sketch = HyperLogLog(precision=10)
+    sketch.add(np.array([str(idx) for idx in range(50)], dtype=object))
+    assert abs(sketch.estimate() - 50) <= 5
+    empty = HyperLogLog(precision=10)
+    assert empty.estimate() == 0